@@ -2,18 +2,31 @@
 Paquete core: Núcleo de simulación de sistemas dinámicos.
 """
 
-from .systems_2d import DynamicSystem2D, CustomSystem2D, LinearSystem2D, render_phase_plot
+from .systems_2d import (DynamicSystem2D, CustomSystem2D, LinearSystem2D, render_phase_plot,
+                         compute_phase_plot, draw_phase_plot)
+from .systems_nd import DynamicSystemND
 from .systems_1d import AutonomousSystem1D, plot_phase_diagram_1d, plot_solutions_1d
 from .bifurcations import BifurcationAnalyzer1D, plot_bifurcation_diagram
+from .sweeps import ParameterSweep
+from .regime_maps import RegimeMap, render_regime_map
+from .scene import PhaseScene, TrajectoryScene3D
 
 __all__ = [
     'DynamicSystem2D',
     'CustomSystem2D',
     'LinearSystem2D',
     'render_phase_plot',
+    'compute_phase_plot',
+    'draw_phase_plot',
+    'DynamicSystemND',
     'AutonomousSystem1D',
     'plot_phase_diagram_1d',
     'plot_solutions_1d',
     'BifurcationAnalyzer1D',
     'plot_bifurcation_diagram',
+    'ParameterSweep',
+    'RegimeMap',
+    'render_regime_map',
+    'PhaseScene',
+    'TrajectoryScene3D',
 ]
@@ -4,11 +4,48 @@ Tipos: Saddle-Node, Pitchfork, Transcrítica
 """
 
 import numpy as np
-import sympy as sp
-from scipy.optimize import fsolve
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 
 from utils.expression_parser import ExpressionParser
+from utils.lazy import LazyModule
+
+sp = LazyModule('sympy')
+
+
+class EquilibriumSweep:
+    """
+    Resultado de un barrido de equilibrios sobre una malla de r.
+    
+    Lo comparten compute_bifurcation_diagram (ramas) y detect_bifurcations
+    (cambios en el número de equilibrios), de modo que ambos trabajan
+    sobre exactamente los mismos datos.
+    """
+    
+    def __init__(self, r_range, x_range, r_values, equilibria):
+        """
+        Args:
+            r_values: Array de valores de r
+            equilibria: Lista (una por r) de listas de equilibrios, cada uno
+                        dict con 'x', 'stability', 'derivative'
+        """
+        self.r_range = tuple(r_range)
+        self.x_range = tuple(x_range)
+        self.r_values = np.asarray(r_values, dtype=float)
+        self.equilibria = equilibria
+        self.counts = np.array([len(eq) for eq in equilibria], dtype=int)
+    
+    def matches(self, r_range, x_range):
+        """True si el barrido cubre los mismos rangos."""
+        return self.r_range == tuple(r_range) and self.x_range == tuple(x_range)
+    
+    def points(self):
+        """Lista plana de dict con 'r', 'x', 'stability'."""
+        return [
+            {'r': r, 'x': eq['x'], 'stability': eq['stability']}
+            for r, eq_at_r in zip(self.r_values, self.equilibria)
+            for eq in eq_at_r
+        ]
 
 
 class BifurcationAnalyzer1D:
@@ -31,26 +68,48 @@ class BifurcationAnalyzer1D:
         # Derivada respecto a x (para estabilidad)
         self.df_dx_sympy = sp.diff(self.f_sympy, self.x_symbol)
         
+        # Derivadas para continuación y clasificación de puntos singulares
+        self.df_dr_sympy = sp.diff(self.f_sympy, self.r_symbol)
+        self.d2f_dx2_sympy = sp.diff(self.df_dx_sympy, self.x_symbol)
+        self.d2f_dxdr_sympy = sp.diff(self.df_dx_sympy, self.r_symbol)
+        self.d2f_dr2_sympy = sp.diff(self.df_dr_sympy, self.r_symbol)
+        
         # Crear funciones numéricas
         self.f_func = sp.lambdify((self.x_symbol, self.r_symbol),
                                   self.f_sympy, 'numpy')
         self.df_dx_func = sp.lambdify((self.x_symbol, self.r_symbol),
                                       self.df_dx_sympy, 'numpy')
+        self.df_dr_func = sp.lambdify((self.x_symbol, self.r_symbol),
+                                      self.df_dr_sympy, 'numpy')
+        self.d2f_dx2_func = sp.lambdify((self.x_symbol, self.r_symbol),
+                                        self.d2f_dx2_sympy, 'numpy')
+        self.d2f_dxdr_func = sp.lambdify((self.x_symbol, self.r_symbol),
+                                         self.d2f_dxdr_sympy, 'numpy')
+        self.d2f_dr2_func = sp.lambdify((self.x_symbol, self.r_symbol),
+                                        self.d2f_dr2_sympy, 'numpy')
         
         self.branches = []
         self.bifurcation_points = []
+        self.sweep = None
     
     def f(self, x, r):
         """Evalúa f(x, r)"""
         try:
-            return float(self.f_func(x, r))
+            return float(np.squeeze(self.f_func(x, r)))
         except:
             return 0.0
     
     def df_dx(self, x, r):
         """Evalúa df/dx en (x, r)"""
         try:
-            return float(self.df_dx_func(x, r))
+            return float(np.squeeze(self.df_dx_func(x, r)))
+        except:
+            return 0.0
+    
+    def df_dr(self, x, r):
+        """Evalúa df/dr en (x, r)"""
+        try:
+            return float(np.squeeze(self.df_dr_func(x, r)))
         except:
             return 0.0
     
@@ -61,6 +120,8 @@ class BifurcationAnalyzer1D:
         Returns:
             Lista de dict con 'x', 'stability', 'derivative'
         """
+        from scipy.optimize import fsolve
+        
         equilibria = []
         found_x = []
         
@@ -97,156 +158,766 @@ class BifurcationAnalyzer1D:
         
         return equilibria
     
-    def compute_bifurcation_diagram(self, r_range, x_range, n_points=200):
+    def sweep_equilibria(self, r_range, x_range, n_points=200, progress_callback=None,
+                         max_workers=None):
+        """
+        Barre r en una malla uniforme buscando los equilibrios en cada valor.
+        
+        Los valores de r se reparten entre procesos (ParameterSweep); cada
+        proceso reconstruye el analizador a partir de la expresión.
+        
+        Args:
+            progress_callback: Función (completados, total)
+            max_workers: Número de procesos (None = núcleos disponibles)
+        
+        Returns:
+            EquilibriumSweep (también queda en self.sweep)
+        """
+        from core.sweeps import ParameterSweep
+        
+        r_values = np.linspace(r_range[0], r_range[1], n_points)
+        sweep = ParameterSweep('equilibria_1d',
+                               {'f_expr': self.f_expr,
+                                'param_name': self.param_name,
+                                'x_range': tuple(x_range)},
+                               max_workers=max_workers)
+        equilibria = sweep.run(r_values, progress_callback)
+        
+        self.sweep = EquilibriumSweep(r_range, x_range, r_values, equilibria)
+        return self.sweep
+    
+    def compute_bifurcation_diagram(self, r_range, x_range, n_points=200, sweep=None):
         """
         Calcula diagrama de bifurcación completo.
         
+        Args:
+            sweep: EquilibriumSweep ya calculado; si es None se barre r
+        
         Returns:
             Lista de ramas (branches), cada una con:
             - 'r_values': array de r
             - 'x_values': array de x
             - 'stability': 'stable' o 'unstable'
         """
-        r_values = np.linspace(r_range[0], r_range[1], n_points)
-        
-        # Estructura para almacenar ramas
-        all_equilibria = []
-        
-        for r in r_values:
-            eq_at_r = self.find_equilibria_at_r(r, x_range)
-            for eq in eq_at_r:
-                all_equilibria.append({
-                    'r': r,
-                    'x': eq['x'],
-                    'stability': eq['stability']
-                })
+        if sweep is None:
+            sweep = self.sweep_equilibria(r_range, x_range, n_points)
         
         # Agrupar en ramas continuas
-        branches = self._track_branches(all_equilibria, r_values)
+        branches = self._track_branches(sweep.points())
         self.branches = branches
         
         return branches
     
-    def _track_branches(self, equilibria, r_values):
+    def _track_branches(self, equilibria, gate=0.5):
         """
         Agrupa equilibrios en ramas continuas.
+        
+        Entre columnas consecutivas de r, cada equilibrio se proyecta con
+        dx/dr = -f_r / f_x (teorema de la función implícita) y se asigna
+        al equilibrio siguiente más cercano a la predicción resolviendo un
+        problema de asignación lineal. Las asignaciones con error mayor que
+        gate, o que cambian la estabilidad, inician una rama nueva.
+        
+        Returns:
+            Lista de ramas con 'r_values', 'x_values', 'stability' e 'id'
         """
+        from scipy.optimize import linear_sum_assignment
+        
         if not equilibria:
             return []
         
-        # Organizar por r
-        eq_by_r = {}
-        for eq in equilibria:
-            r = eq['r']
-            if r not in eq_by_r:
-                eq_by_r[r] = []
-            eq_by_r[r].append(eq)
+        r = np.array([eq['r'] for eq in equilibria], dtype=float)
+        x = np.array([eq['x'] for eq in equilibria], dtype=float)
+        stable = np.array([eq['stability'] == "stable" for eq in equilibria])
         
-        # Ordenar cada lista por x
-        for r in eq_by_r:
-            eq_by_r[r].sort(key=lambda e: e['x'])
+        # Columnas de r, cada una ordenada por x
+        order = np.lexsort((x, r))
+        r, x, stable = r[order], x[order], stable[order]
+        starts = np.flatnonzero(np.r_[True, r[1:] != r[:-1]])
+        ends = np.r_[starts[1:], len(r)]
         
-        # Inicializar ramas
-        branches = []
-        used = set()
+        # Pendiente de cada rama en cada equilibrio
+        with np.errstate(all='ignore'):
+            fx = np.broadcast_to(np.asarray(self.df_dx_func(x, r), dtype=float), x.shape)
+            fr = np.broadcast_to(np.asarray(self.df_dr_func(x, r), dtype=float), x.shape)
+            slope = np.nan_to_num(-fr / fx, nan=0.0, posinf=0.0, neginf=0.0)
+        
+        ids = np.empty(len(r), dtype=int)
+        ids[starts[0]:ends[0]] = np.arange(ends[0] - starts[0])
+        next_id = ends[0] - starts[0]
         
-        for r in sorted(eq_by_r.keys()):
-            for eq in eq_by_r[r]:
-                if (r, eq['x']) in used:
+        # Inicio de cada rama dentro de la columna anterior (para que la
+        # rama que nace por cambio de estabilidad quede unida a la previa)
+        links = []
+        
+        for k in range(1, len(starts)):
+            prev = np.arange(starts[k - 1], ends[k - 1])
+            curr = np.arange(starts[k], ends[k])
+            dr = r[curr[0]] - r[prev[0]]
+            
+            # Cerca de un pliegue la pendiente diverge: no predecir
+            step = slope[prev] * dr
+            predicted = x[prev] + np.where(np.abs(step) < gate, step, 0.0)
+            
+            cost = np.abs(predicted[:, None] - x[curr][None, :])
+            rows, cols = linear_sum_assignment(cost)
+            
+            ids[curr] = -1
+            for i, j in zip(rows, cols):
+                if cost[i, j] > gate:
                     continue
-                
-                # Nueva rama
-                branch = {
-                    'r_values': [r],
-                    'x_values': [eq['x']],
-                    'stability': eq['stability']
-                }
-                used.add((r, eq['x']))
-                
-                # Extender rama hacia adelante
-                current_x = eq['x']
-                for r_next in sorted([rn for rn in eq_by_r.keys() if rn > r]):
-                    # Buscar equilibrio más cercano
-                    candidates = eq_by_r[r_next]
-                    if not candidates:
-                        break
-                    
-                    closest = min(candidates, key=lambda e: abs(e['x'] - current_x))
-                    
-                    # Si está muy lejos, terminar rama
-                    if abs(closest['x'] - current_x) > 0.5:
-                        break
-                    
-                    if (r_next, closest['x']) not in used:
-                        branch['r_values'].append(r_next)
-                        branch['x_values'].append(closest['x'])
-                        used.add((r_next, closest['x']))
-                        current_x = closest['x']
-                
-                if len(branch['r_values']) > 1:
-                    branches.append(branch)
+                if stable[prev[i]] == stable[curr[j]]:
+                    ids[curr[j]] = ids[prev[i]]
+                else:
+                    ids[curr[j]] = next_id
+                    links.append((next_id, prev[i]))
+                    next_id += 1
+            
+            new = curr[ids[curr] < 0]
+            ids[new] = np.arange(next_id, next_id + len(new))
+            next_id += len(new)
+        
+        # Separar por id (orden estable: cada rama queda ordenada en r)
+        by_id = np.argsort(ids, kind='stable')
+        bounds = np.flatnonzero(np.diff(ids[by_id])) + 1
+        groups = {int(ids[g[0]]): g for g in np.split(by_id, bounds)}
+        
+        for branch_id, link in links:
+            groups[branch_id] = np.r_[link, groups[branch_id]]
+        
+        branches = []
+        for branch_id, g in sorted(groups.items()):
+            if len(g) > 1:
+                branches.append({
+                    'r_values': r[g],
+                    'x_values': x[g],
+                    'stability': "stable" if stable[g[-1]] else "unstable",
+                    'id': branch_id
+                })
         
         return branches
     
-    def detect_bifurcations(self, r_range, x_range):
+    def detect_bifurcations(self, r_range, x_range, sweep=None, merge_steps=4):
         """
         Detecta puntos de bifurcación y clasifica el tipo.
         
+        Usa los conteos de equilibrios del barrido (el pasado, el último
+        calculado si cubre los mismos rangos, o uno nuevo de 100 valores)
+        y refina cada cambio por bisección en r.
+        
+        Los cambios separados por menos de merge_steps pasos de la malla
+        de r se agrupan en un único evento: cerca de la bifurcación los
+        equilibrios están a menos de la tolerancia de duplicados y el
+        conteo cambia en varios pasos. La ventana es relativa a la malla,
+        así que no junta bifurcaciones distintas en rangos de r chicos.
+        
         Returns:
             Lista de dict con 'r', 'type', 'description'
         """
-        r_values = np.linspace(r_range[0], r_range[1], 100)
+        if sweep is None:
+            if self.sweep is not None and self.sweep.matches(r_range, x_range):
+                sweep = self.sweep
+            else:
+                sweep = self.sweep_equilibria(r_range, x_range, 100)
+        
+        # Cambios en número de equilibrios, refinados en r
+        changes = []
+        counts = sweep.counts
+        r_values = sweep.r_values
+        merge_window = merge_steps * abs(r_values[-1] - r_values[0]) / max(len(r_values) - 1, 1)
+        for i in np.flatnonzero(counts[1:] != counts[:-1]):
+            r = self._refine_count_change(sweep.r_values[i], sweep.r_values[i + 1],
+                                          int(counts[i]), x_range)
+            if changes and r - changes[-1][-1][0] < merge_window:
+                changes[-1].append((r, int(counts[i]), int(counts[i + 1])))
+            else:
+                changes.append([(r, int(counts[i]), int(counts[i + 1]))])
         
         bifurcations = []
-        prev_n_eq = None
         
-        for r in r_values:
-            eq = self.find_equilibria_at_r(r, x_range)
-            n_eq = len(eq)
+        for group in changes:
+            prev_n_eq = group[0][1]
+            n_eq = group[-1][2]
             
-            if prev_n_eq is not None and n_eq != prev_n_eq:
-                # Cambio en número de equilibrios -> bifurcación
-                
-                if prev_n_eq < n_eq:
-                    # Aparecen equilibrios
-                    if n_eq - prev_n_eq == 2:
-                        bif_type = "Saddle-Node"
-                        description = f"Aparecen {n_eq - prev_n_eq} equilibrios"
-                    elif prev_n_eq == 1 and n_eq == 3:
-                        bif_type = "Pitchfork"
-                        description = "1 equilibrio → 3 equilibrios"
-                    else:
-                        bif_type = "Desconocido"
-                        description = f"{prev_n_eq} → {n_eq} equilibrios"
+            # Los equilibrios que nacen se distinguen un poco después del
+            # punto real, y los que mueren dejan de distinguirse un poco antes
+            if prev_n_eq < n_eq:
+                # Aparecen equilibrios
+                r = group[0][0]
+                if prev_n_eq == 1 and n_eq == 3:
+                    bif_type = "Pitchfork"
+                    description = "1 equilibrio → 3 equilibrios"
+                elif n_eq - prev_n_eq == 2:
+                    bif_type = "Saddle-Node"
+                    description = f"Aparecen {n_eq - prev_n_eq} equilibrios"
                 else:
-                    # Desaparecen equilibrios
-                    if prev_n_eq - n_eq == 2:
-                        bif_type = "Saddle-Node"
-                        description = f"Desaparecen {prev_n_eq - n_eq} equilibrios"
-                    elif prev_n_eq == 3 and n_eq == 1:
-                        bif_type = "Pitchfork"
-                        description = "3 equilibrios → 1 equilibrio"
-                    else:
-                        bif_type = "Desconocido"
-                        description = f"{prev_n_eq} → {n_eq} equilibrios"
-                
-                bifurcations.append({
-                    'r': r,
-                    'type': bif_type,
-                    'description': description,
-                    'prev_n_eq': prev_n_eq,
-                    'n_eq': n_eq
-                })
+                    bif_type = "Desconocido"
+                    description = f"{prev_n_eq} → {n_eq} equilibrios"
+            elif prev_n_eq > n_eq:
+                # Desaparecen equilibrios
+                r = group[-1][0]
+                if prev_n_eq == 3 and n_eq == 1:
+                    bif_type = "Pitchfork"
+                    description = "3 equilibrios → 1 equilibrio"
+                elif prev_n_eq - n_eq == 2:
+                    bif_type = "Saddle-Node"
+                    description = f"Desaparecen {prev_n_eq - n_eq} equilibrios"
+                else:
+                    bif_type = "Desconocido"
+                    description = f"{prev_n_eq} → {n_eq} equilibrios"
+            else:
+                # Dos equilibrios se juntan y vuelven a separarse
+                r = 0.5 * (group[0][0] + group[-1][0])
+                bif_type = "Transcrítica"
+                description = "Dos equilibrios se cruzan"
             
-            prev_n_eq = n_eq
+            bifurcations.append({
+                'r': r,
+                'type': bif_type,
+                'description': description,
+                'prev_n_eq': prev_n_eq,
+                'n_eq': n_eq
+            })
         
         self.bifurcation_points = bifurcations
         return bifurcations
+    
+    def _refine_count_change(self, r_lo, r_hi, n_lo, x_range, tol=1e-6, max_iter=30):
+        """
+        Bisección en r del punto donde el número de equilibrios deja de
+        ser n_lo, entre r_lo (donde vale n_lo) y r_hi (donde no).
+        """
+        tol = tol * max(1.0, abs(r_hi - r_lo))
+        for _ in range(max_iter):
+            if abs(r_hi - r_lo) < tol:
+                break
+            r_mid = 0.5 * (r_lo + r_hi)
+            if len(self.find_equilibria_at_r(r_mid, x_range)) == n_lo:
+                r_lo = r_mid
+            else:
+                r_hi = r_mid
+        return 0.5 * (r_lo + r_hi)
+    
+    # ------------------------------------------------------------------
+    # Continuación por pseudo-longitud de arco
+    # ------------------------------------------------------------------
+    
+    def _derivatives(self, z):
+        """Retorna (f, f_x, f_r) en z = (x, r), con NaN si no se puede evaluar."""
+        x, r = z
+        try:
+            with np.errstate(all='ignore'):
+                return (float(self.f_func(x, r)),
+                        float(self.df_dx_func(x, r)),
+                        float(self.df_dr_func(x, r)))
+        except:
+            return (np.nan, np.nan, np.nan)
+    
+    def _tangent(self, z):
+        """Tangente unitaria (dx, dr) a la curva f(x, r) = 0 en z."""
+        _, fx, fr = self._derivatives(z)
+        norm = np.hypot(fx, fr)
+        if not np.isfinite(norm) or norm < 1e-14:
+            return None
+        return np.array([-fr, fx]) / norm
+    
+    def _correct(self, z_pred, direction, tol=1e-11, max_iter=10):
+        """
+        Corrector de Newton sobre f(x, r) = 0 restringido al hiperplano
+        ortogonal a 'direction' que pasa por z_pred.
+        
+        Returns:
+            (z, iteraciones) o (None, iteraciones) si no converge
+        """
+        z = np.array(z_pred, dtype=float)
+        for it in range(1, max_iter + 1):
+            f, fx, fr = self._derivatives(z)
+            g = direction @ (z - z_pred)
+            det = fx * direction[1] - fr * direction[0]
+            if not np.isfinite(f) or not np.isfinite(det) or det == 0:
+                return None, it
+            
+            dz = np.array([(-f * direction[1] + fr * g) / det,
+                           (-fx * g + direction[0] * f) / det])
+            z = z + dz
+            
+            if np.abs(dz).max() < tol * (1 + np.abs(z).max()):
+                f = self._derivatives(z)[0]
+                if np.isfinite(f) and abs(f) < 1e-8:
+                    return z, it
+                return None, it
+        return None, max_iter
+    
+    def _trace(self, z0, t0, lower, upper, ds, ds_min, ds_max, max_steps):
+        """
+        Sigue una rama desde z0 en la dirección t0 hasta salir del dominio,
+        cerrarse sobre sí misma o no poder continuar.
+        
+        Returns:
+            (puntos (K, 2), cerrada)
+        """
+        points = [z0]
+        z, t = z0, t0
+        travelled = 0.0
+        steps = 0
+        
+        while steps < max_steps:
+            steps += 1
+            z_new, iters = self._correct(z + ds * t, t)
+            
+            t_new = None
+            if z_new is not None and np.linalg.norm(z_new - z) < 2 * ds:
+                t_new = self._tangent(z_new)
+                if t_new is None:
+                    t_new = t
+                elif t_new @ t < 0:
+                    t_new = -t_new
+            
+            # Rechazar pasos que no convergen o que giran demasiado
+            # (pliegues muy curvos o saltos a otra rama)
+            if t_new is None or t_new @ t < 0.99:
+                if ds <= ds_min:
+                    break
+                ds = max(ds * 0.5, ds_min)
+                continue
+            
+            if not _inside(z_new, lower, upper):
+                points.append(_clip_to_box(z, z_new, lower, upper))
+                return np.array(points), False
+            
+            travelled += np.linalg.norm(z_new - z)
+            points.append(z_new)
+            
+            # Curva cerrada (isla): volvió al punto de partida
+            if travelled > 4 * ds_max and np.linalg.norm(z_new - z0) < ds:
+                points.append(z0)
+                return np.array(points), True
+            
+            z, t = z_new, t_new
+            if iters <= 3:
+                ds = min(ds * 1.5, ds_max)
+        
+        return np.array(points), False
+    
+    def _continuation_seeds(self, r_range, x_range, n_samples=401, n_interior=5):
+        """
+        Puntos de arranque: ceros de f sobre el borde del dominio (r, x)
+        y sobre algunas columnas interiores de r (para capturar islas).
+        """
+        xs = np.linspace(x_range[0], x_range[1], n_samples)
+        rs = np.linspace(r_range[0], r_range[1], n_samples)
+        r_columns = np.linspace(r_range[0], r_range[1], n_interior + 2)
+        
+        seeds = []
+        for r in r_columns:
+            for x in _scan_roots(lambda x, r=r: self.f_func(x, r), xs):
+                seeds.append((x, r))
+        for x in x_range:
+            for r in _scan_roots(lambda r, x=x: self.f_func(x, r), rs):
+                seeds.append((x, r))
+        return [np.array(seed, dtype=float) for seed in seeds]
+    
+    def _locate(self, za, zb, test):
+        """
+        Localiza sobre la curva, entre za y zb, el cero de test(z) por
+        bisección sobre la cuerda corrigiendo cada punto medio a la curva.
+        """
+        chord = zb - za
+        length = np.linalg.norm(chord)
+        if length == 0:
+            return za
+        normal = chord / length
+        sign_a = np.sign(test(za))
+        lo, hi = 0.0, 1.0
+        z_mid = za
+        
+        for _ in range(60):
+            mid = 0.5 * (lo + hi)
+            z_mid, _ = self._correct(za + mid * chord, normal)
+            if z_mid is None:
+                z_mid = za + mid * chord
+            if np.sign(test(z_mid)) == sign_a:
+                lo = mid
+            else:
+                hi = mid
+            if (hi - lo) * length < 1e-13:
+                break
+        return z_mid
+    
+    def _classify_special_point(self, z, fr_scale):
+        """Clasifica un punto donde f_x cambia de signo."""
+        x, r = z
+        fr = self.df_dr(x, r)
+        
+        if abs(fr) > 1e-6 * (1 + fr_scale):
+            return "Saddle-Node", "Dos equilibrios colisionan y se aniquilan"
+        
+        # Punto de ramificación (f_x = f_r = 0): la simetría lo decide
+        try:
+            fxx = float(self.d2f_dx2_func(x, r))
+        except:
+            fxx = np.nan
+        if np.isfinite(fxx) and abs(fxx) < 1e-6:
+            return "Pitchfork", "Una rama se divide en tres"
+        return "Transcrítica", "Dos ramas se cruzan e intercambian estabilidad"
+    
+    def _polish_special_point(self, z, radius, max_iter=20):
+        """
+        Refina con Newton un punto donde f_x se anula: primero como punto
+        de ramificación (f_x = f_r = 0) y, si no converge a un cero de f
+        dentro de radius, como pliegue (f = f_x = 0).
+        """
+        for branch_point in (True, False):
+            w = np.array(z, dtype=float)
+            converged = False
+            for _ in range(max_iter):
+                x, r = w
+                try:
+                    with np.errstate(all='ignore'):
+                        f, fx, fr = self._derivatives(w)
+                        fxx = float(np.squeeze(self.d2f_dx2_func(x, r)))
+                        fxr = float(np.squeeze(self.d2f_dxdr_func(x, r)))
+                        frr = float(np.squeeze(self.d2f_dr2_func(x, r)))
+                    if branch_point:
+                        step = np.linalg.solve([[fxx, fxr], [fxr, frr]], [fx, fr])
+                    else:
+                        step = np.linalg.solve([[fx, fr], [fxx, fxr]], [f, fx])
+                except:
+                    break
+                if not np.all(np.isfinite(step)):
+                    break
+                w = w - step
+                if np.abs(step).max() < 1e-13 * (1 + np.abs(w).max()):
+                    converged = True
+                    break
+            
+            if converged and np.linalg.norm(w - z) < radius:
+                f = self._derivatives(w)[0]
+                if np.isfinite(f) and abs(f) < 1e-9:
+                    return w
+        return z
+    
+    def _special_point(self, z, fr_scale, radius):
+        """Dict de bifurcación para un punto z = (x, r) donde f_x se anula."""
+        z = self._polish_special_point(z, radius)
+        bif_type, description = self._classify_special_point(z, fr_scale)
+        return {
+            'r': float(z[1]),
+            'x': float(z[0]),
+            'type': bif_type,
+            'description': description
+        }
+    
+    def continue_branches(self, r_range, x_range, ds=None, max_steps=5000):
+        """
+        Calcula el diagrama de bifurcación por continuación de pseudo-longitud
+        de arco (predictor tangente + corrector de Newton, paso adaptativo).
+        
+        Las ramas atraviesan los pliegues sin romperse; los puntos donde f_x
+        cambia de signo se localizan con precisión y se clasifican con f_r
+        y f_xx (pliegue, transcrítica o pitchfork).
+        
+        Returns:
+            Lista de ramas con el mismo formato que compute_bifurcation_diagram.
+            Los puntos de bifurcación quedan en self.bifurcation_points.
+        """
+        lower = np.array([x_range[0], r_range[0]], dtype=float)
+        upper = np.array([x_range[1], r_range[1]], dtype=float)
+        diag = np.linalg.norm(upper - lower)
+        ds_max = 0.01 * diag if ds is None else ds
+        ds_min = 1e-7 * diag
+        merge_tol = 5e-3 * diag
+        
+        curves = []
+        for seed in self._continuation_seeds(r_range, x_range):
+            if curves and _distance_to_curves(seed, curves) < merge_tol:
+                continue
+            t0 = self._tangent(seed)
+            if t0 is None:
+                continue
+            
+            forward, closed = self._trace(seed, t0, lower, upper,
+                                          ds_max, ds_min, ds_max, max_steps)
+            if closed:
+                curve = forward
+            else:
+                backward, _ = self._trace(seed, -t0, lower, upper,
+                                          ds_max, ds_min, ds_max, max_steps)
+                curve = np.vstack([backward[::-1], forward[1:]])
+            
+            if len(curve) > 1:
+                curves.append(curve)
+        
+        branches = []
+        special = []
+        for curve in curves:
+            x, r = curve[:, 0], curve[:, 1]
+            with np.errstate(all='ignore'):
+                fx = np.broadcast_to(np.asarray(self.df_dx_func(x, r), dtype=float), x.shape)
+                fr = np.broadcast_to(np.asarray(self.df_dr_func(x, r), dtype=float), x.shape)
+            fr_scale = np.nanmax(np.abs(fr)) if np.isfinite(fr).any() else 0.0
+            stable = fx < 0
+            
+            # Partir la curva donde cambia la estabilidad
+            pieces = []
+            start = [curve[0]]
+            i0 = 1
+            for i in np.flatnonzero(stable[1:] != stable[:-1]):
+                z_star = self._locate(curve[i], curve[i + 1],
+                                      lambda z: self.df_dx(*z))
+                pieces.append((np.vstack(start + [curve[i0:i + 1], z_star]), stable[i]))
+                start = [z_star]
+                i0 = i + 1
+                
+                special.append(self._special_point(z_star, fr_scale, ds_max))
+            pieces.append((np.vstack(start + [curve[i0:]]), stable[-1]))
+            
+            for points, is_stable in pieces:
+                if len(points) > 1:
+                    branches.append({
+                        'r_values': points[:, 1],
+                        'x_values': points[:, 0],
+                        'stability': "stable" if is_stable else "unstable"
+                    })
+        
+        self.branches = branches
+        self.bifurcation_points = _merge_special_points(special, 1e-6 * diag)
+        return branches
+    
+    # ------------------------------------------------------------------
+    # Curva implícita f(x, r) = 0 por marching squares
+    # ------------------------------------------------------------------
+    
+    def compute_zero_contour(self, r_range, x_range, resolution=2000, newton_steps=3):
+        """
+        Extrae el conjunto f(x, r) = 0 como curva de nivel sobre una malla
+        densa (r, x) evaluada en una sola llamada vectorizada.
+        
+        Los segmentos de marching squares se refinan con unos pasos de
+        Newton en la dirección del gradiente y se clasifican por el signo
+        de df/dx en su punto medio. No requiere semillas ni seguimiento
+        de ramas.
+        
+        Returns:
+            dict con:
+            - 'segments': array (K, 2, 2) de extremos en coordenadas (r, x)
+            - 'stable': array (K,) booleano
+            Los puntos de bifurcación quedan en self.bifurcation_points.
+        """
+        r_values = np.linspace(r_range[0], r_range[1], resolution)
+        x_values = np.linspace(x_range[0], x_range[1], resolution)
+        
+        # Columna de x y fila de r: los términos que dependen de una sola
+        # variable se evalúan sobre resolution puntos, no resolution²
+        with np.errstate(all='ignore'):
+            F = np.broadcast_to(
+                np.asarray(self.f_func(x_values[:, None], r_values[None, :]), dtype=float),
+                (resolution, resolution)
+            )
+        
+        # Extremos en índices fraccionarios (fila = x, columna = r)
+        ends = _marching_squares(F)
+        if len(ends) == 0:
+            self.bifurcation_points = []
+            self.contour = {'segments': np.empty((0, 2, 2)), 'stable': np.empty(0, dtype=bool)}
+            return self.contour
+        
+        dx = (x_range[1] - x_range[0]) / (resolution - 1)
+        dr = (r_range[1] - r_range[0]) / (resolution - 1)
+        x = x_range[0] + ends[..., 0] * dx
+        r = r_range[0] + ends[..., 1] * dr
+        
+        # Newton sobre el gradiente, limitado a una celda por paso
+        cell = np.hypot(dx, dr)
+        for _ in range(newton_steps):
+            with np.errstate(all='ignore'):
+                f = np.broadcast_to(np.asarray(self.f_func(x, r), dtype=float), x.shape)
+                fx = np.broadcast_to(np.asarray(self.df_dx_func(x, r), dtype=float), x.shape)
+                fr = np.broadcast_to(np.asarray(self.df_dr_func(x, r), dtype=float), x.shape)
+                grad2 = fx**2 + fr**2
+                step_x = f * fx / grad2
+                step_r = f * fr / grad2
+            ok = np.isfinite(step_x) & np.isfinite(step_r) & (np.hypot(step_x, step_r) < cell)
+            x = np.where(ok, x - step_x, x)
+            r = np.where(ok, r - step_r, r)
+        
+        # Descartar cruces espurios (polos donde f cambia de signo sin anularse)
+        with np.errstate(all='ignore'):
+            f = np.broadcast_to(np.asarray(self.f_func(x, r), dtype=float), x.shape)
+            f_scale = np.nanmedian(np.abs(F[np.isfinite(F)])) if np.isfinite(F).any() else 1.0
+        keep = np.all(np.abs(f) <= 1e-3 * max(f_scale, 1e-12), axis=1)
+        x, r = x[keep], r[keep]
+        
+        with np.errstate(all='ignore'):
+            fx_ends = np.broadcast_to(np.asarray(self.df_dx_func(x, r), dtype=float), x.shape)
+            fx_mid = np.broadcast_to(
+                np.asarray(self.df_dx_func(x.mean(axis=1), r.mean(axis=1)), dtype=float),
+                x.shape[:1]
+            )
+            fr_ends = np.broadcast_to(np.asarray(self.df_dr_func(x, r), dtype=float), x.shape)
+        
+        # Puntos de bifurcación: segmentos donde df/dx cambia de signo
+        fr_scale = np.nanmax(np.abs(fr_ends)) if np.isfinite(fr_ends).any() else 0.0
+        special = []
+        for k in np.flatnonzero((fx_ends[:, 0] < 0) != (fx_ends[:, 1] < 0)):
+            za = np.array([x[k, 0], r[k, 0]])
+            zb = np.array([x[k, 1], r[k, 1]])
+            z_star = self._locate(za, zb, lambda z: self.df_dx(*z))
+            special.append(self._special_point(z_star, fr_scale, 2 * cell))
+        
+        self.bifurcation_points = _merge_special_points(special, 2 * cell)
+        self.contour = {
+            'segments': np.stack([r, x], axis=-1),
+            'stable': fx_mid < 0
+        }
+        return self.contour
 
 
-def plot_bifurcation_diagram(analyzer, r_range, x_range, ax, log_callback=None):
+def _scan_roots(func, samples):
     """
-    Dibuja diagrama de bifurcación.
+    Ceros de una función escalar vectorizada sobre una malla 1D:
+    detecta cambios de signo y los refina con brentq.
+    """
+    from scipy.optimize import brentq
+    
+    with np.errstate(all='ignore'):
+        values = np.broadcast_to(np.asarray(func(samples), dtype=float), samples.shape)
+    
+    roots = list(samples[values == 0])
+    finite = np.isfinite(values[:-1]) & np.isfinite(values[1:])
+    for i in np.flatnonzero(finite & (values[:-1] * values[1:] < 0)):
+        try:
+            roots.append(brentq(lambda s: float(func(s)), samples[i], samples[i + 1]))
+        except:
+            continue
+    return sorted(roots)
+
+
+def _inside(z, lower, upper):
+    """True si z está dentro del rectángulo [lower, upper] (con tolerancia)."""
+    slack = 1e-12 * (1 + np.abs(upper - lower))
+    return bool(np.all(z >= lower - slack) and np.all(z <= upper + slack))
+
+
+def _clip_to_box(z_in, z_out, lower, upper):
+    """Intersección del segmento z_in -> z_out con el borde del rectángulo."""
+    delta = z_out - z_in
+    fraction = 1.0
+    for k in range(len(z_in)):
+        if delta[k] > 0 and z_out[k] > upper[k]:
+            fraction = min(fraction, (upper[k] - z_in[k]) / delta[k])
+        elif delta[k] < 0 and z_out[k] < lower[k]:
+            fraction = min(fraction, (lower[k] - z_in[k]) / delta[k])
+    return z_in + fraction * delta
+
+
+def _distance_to_curves(point, curves):
+    """Distancia mínima de un punto a un conjunto de poligonales."""
+    best = np.inf
+    for curve in curves:
+        a, b = curve[:-1], curve[1:]
+        ab = b - a
+        length2 = np.einsum('ij,ij->i', ab, ab)
+        with np.errstate(all='ignore'):
+            s = np.clip(np.einsum('ij,ij->i', point - a, ab) / length2, 0.0, 1.0)
+        s = np.nan_to_num(s)
+        closest = a + s[:, None] * ab
+        best = min(best, np.sqrt(np.min(np.sum((closest - point)**2, axis=1))))
+    return best
+
+
+def _merge_special_points(points, tol):
+    """
+    Elimina puntos de bifurcación repetidos (un punto de ramificación
+    aparece en cada rama que lo atraviesa). Retorna la lista ordenada por r.
+    """
+    merged = []
+    for point in sorted(points, key=lambda p: (p['r'], p['x'])):
+        if any(abs(point['r'] - b['r']) + abs(point['x'] - b['x']) < tol
+               for b in merged):
+            continue
+        merged.append(point)
+    return merged
+
+
+def _marching_squares(F):
+    """
+    Curva de nivel cero de una malla 2D por marching squares.
+    
+    Args:
+        F: Array (n, m) de valores; las celdas con valores no finitos
+           se ignoran
+    
+    Returns:
+        Array (K, 2, 2) con los extremos de cada segmento en índices
+        fraccionarios (fila, columna)
+    """
+    positive = F >= 0
+    finite = np.isfinite(F)
+    
+    # Celdas con esquinas de distinto signo (las únicas que se procesan)
+    n_positive = (positive[:-1, :-1].astype(np.int8) + positive[:-1, 1:]
+                  + positive[1:, 1:] + positive[1:, :-1])
+    valid = finite[:-1, :-1] & finite[:-1, 1:] & finite[1:, 1:] & finite[1:, :-1]
+    i, j = np.nonzero((n_positive > 0) & (n_positive < 4) & valid)
+    
+    a, b, c, d = F[i, j], F[i, j + 1], F[i + 1, j + 1], F[i + 1, j]
+    pa, pb, pc, pd = a >= 0, b >= 0, c >= 0, d >= 0
+    fi, fj = i.astype(float), j.astype(float)
+    
+    # Aristas de cada celda: 0 = inferior (a-b), 1 = derecha (b-c),
+    # 2 = superior (d-c), 3 = izquierda (a-d)
+    with np.errstate(all='ignore'):
+        points = np.stack([
+            np.stack([fi, fj + a / (a - b)], axis=-1),
+            np.stack([fi + b / (b - c), fj + 1], axis=-1),
+            np.stack([fi + 1, fj + d / (d - c)], axis=-1),
+            np.stack([fi + a / (a - d), fj], axis=-1),
+        ])
+    crosses = np.stack([pa != pb, pb != pc, pd != pc, pa != pd])
+    n_cross = crosses.sum(axis=0)
+    
+    segments = []
+    
+    # Caso simple: exactamente dos aristas cortadas
+    simple = n_cross == 2
+    for e0 in range(4):
+        for e1 in range(e0 + 1, 4):
+            mask = simple & crosses[e0] & crosses[e1]
+            if mask.any():
+                segments.append(np.stack([points[e0, mask], points[e1, mask]], axis=1))
+    
+    # Caso ambiguo (punto silla): decide el valor en el centro de la celda
+    saddle = n_cross == 4
+    if saddle.any():
+        joined = saddle & (((a + b + c + d) >= 0) == pa)
+        split = saddle & ~joined
+        for e0, e1, mask in ((0, 1, joined), (2, 3, joined), (3, 0, split), (1, 2, split)):
+            if mask.any():
+                segments.append(np.stack([points[e0, mask], points[e1, mask]], axis=1))
+    
+    if not segments:
+        return np.empty((0, 2, 2))
+    return np.concatenate(segments)
+
+
+def compute_bifurcation_data(analyzer, r_range, x_range, method='grid',
+                             log_callback=None, progress_callback=None):
+    """
+    Calcula ramas y bifurcaciones del diagrama (sin tocar ejes).
+    
+    Puede ejecutarse fuera del hilo de la interfaz; draw_bifurcation_diagram
+    dibuja el resultado.
+    
+    Args:
+        method: 'grid' (barrido en r con búsqueda de equilibrios),
+                'continuation' (continuación por pseudo-longitud de arco) o
+                'contour' (curva de nivel f = 0 por marching squares)
+        progress_callback: Función (completados, total) del barrido en r
+    
+    Returns:
+        dict con 'r_range', 'x_range', 'param_name', 'branches',
+        'contour' (o None) y 'bifurcations'
     """
     def log(msg):
         if log_callback:
@@ -255,10 +926,60 @@ def plot_bifurcation_diagram(analyzer, r_range, x_range, ax, log_callback=None):
     log("Calculando diagrama de bifurcación...")
     
     # Calcular ramas
-    branches = analyzer.compute_bifurcation_diagram(r_range, x_range)
+    contour = None
+    if method == 'contour':
+        branches = []
+        contour = analyzer.compute_zero_contour(r_range, x_range)
+    elif method == 'continuation':
+        branches = analyzer.continue_branches(r_range, x_range)
+    else:
+        sweep = analyzer.sweep_equilibria(r_range, x_range,
+                                          progress_callback=progress_callback)
+        branches = analyzer.compute_bifurcation_diagram(r_range, x_range, sweep=sweep)
+    
+    # Detectar bifurcaciones
+    log("Detectando bifurcaciones...")
+    if method in ('continuation', 'contour'):
+        bifurcations = analyzer.bifurcation_points
+    else:
+        bifurcations = analyzer.detect_bifurcations(r_range, x_range, sweep=sweep)
+    
+    log(f"Encontradas {len(bifurcations)} bifurcaciones:")
+    for bif in bifurcations:
+        log(f"  r ≈ {bif['r']:.3f}: {bif['type']} - {bif['description']}")
+    
+    return {
+        'r_range': r_range,
+        'x_range': x_range,
+        'param_name': analyzer.param_name,
+        'branches': branches,
+        'contour': contour,
+        'bifurcations': bifurcations,
+    }
+
+
+def draw_bifurcation_diagram(data, ax):
+    """
+    Dibuja en ax un diagrama calculado con compute_bifurcation_data.
+    
+    Debe llamarse desde el hilo de la interfaz.
+    """
+    r_range, x_range = data['r_range'], data['x_range']
+    
+    contour = data['contour']
+    if contour is not None:
+        segments, stable = contour['segments'], contour['stable']
+        
+        ax.add_collection(LineCollection(segments[stable], colors='blue',
+                                         linewidths=2.0, alpha=0.8))
+        ax.add_collection(LineCollection(segments[~stable], colors='red',
+                                         linewidths=2.0, alpha=0.8,
+                                         linestyles='dotted'))
+        ax.set_xlim(r_range)
+        ax.set_ylim(x_range)
     
     # Dibujar cada rama
-    for branch in branches:
+    for branch in data['branches']:
         r_vals = np.array(branch['r_values'])
         x_vals = np.array(branch['x_values'])
         stability = branch['stability']
@@ -276,22 +997,18 @@ def plot_bifurcation_diagram(analyzer, r_range, x_range, ax, log_callback=None):
                    color='red',
                    alpha=0.8)
     
-    # Detectar y marcar bifurcaciones
-    log("Detectando bifurcaciones...")
-    bifurcations = analyzer.detect_bifurcations(r_range, x_range)
-    
-    log(f"Encontradas {len(bifurcations)} bifurcaciones:")
-    
-    for bif in bifurcations:
+    # Marcar bifurcaciones
+    for bif in data['bifurcations']:
         r_bif = bif['r']
         bif_type = bif['type']
-        description = bif['description']
-        
-        log(f"  r ≈ {r_bif:.3f}: {bif_type} - {description}")
         
         ax.axvline(r_bif, color='orange', linestyle='--',
                   alpha=0.7, linewidth=2)
         
+        if 'x' in bif:
+            ax.plot(r_bif, bif['x'], 'o', color='orange',
+                   markersize=8, markeredgecolor='black', zorder=5)
+        
         # Etiqueta
         y_pos = (x_range[0] + x_range[1]) / 2
         ax.text(r_bif, y_pos, f'r≈{r_bif:.2f}\n{bif_type}',
@@ -299,7 +1016,7 @@ def plot_bifurcation_diagram(analyzer, r_range, x_range, ax, log_callback=None):
                         facecolor='orange', alpha=0.7),
                fontsize=9, ha='center')
     
-    ax.set_xlabel(f'{analyzer.param_name}', fontsize=12)
+    ax.set_xlabel(f"{data['param_name']}", fontsize=12)
     ax.set_ylabel('x*', fontsize=12)
     ax.set_title('Diagrama de Bifurcación', fontsize=14, fontweight='bold')
     ax.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
@@ -316,6 +1033,20 @@ def plot_bifurcation_diagram(analyzer, r_range, x_range, ax, log_callback=None):
     ax.legend(handles=legend_elements, loc='best')
 
 
+def plot_bifurcation_diagram(analyzer, r_range, x_range, ax, log_callback=None,
+                             method='grid'):
+    """
+    Dibuja diagrama de bifurcación.
+    
+    Args:
+        method: 'grid' (barrido en r con búsqueda de equilibrios),
+                'continuation' (continuación por pseudo-longitud de arco) o
+                'contour' (curva de nivel f = 0 por marching squares)
+    """
+    data = compute_bifurcation_data(analyzer, r_range, x_range, method, log_callback)
+    draw_bifurcation_diagram(data, ax)
+
+
 def plot_phase_diagrams_at_r(analyzer, r_values, x_range, axes, log_callback=None):
     """
     Dibuja diagramas de fase para valores específicos de r.
@@ -326,17 +1057,16 @@ def plot_phase_diagrams_at_r(analyzer, r_values, x_range, axes, log_callback=Non
     """
     from core.systems_1d import AutonomousSystem1D, plot_phase_diagram_1d
     
+    # Un solo sistema con r simbólico; para cada valor solo se reasigna r
+    system = AutonomousSystem1D(analyzer.f_expr, parameters={analyzer.param_name: 0.0})
+    
     for idx, r_val in enumerate(r_values):
         if idx >= len(axes):
             break
         
         ax = axes[idx]
         
-        # Crear expresión con r fijo
-        f_expr_at_r = str(analyzer.f_sympy.subs(analyzer.r_symbol, r_val))
-        
-        # Crear sistema 1D
-        system = AutonomousSystem1D(f_expr_at_r)
+        system.set_parameters({analyzer.param_name: r_val})
         
         # Dibujar diagrama de fase
         plot_phase_diagram_1d(system, x_range, ax, log_callback)
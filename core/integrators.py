@@ -0,0 +1,345 @@
+"""
+Integradores vectorizados para conjuntos (ensembles) de condiciones iniciales.
+
+Todas las condiciones iniciales avanzan juntas como un único estado (N, d),
+cada una con su propio paso adaptativo y su propio criterio de parada.
+"""
+
+import numpy as np
+
+
+# Tablero de Butcher de Dormand-Prince 5(4)
+_DP_A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+]
+_DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+_DP_B4 = np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40])
+_DP_E = _DP_B - _DP_B4
+
+# Pesos de composición sobre el paso de Störmer-Verlet (leapfrog):
+# Yoshida (1990) combina tres pasos para obtener un método de orden 4
+_YOSHIDA_W1 = 1 / (2 - 2**(1/3))
+_YOSHIDA_W0 = -2**(1/3) / (2 - 2**(1/3))
+SYMPLECTIC_METHODS = {
+    'leapfrog': (1.0,),
+    'yoshida4': (_YOSHIDA_W1, _YOSHIDA_W0, _YOSHIDA_W1),
+}
+
+# Estados de cada miembro del ensemble
+RUNNING = 0
+FINISHED = 1
+ESCAPED = 2
+FAILED = -1
+STOPPED = -2
+
+
+def dopri5_steps(rhs, y0, s_end, direction=None, rtol=1e-6, atol=1e-9,
+                 max_steps=100000, max_norm=1e6, should_stop=None, status=None):
+    """
+    Generador de pasos aceptados de Dormand-Prince 5(4) sobre un ensemble.
+    
+    Integra dy/ds = direction * rhs(y) para s en [0, s_end] por miembro.
+    Cada miembro tiene su propio paso y control de error; los que terminan,
+    divergen o escapan dejan de evaluarse.
+    
+    Args:
+        rhs: Función (K, d) -> (K, d), vectorizada sobre filas
+        y0: Estados iniciales (N, d)
+        s_end: Longitud de integración por miembro (N,), no negativa
+        direction: Signo del tiempo por miembro (N,); None = hacia adelante
+        rtol, atol: Tolerancias relativa y absoluta
+        max_steps: Máximo de iteraciones del ensemble
+        max_norm: Los miembros con |y| mayor se detienen (escapan)
+        should_stop: Función sin argumentos; si retorna True se cancela
+        status: Array (N,) de enteros que se actualiza con el estado final
+    
+    Yields:
+        dict con 'index', 's0', 'y0', 'f0', 's1', 'y1', 'f1' para los
+        miembros que aceptaron un paso (f = derivada respecto de s)
+    """
+    y = np.array(y0, dtype=float)
+    n, d = y.shape
+    s_end = np.asarray(s_end, dtype=float)
+    sign = np.ones(n) if direction is None else np.asarray(direction, dtype=float)
+    if status is None:
+        status = np.zeros(n, dtype=int)
+    status[:] = RUNNING
+    
+    def derivative(Y, idx):
+        with np.errstate(all='ignore'):
+            return sign[idx, None] * rhs(Y)
+    
+    all_idx = np.arange(n)
+    s = np.zeros(n)
+    f = derivative(y, all_idx)
+    
+    # Paso inicial (heurística de Hairer, primera etapa)
+    scale = atol + rtol * np.abs(y)
+    d0 = np.sqrt(np.mean((y / scale)**2, axis=1))
+    d1 = np.sqrt(np.mean((f / scale)**2, axis=1))
+    with np.errstate(all='ignore'):
+        h = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / d1)
+    h = np.minimum(np.nan_to_num(h, nan=1e-6), np.maximum(s_end, 1e-12))
+    
+    status[s_end <= 0] = FINISHED
+    status[~np.isfinite(f).all(axis=1)] = FAILED
+    
+    for _ in range(max_steps):
+        idx = np.flatnonzero(status == RUNNING)
+        if len(idx) == 0:
+            break
+        if should_stop is not None and should_stop():
+            status[idx] = STOPPED
+            break
+        
+        h_i = np.minimum(h[idx], s_end[idx] - s[idx])
+        y_i = y[idx]
+        hc = h_i[:, None]
+        
+        k = [f[idx]]
+        for stage in range(1, 6):
+            increment = sum(a * k_j for a, k_j in zip(_DP_A[stage], k))
+            k.append(derivative(y_i + hc * increment, idx))
+        
+        y_new = y_i + hc * sum(b * k_j for b, k_j in zip(_DP_B[:6], k))
+        f_new = derivative(y_new, idx)
+        k.append(f_new)
+        
+        with np.errstate(all='ignore'):
+            err = hc * sum(e * k_j for e, k_j in zip(_DP_E, k) if e != 0)
+            scale = atol + rtol * np.maximum(np.abs(y_i), np.abs(y_new))
+            err_norm = np.sqrt(np.mean((err / scale)**2, axis=1))
+        
+        finite = np.isfinite(y_new).all(axis=1) & np.isfinite(f_new).all(axis=1) & np.isfinite(err_norm)
+        accept = finite & (err_norm <= 1.0)
+        
+        # Control del paso por miembro
+        with np.errstate(all='ignore'):
+            factor = np.clip(0.9 * err_norm**-0.2, 0.2, 10.0)
+        factor = np.where(finite, factor, 0.2)
+        factor = np.where(accept, factor, np.minimum(factor, 1.0))
+        h[idx] = h_i * factor
+        
+        # Miembros cuyo paso colapsa: no es posible seguir integrando
+        h_min = 1e-12 * np.maximum(1.0, s[idx])
+        status[idx[~accept & (h[idx] < h_min)]] = FAILED
+        
+        if not accept.any():
+            continue
+        
+        acc = idx[accept]
+        s_new = s[acc] + h_i[accept]
+        
+        yield {
+            'index': acc,
+            's0': s[acc],
+            'y0': y_i[accept],
+            'f0': k[0][accept],
+            's1': s_new,
+            'y1': y_new[accept],
+            'f1': f_new[accept],
+        }
+        
+        s[acc] = s_new
+        y[acc] = y_new[accept]
+        f[acc] = f_new[accept]
+        
+        status[acc[s_new >= s_end[acc] * (1 - 1e-12)]] = FINISHED
+        escaped = np.abs(y[acc]).max(axis=1) > max_norm
+        status[acc[escaped & (status[acc] == RUNNING)]] = ESCAPED
+    else:
+        status[status == RUNNING] = STOPPED
+
+
+def hermite_interpolate(s0, y0, f0, s1, y1, f1, s_query):
+    """
+    Interpolación cúbica de Hermite dentro de un paso.
+    
+    Args:
+        s0, s1: Extremos del paso (K,)
+        y0, y1: Estados en los extremos (K, d)
+        f0, f1: Derivadas en los extremos (K, d)
+        s_query: Instantes a interpolar (K,)
+    
+    Returns:
+        Estados interpolados (K, d)
+    """
+    h = (s1 - s0)[:, None]
+    theta = ((s_query - s0)[:, None]) / h
+    theta2 = theta * theta
+    theta3 = theta2 * theta
+    
+    h00 = 2 * theta3 - 3 * theta2 + 1
+    h10 = theta3 - 2 * theta2 + theta
+    h01 = -2 * theta3 + 3 * theta2
+    h11 = theta3 - theta2
+    
+    return h00 * y0 + h10 * h * f0 + h01 * y1 + h11 * h * f1
+
+
+def integrate_ensemble(rhs, y0, t_end, n_points=1000, rtol=1e-6, atol=1e-9,
+                       max_norm=1e6, should_stop=None):
+    """
+    Integra un ensemble de condiciones iniciales con Dormand-Prince vectorizado.
+    
+    Cada miembro tiene su propio horizonte t_end (positivo o negativo) y se
+    muestrea en n_points instantes equiespaciados entre 0 y su t_end.
+    
+    Args:
+        rhs: Función (K, d) -> (K, d)
+        y0: Condiciones iniciales (N, d)
+        t_end: Tiempo final por miembro (N,) o escalar
+        n_points: Muestras por trayectoria
+        rtol, atol: Tolerancias
+        max_norm: Umbral de escape
+        should_stop: Función de cancelación cooperativa
+    
+    Returns:
+        dict de arrays con:
+        - 't': (N, n_points) instantes de muestreo
+        - 'states': (N, n_points, d), NaN después de que el miembro termina
+        - 'n_valid': (N,) número de muestras válidas
+        - 'status': (N,) estado final (FINISHED, ESCAPED, FAILED, STOPPED)
+        - 'success': (N,) True si se alcanzó t_end
+    """
+    y0 = np.atleast_2d(np.asarray(y0, dtype=float))
+    n, d = y0.shape
+    t_end = np.broadcast_to(np.asarray(t_end, dtype=float), (n,))
+    direction = np.where(t_end < 0, -1.0, 1.0)
+    s_end = np.abs(t_end)
+    
+    s_samples = s_end[:, None] * np.linspace(0.0, 1.0, n_points)[None, :]
+    states = np.full((n, n_points, d), np.nan)
+    states[:, 0] = y0
+    next_idx = np.ones(n, dtype=int)
+    status = np.zeros(n, dtype=int)
+    
+    for step in dopri5_steps(rhs, y0, s_end, direction, rtol=rtol, atol=atol,
+                             max_norm=max_norm, should_stop=should_stop,
+                             status=status):
+        idx = step['index']
+        s1 = step['s1']
+        local = np.arange(len(idx))
+        
+        # Volcar todas las muestras que caen dentro del paso recién aceptado
+        while True:
+            j = next_idx[idx[local]]
+            pending = j < n_points
+            pending[pending] = s_samples[idx[local[pending]], j[pending]] <= s1[local[pending]] * (1 + 1e-12)
+            if not pending.any():
+                break
+            
+            local = local[pending]
+            members = idx[local]
+            j = next_idx[members]
+            states[members, j] = hermite_interpolate(
+                step['s0'][local], step['y0'][local], step['f0'][local],
+                s1[local], step['y1'][local], step['f1'][local],
+                s_samples[members, j]
+            )
+            next_idx[members] += 1
+    
+    return {
+        't': direction[:, None] * s_samples,
+        'states': states,
+        'n_valid': next_idx,
+        'status': status,
+        'success': status == FINISHED,
+    }
+
+
+def integrate_symplectic(drift, force, y0, t_end, n_points=1000, dt=0.05,
+                         method='yoshida4', max_norm=1e6, should_stop=None):
+    """
+    Integra un ensemble de un sistema separable con paso fijo simpléctico.
+    
+    El estado se divide en (q, p) con q' = drift(p), p' = force(q). Todos
+    los miembros dan el mismo número de pasos fijos; cada uno con el paso
+    que hace coincidir sus muestras con su propio t_end. La energía no
+    deriva: el error queda acotado aunque el paso sea grande.
+    
+    Args:
+        drift: Función (K, k) -> (K, k), derivada de q
+        force: Función (K, k) -> (K, k), derivada de p
+        y0: Condiciones iniciales (N, 2k), columnas q y luego p
+        t_end: Tiempo final por miembro (N,) o escalar (negativo = atrás)
+        n_points: Muestras por trayectoria
+        dt: Paso máximo
+        method: 'leapfrog' (orden 2) o 'yoshida4' (orden 4)
+        max_norm: Umbral de escape
+        should_stop: Función de cancelación cooperativa
+    
+    Returns:
+        dict con el mismo formato que integrate_ensemble
+    """
+    if method not in SYMPLECTIC_METHODS:
+        raise ValueError(f"Método simpléctico desconocido: {method}")
+    weights = SYMPLECTIC_METHODS[method]
+    
+    y0 = np.atleast_2d(np.asarray(y0, dtype=float))
+    n, d = y0.shape
+    k = d // 2
+    t_end = np.broadcast_to(np.asarray(t_end, dtype=float), (n,))
+    direction = np.where(t_end < 0, -1.0, 1.0)
+    s_end = np.abs(t_end)
+    
+    s_samples = s_end[:, None] * np.linspace(0.0, 1.0, n_points)[None, :]
+    states = np.full((n, n_points, d), np.nan)
+    states[:, 0] = y0
+    n_valid = np.ones(n, dtype=int)
+    status = np.zeros(n, dtype=int)
+    status[s_end <= 0] = FINISHED
+    
+    # Pasos por muestra: los mismos para todo el ensemble
+    spacing = s_end / max(n_points - 1, 1)
+    substeps = max(1, int(np.ceil(spacing.max() / dt))) if n > 0 else 1
+    h = (direction * spacing / substeps)[:, None]
+    
+    q = y0[:, :k].copy()
+    p = y0[:, k:].copy()
+    with np.errstate(all='ignore'):
+        a = force(q)
+    
+    for j in range(1, n_points):
+        idx = np.flatnonzero(status == RUNNING)
+        if len(idx) == 0:
+            break
+        if should_stop is not None and should_stop():
+            status[idx] = STOPPED
+            break
+        
+        q_i, p_i, a_i, h_i = q[idx], p[idx], a[idx], h[idx]
+        with np.errstate(all='ignore'):
+            for _ in range(substeps):
+                for w in weights:
+                    # Kick-drift-kick con la fuerza del final reutilizada
+                    p_i = p_i + (0.5 * w) * h_i * a_i
+                    q_i = q_i + w * h_i * drift(p_i)
+                    a_i = force(q_i)
+                    p_i = p_i + (0.5 * w) * h_i * a_i
+        
+        q[idx], p[idx], a[idx] = q_i, p_i, a_i
+        y = np.concatenate([q_i, p_i], axis=1)
+        
+        finite = np.isfinite(y).all(axis=1)
+        states[idx[finite], j] = y[finite]
+        n_valid[idx[finite]] = j + 1
+        status[idx[~finite]] = FAILED
+        
+        escaped = finite & (np.abs(np.where(finite[:, None], y, 0.0)).max(axis=1) > max_norm)
+        status[idx[escaped]] = ESCAPED
+    
+    status[status == RUNNING] = FINISHED
+    
+    return {
+        't': direction[:, None] * s_samples,
+        'states': states,
+        'n_valid': n_valid,
+        'status': status,
+        'success': status == FINISHED,
+    }
@@ -0,0 +1,197 @@
+"""
+Espectro de Lyapunov por ecuaciones variacionales.
+
+Integra a la vez el estado X' = F(X) y la dinámica tangente Q' = J(X) Q
+con RK4 de paso fijo, sobre un ensemble de condiciones iniciales (y, si
+se quiere, de valores de parámetros). Cada cierto tiempo se
+re-ortonormaliza Q con una factorización QR en lote y se acumulan los
+logaritmos de la diagonal de R. Los miembros cuyas estimaciones se
+estabilizan dejan de integrarse.
+"""
+
+import numpy as np
+
+
+def _rk4_state(field, X, idx, h):
+    """Un paso de RK4 solo del estado."""
+    k1 = field(X, idx)
+    k2 = field(X + 0.5 * h * k1, idx)
+    k3 = field(X + 0.5 * h * k2, idx)
+    k4 = field(X + h * k3, idx)
+    return X + (h / 6) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def _rk4_tangent(field, jacobian, X, Q, idx, h):
+    """Un paso de RK4 del estado y de la matriz tangente (N, n, n)."""
+    k1 = field(X, idx)
+    l1 = jacobian(X, idx) @ Q
+    X2 = X + 0.5 * h * k1
+    k2 = field(X2, idx)
+    l2 = jacobian(X2, idx) @ (Q + 0.5 * h * l1)
+    X3 = X + 0.5 * h * k2
+    k3 = field(X3, idx)
+    l3 = jacobian(X3, idx) @ (Q + 0.5 * h * l2)
+    X4 = X + h * k3
+    k4 = field(X4, idx)
+    l4 = jacobian(X4, idx) @ (Q + h * l3)
+    return (X + (h / 6) * (k1 + 2 * k2 + 2 * k3 + k4),
+            Q + (h / 6) * (l1 + 2 * l2 + 2 * l3 + l4))
+
+
+def lyapunov_spectrum(field, jacobian, y0, dt=0.01, t_transient=10.0, t_max=200.0,
+                      t_min=20.0, renorm_interval=0.1, check_interval=5.0, tol=1e-3,
+                      n_exponents=None, settle_tol=1e-8, should_stop=None):
+    """
+    Espectro completo de Lyapunov de un ensemble.
+    
+    Args:
+        field: Función (X, idx) -> F(X); X es (K, n) e idx los índices
+               de los miembros (para parámetros por miembro)
+        jacobian: Función (X, idx) -> J(X) de forma (K, n, n)
+        y0: Condiciones iniciales (N, n)
+        dt: Paso de RK4
+        t_transient: Tiempo que se integra solo el estado para llegar
+                     al atractor antes de medir
+        t_max: Tiempo máximo de medición
+        t_min: Tiempo mínimo de medición antes de permitir la parada
+        renorm_interval: Tiempo entre re-ortonormalizaciones QR
+        check_interval: Tiempo entre controles de convergencia
+        tol: Cambio máximo de las estimaciones entre dos controles
+             consecutivos para dar un miembro por convergido
+        n_exponents: Cuántos exponentes calcular (None = todos); con 1
+                     solo se sigue un vector tangente
+        settle_tol: Los miembros con |F(X)| menor (ya en un equilibrio)
+                    se resuelven con los autovalores de J y dejan de
+                    integrarse; None = desactivado
+        should_stop: Función de cancelación cooperativa
+    
+    Returns:
+        dict con:
+        - 'exponents': (N, k) exponentes en orden decreciente
+        - 'time': (N,) tiempo de medición de cada miembro
+        - 'change': (N,) último cambio entre controles (diagnóstico)
+        - 'converged': (N,) True si se estabilizó antes de t_max
+        - 'diverged': (N,) True si el estado o la tangente dejaron de ser finitos
+        - 'settled': (N,) True si se resolvió en un equilibrio
+        - 'history': (n_checks, N, k) estimaciones en cada control
+        - 'sum': (N,) suma de los exponentes (≈ divergencia media del flujo)
+    """
+    X = np.atleast_2d(np.array(y0, dtype=float))
+    n_members, n = X.shape
+    k = n if n_exponents is None else min(int(n_exponents), n)
+    all_idx = np.arange(n_members)
+    
+    steps_renorm = max(1, int(round(renorm_interval / dt)))
+    renorms_check = max(1, int(round(check_interval / (steps_renorm * dt))))
+    n_checks_max = max(1, int(np.ceil(t_max / (renorms_check * steps_renorm * dt))))
+    
+    with np.errstate(all='ignore'):
+        # Transitorio: solo el estado
+        for _ in range(int(round(t_transient / dt))):
+            X = _rk4_state(field, X, all_idx, dt)
+        
+        Q = np.broadcast_to(np.eye(n)[:, :k], (n_members, n, k)).copy()
+        log_sums = np.zeros((n_members, k))
+        elapsed = np.zeros(n_members)
+        previous = np.full((n_members, k), np.nan)
+        change = np.full(n_members, np.inf)
+        diverged = ~np.isfinite(X).all(axis=1)
+        converged = np.zeros(n_members, dtype=bool)
+        settled = np.zeros(n_members, dtype=bool)
+        history = []
+        
+        def settle(members):
+            """Resuelve con autovalores los miembros que ya están en reposo."""
+            if settle_tol is None or len(members) == 0:
+                return
+            speed = np.sqrt(np.sum(field(X[members], members)**2, axis=1))
+            members = members[speed < settle_tol]
+            if len(members) == 0:
+                return
+            eigenvalues = np.linalg.eigvals(jacobian(X[members], members))
+            real = -np.sort(-np.real(eigenvalues), axis=1)[:, :k]
+            log_sums[members] = real
+            elapsed[members] = 1.0
+            change[members] = 0.0
+            converged[members] = True
+            settled[members] = True
+        
+        settle(np.flatnonzero(~diverged))
+        
+        for _ in range(n_checks_max):
+            active = np.flatnonzero(~converged & ~diverged)
+            if len(active) == 0:
+                break
+            if should_stop is not None and should_stop():
+                break
+            
+            X_a, Q_a = X[active], Q[active]
+            for _ in range(renorms_check):
+                for _ in range(steps_renorm):
+                    X_a, Q_a = _rk4_tangent(field, jacobian, X_a, Q_a, active, dt)
+                
+                # Re-ortonormalización en lote
+                bad = ~(np.isfinite(X_a).all(axis=1) & np.isfinite(Q_a).all(axis=(1, 2)))
+                Q_a[bad] = np.eye(n)[:, :k]
+                Q_a, R = np.linalg.qr(Q_a)
+                diag = np.diagonal(R, axis1=1, axis2=2)
+                signs = np.where(diag < 0, -1.0, 1.0)
+                Q_a = Q_a * signs[:, None, :]
+                log_sums[active] += np.log(np.abs(diag))
+                log_sums[active[bad]] = np.nan
+                diverged[active[bad]] = True
+                elapsed[active] += steps_renorm * dt
+            
+            X[active], Q[active] = X_a, Q_a
+            
+            estimate = log_sums / np.maximum(elapsed, dt)[:, None]
+            change[active] = np.abs(estimate[active] - previous[active]).max(axis=1)
+            previous[active] = estimate[active]
+            history.append(estimate.copy())
+            
+            converged[active] = (change[active] < tol) & (elapsed[active] >= t_min)
+            settle(active[~converged[active] & ~diverged[active]])
+    
+    exponents = log_sums / np.maximum(elapsed, dt)[:, None]
+    exponents[diverged] = np.nan
+    exponents = -np.sort(-exponents, axis=1)
+    
+    return {
+        'exponents': exponents,
+        'time': elapsed,
+        'change': change,
+        'converged': converged,
+        'diverged': diverged,
+        'settled': settled,
+        'history': np.array(history).reshape(-1, n_members, k),
+        'sum': exponents.sum(axis=1),
+    }
+
+
+def classify_regime(exponents, tol=0.01):
+    """
+    Clasifica el régimen dinámico por el signo de los exponentes.
+    
+    Args:
+        exponents: Array (n,) en orden decreciente (o (N, n))
+        tol: Margen para considerar nulo un exponente
+    
+    Returns:
+        str (o lista de str): 'Caótico', 'Cuasiperiódico', 'Ciclo límite',
+        'Punto fijo' o 'Divergente'
+    """
+    exponents = np.asarray(exponents, dtype=float)
+    if exponents.ndim == 2:
+        return [classify_regime(e, tol) for e in exponents]
+    
+    if not np.isfinite(exponents).all():
+        return 'Divergente'
+    
+    n_zero = np.sum(np.abs(exponents) <= tol)
+    if exponents[0] > tol:
+        return 'Caótico'
+    if n_zero >= 2:
+        return 'Cuasiperiódico'
+    if n_zero == 1:
+        return 'Ciclo límite'
+    return 'Punto fijo'
@@ -0,0 +1,263 @@
+"""
+Secciones de Poincaré con detección de cruces en lote.
+
+Sobre los pasos aceptados de Dormand-Prince (core.integrators) se evalúa
+la superficie g(X) = 0 en todos los miembros del ensemble a la vez. Cada
+cambio de signo se refina con regula falsi (variante de Illinois) sobre
+la interpolación cúbica de Hermite del paso, de modo que solo se guardan
+los puntos de la sección y nunca la trayectoria completa. Los puntos se
+entregan en bloques, lo que permite recorrer integraciones muy largas con
+memoria acotada.
+
+Para pocas trayectorias el costo fijo por paso del integrador en lote no
+se amortiza; en ese caso cada una se avanza por separado con DOP853 de
+SciPy (orden 8, pasos mucho más largos) y se refina cada cruce sobre su
+salida densa.
+
+Es un motor de biblioteca: ninguna pestaña lo usa todavía. Se accede
+desde DynamicSystemND.poincare_section e iter_poincare_section (p. ej.
+para los sistemas de core.systems_3d), y está pensado para lanzarse con
+un JobRunner pasando job.should_stop.
+"""
+
+import numpy as np
+
+from core.integrators import (ESCAPED, FAILED, FINISHED, STOPPED, dopri5_steps,
+                              hermite_interpolate)
+
+# Por debajo de este número de trayectorias, DOP853 una por una es más
+# rápido que el lote (Lorenz, t = 200: 8 miembros 11.5 s contra 14.3 s;
+# 16 miembros 20.1 s contra 16.7 s)
+MIN_BATCH = 12
+
+
+def plane_surface(normal, offset=0.0):
+    """
+    Superficie plana n·X = offset.
+    
+    Returns:
+        Función (K, d) -> (K,)
+    """
+    normal = np.asarray(normal, dtype=float)
+    
+    def surface(X):
+        return X @ normal - offset
+    
+    return surface
+
+
+def _refine_crossings(surface, s0, y0, f0, s1, y1, f1, g0, g1, tol=1e-12,
+                      max_iter=50):
+    """
+    Raíz de g sobre la interpolación de Hermite de cada paso.
+    
+    Returns:
+        (s, X): instantes (K,) y estados (K, d) de los cruces
+    """
+    a, b = s0.copy(), s1.copy()
+    ga, gb = g0.copy(), g1.copy()
+    s = b.copy()
+    X = y1.copy()
+    active = np.arange(len(s0))
+    
+    with np.errstate(all='ignore'):
+        for _ in range(max_iter):
+            if len(active) == 0:
+                break
+            
+            a_i, b_i, ga_i, gb_i = a[active], b[active], ga[active], gb[active]
+            c = (a_i * gb_i - b_i * ga_i) / (gb_i - ga_i)
+            inside = np.isfinite(c) & (c > np.minimum(a_i, b_i)) & (c < np.maximum(a_i, b_i))
+            c = np.where(inside, c, 0.5 * (a_i + b_i))
+            
+            Xc = hermite_interpolate(s0[active], y0[active], f0[active],
+                                     s1[active], y1[active], f1[active], c)
+            gc = surface(Xc)
+            s[active], X[active] = c, Xc
+            
+            # Illinois: si el extremo a se repite, se divide su valor por 2
+            crossed = gc * gb_i < 0
+            a[active] = np.where(crossed, b_i, a_i)
+            ga[active] = np.where(crossed, gb_i, 0.5 * ga_i)
+            b[active], gb[active] = c, gc
+            
+            scale = np.maximum(np.abs(s1[active] - s0[active]), 1e-300)
+            done = (np.abs(gc) <= tol) | (np.abs(b[active] - a[active]) <= tol * scale) | ~np.isfinite(gc)
+            active = active[~done]
+    
+    return s, X
+
+
+def poincare_crossings(rhs, surface, y0, t_end, direction=1, t_transient=0.0,
+                       max_crossings=None, chunk_size=4096, rtol=1e-8, atol=1e-10,
+                       max_norm=1e6, max_steps=None, should_stop=None, status=None,
+                       scalar_rhs=None, min_batch=MIN_BATCH):
+    """
+    Generador de cruces de un ensemble con la superficie g(X) = 0.
+    
+    Args:
+        rhs: Función (K, d) -> (K, d)
+        surface: Función (K, d) -> (K,) que define la superficie g = 0
+        y0: Condiciones iniciales (N, d)
+        t_end: Tiempo de integración por miembro (N,) o escalar
+        direction: 1 = cruces con g creciente, -1 = decreciente, 0 = ambos
+        t_transient: Los cruces anteriores a este tiempo se descartan
+        max_crossings: Un miembro deja de integrarse al llegar a este
+                       número de cruces (None = sin límite)
+        chunk_size: Puntos acumulados antes de entregar un bloque
+        rtol, atol: Tolerancias de Dormand-Prince
+        max_norm: Umbral de escape
+        max_steps: Máximo de pasos del ensemble (None = sin límite)
+        should_stop: Función de cancelación cooperativa
+        status: Array (N,) que se actualiza con el estado de cada miembro
+        scalar_rhs: Función (t, y) -> dy/dt para un solo estado; si se da
+                    y N < min_batch, cada miembro se integra por separado
+                    con DOP853 de SciPy
+        min_batch: Miembros a partir de los cuales conviene el lote
+    
+    Yields:
+        dict con 'index' (K,) miembro, 't' (K,) instante y 'points' (K, d)
+        de cada cruce, en el orden en que se detectan (con DOP853, un
+        miembro tras otro)
+    """
+    y0 = np.atleast_2d(np.asarray(y0, dtype=float))
+    n, d = y0.shape
+    t_end = np.broadcast_to(np.asarray(t_end, dtype=float), (n,)).copy()
+    if status is None:
+        status = np.zeros(n, dtype=int)
+    
+    if scalar_rhs is not None and n < min_batch:
+        for member in range(n):
+            yield from _single_crossings(
+                scalar_rhs, surface, y0[member], t_end[member], direction, t_transient,
+                max_crossings, chunk_size, rtol, atol, max_norm, should_stop, status,
+                member)
+            if status[member] == STOPPED:
+                status[status == 0] = STOPPED
+                return
+        return
+    
+    with np.errstate(all='ignore'):
+        g_prev = np.array(surface(y0), dtype=float)
+    counts = np.zeros(n, dtype=int)
+    chunks = []
+    pending = 0
+    
+    steps = dopri5_steps(rhs, y0, t_end, rtol=rtol, atol=atol,
+                         max_steps=max_steps or 2**62, max_norm=max_norm,
+                         should_stop=should_stop, status=status)
+    
+    for step in steps:
+        idx = step['index']
+        with np.errstate(all='ignore'):
+            g1 = np.asarray(surface(step['y1']), dtype=float)
+        g0 = g_prev[idx]
+        g_prev[idx] = g1
+        
+        hit = np.zeros(len(idx), dtype=bool)
+        if direction >= 0:
+            hit |= (g0 < 0) & (g1 >= 0)
+        if direction <= 0:
+            hit |= (g0 > 0) & (g1 <= 0)
+        hit &= step['s1'] >= t_transient
+        if not hit.any():
+            continue
+        
+        local = np.flatnonzero(hit)
+        t, points = _refine_crossings(
+            surface, step['s0'][local], step['y0'][local], step['f0'][local],
+            step['s1'][local], step['y1'][local], step['f1'][local],
+            g0[local], g1[local]
+        )
+        keep = t >= t_transient
+        members = idx[local[keep]]
+        if len(members) == 0:
+            continue
+        
+        chunks.append((members, t[keep], points[keep]))
+        pending += len(members)
+        
+        if max_crossings is not None:
+            counts[members] += 1
+            status[members[counts[members] >= max_crossings]] = FINISHED
+        
+        if pending >= chunk_size:
+            yield _join_chunks(chunks, d)
+            chunks, pending = [], 0
+    
+    if pending:
+        yield _join_chunks(chunks, d)
+
+
+def _single_crossings(rhs, surface, y0, t_end, direction, t_transient, max_crossings,
+                      chunk_size, rtol, atol, max_norm, should_stop, status, member=0):
+    """Cruces de un miembro del ensemble con DOP853 y su salida densa."""
+    from scipy.integrate import DOP853
+    from scipy.optimize import brentq
+    
+    def g(y):
+        return float(surface(y[None])[0])
+    
+    solver = DOP853(rhs, 0.0, y0, t_end, rtol=rtol, atol=atol)
+    g_prev = g(y0)
+    times, points = [], []
+    count = 0
+    
+    while solver.status == 'running':
+        if should_stop is not None and should_stop():
+            status[member] = STOPPED
+            break
+        solver.step()
+        if solver.status == 'failed' or not np.isfinite(solver.y).all():
+            status[member] = FAILED
+            break
+        if np.abs(solver.y).max() > max_norm:
+            status[member] = ESCAPED
+            break
+        
+        g_new = g(solver.y)
+        hit = ((direction >= 0 and g_prev < 0 <= g_new) or
+               (direction <= 0 and g_prev > 0 >= g_new))
+        g_prev = g_new
+        if not hit or solver.t < t_transient:
+            continue
+        
+        dense = solver.dense_output()
+        try:
+            t = brentq(lambda s: g(dense(s)), solver.t_old, solver.t,
+                       xtol=1e-12 * max(1.0, abs(solver.t)))
+        except ValueError:
+            t = solver.t
+        if t < t_transient:
+            continue
+        
+        times.append(t)
+        points.append(dense(t))
+        count += 1
+        
+        if len(times) >= chunk_size:
+            yield _single_chunk(member, times, points)
+            times, points = [], []
+        if max_crossings is not None and count >= max_crossings:
+            break
+    
+    if status[member] == 0:
+        status[member] = FINISHED
+    if times:
+        yield _single_chunk(member, times, points)
+
+
+def _single_chunk(member, times, points):
+    return {
+        'index': np.full(len(times), member, dtype=int),
+        't': np.array(times),
+        'points': np.array(points),
+    }
+
+
+def _join_chunks(chunks, d):
+    return {
+        'index': np.concatenate([c[0] for c in chunks]),
+        't': np.concatenate([c[1] for c in chunks]),
+        'points': np.concatenate([c[2] for c in chunks]).reshape(-1, d),
+    }
@@ -0,0 +1,412 @@
+"""
+Mapas de régimen en dos parámetros.
+
+Para cada punto de una malla (p. ej. ρ × σ en Lorenz o a × c en Rössler)
+se estima el mayor exponente de Lyapunov y, a partir de su signo, el
+régimen: punto fijo, ciclo límite o caótico.
+
+La malla se divide en teselas. Cada tesela es un único ensemble que se
+integra en lote (core.lyapunov, con un vector tangente y con parada
+temprana de los miembros que caen en un equilibrio) dentro de un proceso
+del pool compartido de core.sweeps. Los resultados se escriben directamente en un
+buffer de memoria compartida, el progreso se guarda en un checkpoint .npz
+para poder reanudar, y el generador iter_tiles permite dibujar el mapa a
+medida que terminan las teselas.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.sweeps import _discard_executor, _get_executor
+
+
+# Sistemas disponibles para los mapas
+SYSTEMS = ('LorenzSystem', 'RosslerSystem', 'ChuaSystem')
+
+# Códigos de régimen guardados en el mapa de etiquetas
+REGIME_CODES = {
+    'Divergente': -1,
+    'Punto fijo': 0,
+    'Ciclo límite': 1,
+    'Caótico': 2,
+}
+
+# Opciones por defecto de la estimación: paso grueso (basta el signo de
+# λ1), pero transitorio y medición mínima largos, porque en los ciclos
+# límite el sesgo de λ1 decae solo como 1/T
+DEFAULT_OPTIONS = {
+    'dt': 0.02,
+    't_transient': 50.0,
+    't_max': 150.0,
+    't_min': 50.0,
+    'check_interval': 5.0,
+    'tol': 5e-3,
+}
+
+# Sistemas ya construidos en este proceso: (nombre, kwargs) -> sistema
+_BUILT = {}
+
+
+def _build_system(name, kwargs):
+    key = (name, tuple(sorted(kwargs.items())))
+    if key not in _BUILT:
+        from core import systems_3d
+        _BUILT[key] = getattr(systems_3d, name)(**kwargs)
+    return _BUILT[key]
+
+
+def _compute_tile(job, tile, shm_name=None):
+    """
+    Calcula una tesela (se ejecuta dentro de cada proceso).
+    
+    Si shm_name no es None escribe λ1 en el buffer compartido y no
+    retorna datos; si no, retorna el bloque calculado.
+    """
+    iy0, iy1, ix0, ix1 = tile
+    system = _build_system(job['system'], job['kwargs'])
+    
+    vx = np.asarray(job['values_x'][ix0:ix1], dtype=float)
+    vy = np.asarray(job['values_y'][iy0:iy1], dtype=float)
+    PX, PY = np.meshgrid(vx, vy)
+    n_members = PX.size
+    
+    X0 = np.tile(np.asarray(job['initial_condition'], dtype=float), (n_members, 1))
+    result = system.lyapunov_spectrum(
+        X0, parameters={job['param_x']: PX.ravel(), job['param_y']: PY.ravel()},
+        n_exponents=1, **job['options']
+    )
+    block = result['exponents'][:, 0].reshape(PX.shape)
+    
+    if shm_name is None:
+        return block
+    
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(job['shape'], dtype=float, buffer=shm.buf)
+        out[iy0:iy1, ix0:ix1] = block
+        del out
+    finally:
+        shm.close()
+    return None
+
+
+def regime_codes(lambda_max, tol=0.01):
+    """
+    Etiquetas de régimen a partir del mayor exponente (vectorizado).
+    
+    Returns:
+        Array de enteros con los valores de REGIME_CODES
+    """
+    lam = np.asarray(lambda_max, dtype=float)
+    codes = np.full(lam.shape, REGIME_CODES['Divergente'], dtype=np.int8)
+    codes[lam < -tol] = REGIME_CODES['Punto fijo']
+    codes[np.abs(lam) <= tol] = REGIME_CODES['Ciclo límite']
+    codes[lam > tol] = REGIME_CODES['Caótico']
+    return codes
+
+
+class RegimeMap:
+    """
+    Mapa de λ1 sobre una malla de dos parámetros, por teselas.
+    
+    Ejemplo:
+        rmap = RegimeMap('LorenzSystem', 'rho', np.linspace(0, 200, 500),
+                         'sigma', np.linspace(1, 30, 500),
+                         checkpoint='lorenz_rho_sigma.npz')
+        for tile in rmap.iter_tiles():
+            image.set_data(rmap.lambda_max)
+    """
+    
+    def __init__(self, system, param_x, values_x, param_y, values_y,
+                 system_kwargs=None, initial_condition=(1.0, 1.0, 1.0),
+                 tile_size=32, checkpoint=None, checkpoint_interval=10.0,
+                 max_workers=None, **options):
+        """
+        Args:
+            system: Nombre de la clase del sistema (ver SYSTEMS)
+            param_x, param_y: Nombres de los parámetros de los ejes
+            values_x, values_y: Valores de cada eje
+            system_kwargs: Valores fijos del resto de parámetros
+            initial_condition: Condición inicial común a toda la malla
+            tile_size: Lado de las teselas (puntos)
+            checkpoint: Ruta del .npz de progreso (None = sin checkpoint)
+            checkpoint_interval: Segundos mínimos entre escrituras
+            max_workers: Número de procesos (None = núcleos disponibles)
+            **options: Opciones de core.lyapunov.lyapunov_spectrum
+        """
+        if system not in SYSTEMS:
+            raise ValueError(f"Sistema desconocido: {system}")
+        
+        parameters = _build_system(system, dict(system_kwargs or {})).parameters
+        for name in (param_x, param_y):
+            if name not in parameters:
+                raise ValueError(f"Parámetro desconocido: {name}")
+        if param_x == param_y:
+            raise ValueError("Los dos ejes deben ser parámetros distintos")
+        
+        self.values_x = np.asarray(values_x, dtype=float)
+        self.values_y = np.asarray(values_y, dtype=float)
+        self.shape = (len(self.values_y), len(self.values_x))
+        self.tile_size = max(1, int(tile_size))
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.max_workers = max_workers or os.cpu_count() or 1
+        
+        self.job = {
+            'system': system,
+            'kwargs': dict(system_kwargs or {}),
+            'param_x': param_x,
+            'param_y': param_y,
+            'values_x': self.values_x.tolist(),
+            'values_y': self.values_y.tolist(),
+            'initial_condition': [float(v) for v in initial_condition],
+            'options': dict(DEFAULT_OPTIONS, **options),
+            'shape': self.shape,
+        }
+        
+        self.tiles = [
+            (iy, min(iy + self.tile_size, self.shape[0]),
+             ix, min(ix + self.tile_size, self.shape[1]))
+            for iy in range(0, self.shape[0], self.tile_size)
+            for ix in range(0, self.shape[1], self.tile_size)
+        ]
+        self.lambda_max = np.full(self.shape, np.nan)
+        self.done = np.zeros(len(self.tiles), dtype=bool)
+        
+        if checkpoint is not None:
+            self._load_checkpoint()
+    
+    def _signature(self):
+        """Identifica la configuración del mapa (para validar checkpoints)."""
+        job = {k: v for k, v in self.job.items() if k != 'shape'}
+        return json.dumps([job, self.tile_size], sort_keys=True)
+    
+    def _load_checkpoint(self):
+        try:
+            with np.load(self.checkpoint) as data:
+                if str(data['signature']) != self._signature():
+                    return False
+                lambda_max, done = data['lambda_max'], data['done']
+        except (OSError, KeyError, ValueError):
+            return False
+        
+        if lambda_max.shape != self.shape or done.shape != self.done.shape:
+            return False
+        self.lambda_max[...] = lambda_max
+        self.done[...] = done
+        return True
+    
+    def save_checkpoint(self):
+        """Guarda el progreso (escritura atómica). Retorna False si falla."""
+        if self.checkpoint is None:
+            return False
+        tmp_path = f"{self.checkpoint}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, lambda_max=self.lambda_max, done=self.done,
+                         signature=np.array(self._signature()))
+            os.replace(tmp_path, self.checkpoint)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        return True
+    
+    @property
+    def progress(self):
+        """Fracción de teselas terminadas."""
+        return float(self.done.mean()) if len(self.done) else 1.0
+    
+    def labels(self, tol=0.01):
+        """Mapa de códigos de régimen (REGIME_CODES); NaN pendientes = -1."""
+        return regime_codes(self.lambda_max, tol)
+    
+    def iter_tiles(self, should_stop=None):
+        """
+        Calcula las teselas pendientes y genera (iy0, iy1, ix0, ix1) a
+        medida que terminan; lambda_max ya contiene el bloque.
+        
+        Args:
+            should_stop: Función de cancelación; las teselas en curso se
+                         descartan y el progreso queda en el checkpoint
+        """
+        pending = list(np.flatnonzero(~self.done))
+        if not pending:
+            return
+        
+        if self.max_workers == 1 or len(pending) == 1:
+            yield from self._iter_serial(pending, should_stop)
+            return
+        
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=self.lambda_max.nbytes)
+        except (OSError, ValueError):
+            yield from self._iter_serial(pending, should_stop)
+            return
+        
+        last_save = time.monotonic()
+        
+        try:
+            buffer = np.ndarray(self.shape, dtype=float, buffer=shm.buf)
+            buffer[...] = self.lambda_max
+            
+            executor = _get_executor(self.max_workers)
+            if executor is None:
+                del buffer
+                yield from self._iter_serial(pending, should_stop)
+                return
+            
+            futures = {}
+            try:
+                futures = {executor.submit(_compute_tile, self.job, self.tiles[i], shm.name): i
+                           for i in pending}
+                    
+                for future in as_completed(futures):
+                    i = futures[future]
+                    future.result()
+                    iy0, iy1, ix0, ix1 = tile = self.tiles[i]
+                    self.lambda_max[iy0:iy1, ix0:ix1] = buffer[iy0:iy1, ix0:ix1]
+                    self.done[i] = True
+                        
+                    if time.monotonic() - last_save >= self.checkpoint_interval:
+                        self.save_checkpoint()
+                        last_save = time.monotonic()
+                    yield tile
+                        
+                    if should_stop is not None and should_stop():
+                        break
+            except (BrokenProcessPool, OSError):
+                _discard_executor(executor)
+            finally:
+                # Al detener (o abandonar el generador) las teselas que no
+                # empezaron se cancelan; las que están en curso se esperan
+                # antes de liberar la memoria compartida
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+            del buffer
+        finally:
+            shm.close()
+            shm.unlink()
+            self.save_checkpoint()
+        
+        # El pool se rompió: completar en este proceso lo que falta
+        if not (should_stop is not None and should_stop()):
+            yield from self._iter_serial(list(np.flatnonzero(~self.done)), should_stop)
+    
+    def _iter_serial(self, pending, should_stop):
+        last_save = time.monotonic()
+        try:
+            for i in pending:
+                if should_stop is not None and should_stop():
+                    break
+                iy0, iy1, ix0, ix1 = tile = self.tiles[i]
+                self.lambda_max[iy0:iy1, ix0:ix1] = _compute_tile(self.job, tile)
+                self.done[i] = True
+                
+                if time.monotonic() - last_save >= self.checkpoint_interval:
+                    self.save_checkpoint()
+                    last_save = time.monotonic()
+                yield tile
+        finally:
+            self.save_checkpoint()
+    
+    def run(self, progress_callback=None, should_stop=None):
+        """
+        Calcula el mapa completo.
+        
+        Args:
+            progress_callback: Función (teselas_hechas, total) llamada al
+                               terminar cada tesela
+        
+        Returns:
+            dict con 'lambda_max' (ny, nx), 'labels', 'values_x',
+            'values_y' y 'complete'
+        """
+        for _ in self.iter_tiles(should_stop):
+            if progress_callback:
+                progress_callback(int(self.done.sum()), len(self.tiles))
+        
+        return {
+            'lambda_max': self.lambda_max,
+            'labels': self.labels(),
+            'values_x': self.values_x,
+            'values_y': self.values_y,
+            'complete': bool(self.done.all()),
+        }
+
+
+def render_regime_map(regime_map, ax, kind='lambda', draw_callback=None,
+                      should_stop=None):
+    """
+    Dibuja el mapa de forma progresiva mientras se calcula.
+    
+    Args:
+        regime_map: RegimeMap
+        ax: Eje de matplotlib
+        kind: 'lambda' (mapa de λ1) o 'label' (régimen)
+        draw_callback: Función llamada tras actualizar cada tesela
+                       (p. ej. canvas.draw_idle)
+        should_stop: Función de cancelación
+    
+    Returns:
+        El AxesImage creado
+    """
+    from matplotlib.colors import BoundaryNorm, ListedColormap
+    
+    extent = (regime_map.values_x[0], regime_map.values_x[-1],
+              regime_map.values_y[0], regime_map.values_y[-1])
+    
+    if kind == 'label':
+        cmap = ListedColormap(['#444444', '#2166ac', '#4dac26', '#d7191c'])
+        norm = BoundaryNorm([-1.5, -0.5, 0.5, 1.5, 2.5], cmap.N)
+        
+        def data():
+            codes = regime_map.labels().astype(float)
+            codes[np.isnan(regime_map.lambda_max) & ~_done_mask(regime_map)] = np.nan
+            return codes
+        
+        image = ax.imshow(data(), origin='lower', extent=extent, aspect='auto',
+                          cmap=cmap, norm=norm, interpolation='nearest')
+    else:
+        def data():
+            return regime_map.lambda_max
+        
+        image = ax.imshow(data(), origin='lower', extent=extent, aspect='auto',
+                          cmap='RdBu_r', interpolation='nearest')
+        image.set_clim(-1.0, 1.0)
+    
+    job = regime_map.job
+    ax.set_xlabel(job['param_x'])
+    ax.set_ylabel(job['param_y'])
+    ax.set_title(f"{job['system']}: "
+                 f"{'régimen' if kind == 'label' else 'mayor exponente de Lyapunov'}")
+    
+    for _ in regime_map.iter_tiles(should_stop):
+        image.set_data(data())
+        if kind != 'label':
+            finite = regime_map.lambda_max[np.isfinite(regime_map.lambda_max)]
+            if finite.size:
+                limit = max(np.abs(finite).max(), 1e-3)
+                image.set_clim(-limit, limit)
+        if draw_callback:
+            draw_callback()
+    
+    return image
+
+
+def _done_mask(regime_map):
+    """Máscara (ny, nx) de los puntos de teselas terminadas."""
+    mask = np.zeros(regime_map.shape, dtype=bool)
+    for i in np.flatnonzero(regime_map.done):
+        iy0, iy1, ix0, ix1 = regime_map.tiles[i]
+        mask[iy0:iy1, ix0:ix1] = True
+    return mask
@@ -0,0 +1,418 @@
+"""
+Escenas de matplotlib organizadas en capas.
+
+Cada capa (campo, nullclines, equilibrios, trayectorias, curvas de
+energía) es dueña de sus artistas y recuerda la clave de las entradas
+con que se calculó. Al redibujar, una capa cuya clave no cambió solo se
+muestra u oculta; las demás actualizan sus artistas en el lugar
+(set_UVC, set_segments, set_offsets, set_data) en vez de limpiar los
+ejes y crearlos de nuevo. Así, ocultar el campo vectorial no vuelve a
+integrar ni a dibujar las trayectorias.
+"""
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.collections import LineCollection
+
+from core.systems_2d import compute_phase_plot
+
+# Colores de las trayectorias (por índice de condición inicial)
+TRAJECTORY_COLORS = colormaps['tab10'].colors
+
+
+class SceneLayer:
+    """Capa de una escena: datos, clave de sus entradas y artistas."""
+    
+    def __init__(self, name):
+        self.name = name
+        self.key = None
+        self.data = None
+        self.artists = {}
+        self.visible = True
+    
+    def iter_artists(self):
+        """Recorre los artistas de la capa (los valores pueden ser listas)."""
+        for artist in self.artists.values():
+            if isinstance(artist, list):
+                yield from artist
+            elif artist is not None:
+                yield artist
+    
+    def set_visible(self, visible):
+        self.visible = visible
+        for artist in self.iter_artists():
+            artist.set_visible(visible)
+    
+    def remove(self):
+        """Quita los artistas de los ejes y olvida los datos."""
+        for artist in self.iter_artists():
+            artist.remove()
+        self.artists = {}
+        self.key = None
+        self.data = None
+
+
+class Scene:
+    """
+    Conjunto ordenado de capas sobre unos ejes.
+    
+    Las subclases definen LAYERS y un método _draw_<capa>(layer, data)
+    que crea o actualiza en el lugar los artistas de cada capa.
+    """
+    
+    LAYERS = ()
+    
+    def __init__(self, ax):
+        self.ax = ax
+        self.layers = {name: SceneLayer(name) for name in self.LAYERS}
+        self.setup_axes()
+    
+    def setup_axes(self):
+        """Decoración fija de los ejes (se aplica una sola vez)."""
+    
+    def cached(self):
+        """
+        dict capa -> (clave, datos) de lo que está dibujado; se puede
+        tomar en el hilo de Tk y pasar a un cálculo en segundo plano.
+        """
+        return {name: (layer.key, layer.data)
+                for name, layer in self.layers.items() if layer.key is not None}
+    
+    def update_layer(self, name, key, data):
+        """
+        Actualiza una capa.
+        
+        Args:
+            name: Nombre de la capa
+            key: Clave de las entradas (None = desconocida, siempre redibuja)
+            data: Datos a dibujar; None oculta la capa conservando lo dibujado
+        
+        Returns:
+            True si se actualizaron los artistas
+        """
+        layer = self.layers[name]
+        if data is None:
+            layer.set_visible(False)
+            return False
+        
+        changed = key is None or key != layer.key or not layer.artists
+        if changed:
+            getattr(self, f'_draw_{name}')(layer, data)
+            layer.key, layer.data = key, data
+        layer.set_visible(True)
+        return changed
+    
+    def set_visible(self, name, visible):
+        """Muestra u oculta una capa sin recalcularla."""
+        self.layers[name].set_visible(visible)
+    
+    def clear(self):
+        """Quita todas las capas (la decoración de los ejes se conserva)."""
+        for layer in self.layers.values():
+            layer.remove()
+    
+    def _sync_list(self, layer, name, items, create, update):
+        """
+        Ajusta una lista de artistas de la capa a len(items): reutiliza
+        los existentes con update(artista, item), crea los que faltan con
+        create(item) y quita los sobrantes.
+        """
+        artists = layer.artists.setdefault(name, [])
+        while len(artists) > len(items):
+            artists.pop().remove()
+        for i, item in enumerate(items):
+            if i < len(artists):
+                update(artists[i], item)
+            else:
+                artists.append(create(item))
+    
+    def _sync_arrows(self, layer, name, specs, **style):
+        """Flechas (x, y, dx, dy, color) reutilizadas con FancyArrow.set_data."""
+        def create(spec):
+            x, y, dx, dy, color = spec
+            return self.ax.arrow(x, y, dx, dy, fc=color, ec=color, **style)
+        
+        def update(arrow, spec):
+            x, y, dx, dy, color = spec
+            arrow.set_data(x=x, y=y, dx=dx, dy=dy)
+            arrow.set_facecolor(color)
+            arrow.set_edgecolor(color)
+        
+        self._sync_list(layer, name, specs, create, update)
+
+
+class PhaseScene(Scene):
+    """
+    Plano de fase 2D en capas.
+    
+    Ejemplo:
+        self.scene = PhaseScene(self.ax)
+        self.scene.update(system, config, self.log)
+        self.canvas.draw_idle()
+    
+    Para calcular en segundo plano: data = scene.compute(...) en el hilo
+    de trabajo (con cached tomado antes en el hilo de Tk) y
+    scene.draw(data) en el hilo de Tk.
+    """
+    
+    LAYERS = ('field', 'nullclines', 'equilibria', 'trajectories', 'energy')
+    
+    def setup_axes(self):
+        ax = self.ax
+        ax.set_xlabel('x', fontsize=12)
+        ax.set_ylabel('y', fontsize=12)
+        ax.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
+        ax.axhline(0, color='black', linewidth=0.5)
+        ax.axvline(0, color='black', linewidth=0.5)
+        ax.set_aspect('equal', adjustable='box')
+    
+    def compute(self, system, config, log_callback=None, should_stop=None, cached=None):
+        """compute_phase_plot reutilizando las capas ya dibujadas."""
+        if cached is None:
+            cached = self.cached()
+        return compute_phase_plot(system, config, log_callback, should_stop, cached)
+    
+    def draw(self, data):
+        """Dibuja (o actualiza) las capas de un resultado de compute_phase_plot."""
+        keys = data.get('keys', {})
+        for name in self.LAYERS:
+            if name == 'trajectories':
+                layer_data = (data['trajectories'], data['initial_points'])
+            else:
+                layer_data = data.get(name)
+            self.update_layer(name, keys.get(name), layer_data)
+        
+        self.ax.set_xlim(data['x_range'])
+        self.ax.set_ylim(data['y_range'])
+    
+    def update(self, system, config, log_callback=None, should_stop=None):
+        """Calcula solo las capas que cambiaron y las dibuja (hilo de Tk)."""
+        data = self.compute(system, config, log_callback, should_stop)
+        self.draw(data)
+        
+        if log_callback:
+            log_callback("✓ Simulación completada exitosamente")
+        return data
+    
+    def _draw_field(self, layer, field):
+        X, Y, U, V, M = field
+        quiver = layer.artists.get('quiver')
+        
+        # Misma grilla: solo cambian las flechas
+        if quiver is not None and layer.data is not None:
+            X_old, Y_old = layer.data[:2]
+            if X_old.shape == X.shape and np.array_equal(X_old, X) and np.array_equal(Y_old, Y):
+                quiver.set_UVC(U, V, M)
+                return
+            quiver.remove()
+        
+        layer.artists['quiver'] = self.ax.quiver(X, Y, U, V, M,
+                                                 cmap='gray',
+                                                 alpha=0.6,
+                                                 scale=30,
+                                                 width=0.003)
+    
+    def _draw_nullclines(self, layer, nullclines):
+        # dx/dt = 0 (roja) y dy/dt = 0 (azul)
+        for name, color in (('f_lines', 'red'), ('g_lines', 'blue')):
+            collection = layer.artists.get(name)
+            if collection is None:
+                collection = LineCollection([], colors=color, linewidths=2,
+                                            linestyles='--', alpha=0.7)
+                self.ax.add_collection(collection, autolim=False)
+                layer.artists[name] = collection
+            collection.set_segments(nullclines[name])
+    
+    def _draw_equilibria(self, layer, equilibria):
+        groups = {'o': ([], []), 's': ([], [])}
+        arrows = []
+        
+        for eq in equilibria:
+            x_eq, y_eq = eq['point']
+            eq_type = eq['type']
+            stability = eq['stability']
+            
+            # Color según estabilidad
+            if 'Estable' in stability and 'Inestable' not in stability:
+                color, marker = 'green', 'o'
+            elif 'silla' in eq_type.lower():
+                color, marker = 'orange', 's'
+            else:
+                color, marker = 'red', 'o'
+            groups[marker][0].append((x_eq, y_eq))
+            groups[marker][1].append(color)
+            
+            # Autovectores (verde si el autovalor es negativo)
+            if eq.get('eigen') is not None:
+                eigvals, eigvecs = eq['eigen']
+                for i in range(2):
+                    if not np.iscomplex(eigvals[i]):
+                        eigvec = np.real(eigvecs[:, i]) * 0.3
+                        arrow_color = 'green' if np.real(eigvals[i]) < 0 else 'red'
+                        arrows.append((x_eq, y_eq, eigvec[0], eigvec[1], arrow_color))
+        
+        for marker, (points, colors) in groups.items():
+            scatter = layer.artists.get(marker)
+            if scatter is None:
+                scatter = self.ax.scatter(np.empty(0), np.empty(0), s=150, marker=marker,
+                                          edgecolors='black', linewidths=2, zorder=10)
+                layer.artists[marker] = scatter
+            scatter.set_offsets(np.reshape(points, (-1, 2)))
+            scatter.set_facecolor(colors)
+        
+        self._sync_arrows(layer, 'eigen', arrows, head_width=0.03, head_length=0.045,
+                          linewidth=2, alpha=0.7, zorder=9)
+    
+    def _draw_trajectories(self, layer, data):
+        trajectories, initial_points = data
+        colors = TRAJECTORY_COLORS
+        segments = {'forward': ([], []), 'backward': ([], [])}
+        arrows = []
+        
+        for traj in trajectories:
+            color = colors[traj['index'] % len(colors)]
+            x_traj, y_traj = traj['x'], traj['y']
+            kind = 'backward' if traj['backward'] else 'forward'
+            segments[kind][0].append(np.column_stack([x_traj, y_traj]))
+            segments[kind][1].append(color)
+            
+            # Flecha de dirección en el punto medio
+            n_valid = len(x_traj)
+            mid_idx = n_valid // 2
+            if kind == 'forward' and 0 < mid_idx < n_valid - 1:
+                dx = x_traj[mid_idx + 1] - x_traj[mid_idx]
+                dy = y_traj[mid_idx + 1] - y_traj[mid_idx]
+                arrows.append((x_traj[mid_idx], y_traj[mid_idx], dx * 10, dy * 10, color))
+        
+        styles = {
+            'forward': {'linewidths': 2, 'alpha': 0.8},
+            'backward': {'linewidths': 1.5, 'alpha': 0.5, 'linestyles': '--'},
+        }
+        for kind, (lines, line_colors) in segments.items():
+            collection = layer.artists.get(kind)
+            if collection is None:
+                collection = LineCollection([], **styles[kind])
+                self.ax.add_collection(collection, autolim=False)
+                layer.artists[kind] = collection
+            collection.set_segments(lines)
+            collection.set_color(line_colors)
+        
+        self._sync_arrows(layer, 'direction', arrows, head_width=0.15, head_length=0.2,
+                          linewidth=1.5, alpha=0.8)
+        
+        # Puntos iniciales
+        scatter = layer.artists.get('initial')
+        if scatter is None:
+            scatter = self.ax.scatter(np.empty(0), np.empty(0), s=100, marker='o',
+                                      edgecolors='black', linewidths=1.5, zorder=5)
+            layer.artists['initial'] = scatter
+        scatter.set_offsets(initial_points)
+        scatter.set_facecolor([colors[idx % len(colors)] for idx in range(len(initial_points))])
+    
+    def _draw_energy(self, layer, energy):
+        style = dict({'colors': 'purple', 'alpha': 0.4, 'linewidths': 1.5}, **energy['style'])
+        collection = layer.artists.get('lines')
+        if collection is None or layer.data is None or layer.data['style'] != energy['style']:
+            if collection is not None:
+                collection.remove()
+            collection = LineCollection([], **style)
+            self.ax.add_collection(collection, autolim=False)
+            layer.artists['lines'] = collection
+        collection.set_segments([line for lines in energy['lines'] for line in lines])
+        
+        # Una etiqueta por nivel, en el medio de su curva más larga
+        labels = []
+        for level, lines in zip(energy['levels'], energy['lines']):
+            if lines:
+                longest = max(lines, key=len)
+                x, y = longest[len(longest) // 2]
+                labels.append((x, y, energy['fmt'] % level))
+        
+        def create(label):
+            x, y, text = label
+            return self.ax.text(x, y, text, fontsize=8, ha='center', va='center',
+                                color=style['colors'], clip_on=True,
+                                bbox={'boxstyle': 'round,pad=0.1', 'fc': 'white',
+                                      'ec': 'none', 'alpha': 0.7})
+        
+        def update(artist, label):
+            x, y, text = label
+            artist.set_position((x, y))
+            artist.set_text(text)
+            artist.set_color(style['colors'])
+        
+        self._sync_list(layer, 'labels', labels, create, update)
+
+
+class TrajectoryScene3D(Scene):
+    """
+    Trayectoria 3D en capas: 'trajectory' (curva y marcadores de inicio
+    y fin) y 'equilibria'. Los marcadores son Line3D, de modo que todo se
+    actualiza con set_data_3d.
+    """
+    
+    LAYERS = ('trajectory', 'equilibria')
+    
+    def __init__(self, ax, line_style=None, start_style=None, end_style=None,
+                 equilibrium_style=None):
+        """
+        Args:
+            ax: Axes 3D
+            line_style: kwargs de plot para la curva
+            start_style, end_style: kwargs de plot para los marcadores de
+                                    inicio y fin (None = sin marcador)
+            equilibrium_style: kwargs de plot para los equilibrios
+        """
+        self.styles = {
+            'line': line_style or {'color': 'blue', 'alpha': 0.8, 'linewidth': 1.2},
+            'start': start_style,
+            'end': end_style,
+            'equilibria': equilibrium_style or {
+                'color': 'red', 'marker': 'o', 'markersize': 10,
+                'markeredgecolor': 'black', 'markeredgewidth': 2,
+            },
+        }
+        super().__init__(ax)
+    
+    def setup_axes(self):
+        ax = self.ax
+        ax.grid(True, alpha=0.3)
+    
+    def draw_trajectory(self, key, x, y, z, start=None):
+        """Curva (x, y, z) desde start; key identifica sus entradas."""
+        if start is None:
+            start = (x[0], y[0], z[0])
+        if self.update_layer('trajectory', key, {'x': x, 'y': y, 'z': z, 'start': start}):
+            self.ax.auto_scale_xyz(x, y, z, had_data=False)
+    
+    def draw_equilibria(self, key, points, visible=True):
+        """Equilibrios (K, 3); visible=False los dibuja ocultos."""
+        self.update_layer('equilibria', key, np.reshape(points, (-1, 3)))
+        self.set_visible('equilibria', visible)
+    
+    def _marker(self, layer, name, style, point):
+        line = layer.artists.get(name)
+        if line is None:
+            line, = self.ax.plot([], [], [], linestyle='', **style)
+            layer.artists[name] = line
+        line.set_data_3d([point[0]], [point[1]], [point[2]])
+    
+    def _draw_trajectory(self, layer, data):
+        x, y, z = data['x'], data['y'], data['z']
+        line = layer.artists.get('line')
+        if line is None:
+            line, = self.ax.plot([], [], [], **self.styles['line'])
+            layer.artists['line'] = line
+        line.set_data_3d(x, y, z)
+        
+        if self.styles['start'] is not None:
+            self._marker(layer, 'start', self.styles['start'], data['start'])
+        if self.styles['end'] is not None:
+            self._marker(layer, 'end', self.styles['end'], (x[-1], y[-1], z[-1]))
+    
+    def _draw_equilibria(self, layer, points):
+        line = layer.artists.get('points')
+        if line is None:
+            line, = self.ax.plot([], [], [], linestyle='', **self.styles['equilibria'])
+            layer.artists['points'] = line
+        line.set_data_3d(points[:, 0], points[:, 1], points[:, 2])
@@ -0,0 +1,287 @@
+"""
+Barridos de parámetro en paralelo.
+
+Reparte una malla de valores del parámetro en bloques entre procesos.
+Las funciones lambdify no se pueden serializar, así que cada proceso
+reconstruye el sistema a partir de sus expresiones (una sola vez por
+proceso) y evalúa su bloque de valores.
+
+Todos los barridos comparten un único pool de procesos, creado en el
+primer barrido que lo necesita y reutilizado después (los procesos
+conservan los sistemas ya construidos). Un barrido solo se reparte si
+el tiempo estimado en serie supera el costo de despachar al pool.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+
+# Sistemas ya construidos en este proceso: (tarea, spec) -> objeto
+_BUILT = {}
+_BUILT_SIZE = 16
+
+# Tiempo en serie a partir del cual conviene el pool. Medido con un
+# núcleo: despachar un bloque a un pool ya creado ~0.02 s;
+# equilibria_2d tarda ~18 ms por valor y equilibria_1d ~3 ms. Así, los
+# 3 a 6 valores de la pestaña de Hopf (< 0.1 s) quedan en serie y un
+# barrido de 200 valores 2D (~3.6 s) se reparte.
+PARALLEL_MIN_SECONDS = 0.25
+
+# Costo adicional de crear el pool: cada proceso arranca un intérprete
+# nuevo (spawn) e importa NumPy y SymPy, ~1 a 1.7 s en total. Mientras
+# el pool no existe, solo se reparte si el barrido lo amortiza (los
+# 200 valores 1D de un diagrama de bifurcación, ~0.6 s, quedan en serie).
+POOL_START_SECONDS = 1.5
+
+# Los procesos se crean con 'spawn': el pool nace en un hilo de trabajo
+# y, con fork, los hijos heredarían en un estado inconsistente los locks
+# que otros hilos tuvieran tomados (la cola de la consola, imports)
+MP_CONTEXT = 'spawn'
+
+# Pool compartido por todos los barridos (ver _get_executor)
+_EXECUTOR = None
+_EXECUTOR_WORKERS = 0
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _build_analyzer_1d(spec):
+    from core.bifurcations import BifurcationAnalyzer1D
+    return BifurcationAnalyzer1D(spec['f_expr'], spec.get('param_name', 'r'))
+
+
+def _equilibria_1d(analyzer, spec, value):
+    return analyzer.find_equilibria_at_r(value, spec['x_range'],
+                                         n_seeds=spec.get('n_seeds', 30))
+
+
+def _build_system_2d(spec):
+    from core.systems_2d import CustomSystem2D
+    return CustomSystem2D(spec['dx_expr'], spec['dy_expr'],
+                          parameters={spec['param_name']: 0.0})
+
+
+def _equilibria_2d(system, spec, value):
+    system.set_parameters({spec['param_name']: value})
+    return system.find_equilibria(spec['x_range'], spec['y_range'])
+
+
+# Tareas disponibles: nombre -> (constructor(spec), evaluar(objeto, spec, valor))
+TASKS = {
+    'equilibria_1d': (_build_analyzer_1d, _equilibria_1d),
+    'equilibria_2d': (_build_system_2d, _equilibria_2d),
+}
+
+
+def _spec_key(task, spec):
+    return (task, tuple(sorted(spec.items())))
+
+
+def _built(task, spec):
+    """Objeto construido para (tarea, spec), reutilizado dentro del proceso."""
+    key = _spec_key(task, spec)
+    if key not in _BUILT:
+        if len(_BUILT) >= _BUILT_SIZE:
+            _BUILT.pop(next(iter(_BUILT)))
+        _BUILT[key] = TASKS[task][0](spec)
+    return _BUILT[key]
+
+
+def _run_chunk(task, spec, values):
+    """Evalúa un bloque de valores (se ejecuta dentro de cada proceso)."""
+    obj = _built(task, spec)
+    evaluate = TASKS[task][1]
+    return [evaluate(obj, spec, value) for value in values]
+
+
+def _get_executor(max_workers):
+    """
+    Pool compartido con max_workers procesos; se crea en el primer uso
+    (o si cambia el número de procesos).
+    
+    Returns:
+        ProcessPoolExecutor, o None si no se pueden crear procesos
+    """
+    global _EXECUTOR, _EXECUTOR_WORKERS
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None and _EXECUTOR_WORKERS != max_workers:
+            _EXECUTOR.shutdown(wait=False)
+            _EXECUTOR = None
+        if _EXECUTOR is None:
+            try:
+                _EXECUTOR = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context(MP_CONTEXT))
+            except (OSError, NotImplementedError, PermissionError, ValueError):
+                return None
+            _EXECUTOR_WORKERS = max_workers
+        return _EXECUTOR
+
+
+def _executor_ready(max_workers):
+    """True si el pool compartido ya existe con max_workers procesos."""
+    with _EXECUTOR_LOCK:
+        return _EXECUTOR is not None and _EXECUTOR_WORKERS == max_workers
+
+
+def _discard_executor(executor):
+    """Descarta el pool compartido si es executor (p. ej. porque se rompió)."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is executor:
+            _EXECUTOR = None
+    executor.shutdown(wait=False)
+
+
+def shutdown_executor():
+    """Cierra el pool compartido (se llama también al salir)."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+atexit.register(shutdown_executor)
+
+
+class ParameterSweep:
+    """
+    Barrido de un parámetro repartido en un ProcessPoolExecutor.
+    
+    Ejemplo:
+        sweep = ParameterSweep('equilibria_1d',
+                               {'f_expr': 'r*x - x**3', 'x_range': (-3, 3)})
+        results = sweep.run(np.linspace(-2, 2, 200))
+    """
+    
+    def __init__(self, task, spec, max_workers=None, chunk_size=None,
+                 min_parallel=None):
+        """
+        Args:
+            task: Nombre de la tarea (clave de TASKS)
+            spec: dict serializable con las expresiones y rangos
+            max_workers: Número de procesos (None = núcleos disponibles)
+            chunk_size: Valores por bloque (None = automático)
+            min_parallel: Por debajo de este número de valores se calcula
+                          en el proceso actual (None = decidir midiendo el
+                          primer bloque contra PARALLEL_MIN_SECONDS, más
+                          POOL_START_SECONDS si el pool aún no existe)
+        """
+        if task not in TASKS:
+            raise ValueError(f"Tarea desconocida: {task}")
+        self.task = task
+        self.spec = dict(spec)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_parallel = min_parallel
+    
+    def _chunks(self, values):
+        size = self.chunk_size
+        if size is None:
+            size = max(1, int(np.ceil(len(values) / (4 * self.max_workers))))
+        return [values[i:i + size] for i in range(0, len(values), size)]
+    
+    def iter_results(self, values, progress_callback=None):
+        """
+        Genera (valor, resultado) en el orden de values, a medida que los
+        bloques terminan.
+        
+        Args:
+            progress_callback: Función (completados, total) llamada al
+                               terminar cada bloque
+        """
+        values = list(values)
+        total = len(values)
+        chunks = self._chunks(values)
+        
+        if self.max_workers == 1 or len(chunks) < 2:
+            yield from self._iter_serial(chunks, total, progress_callback)
+            return
+        if self.min_parallel is not None and total < self.min_parallel:
+            yield from self._iter_serial(chunks, total, progress_callback)
+            return
+        
+        ready = {}
+        next_chunk = 0
+        done = 0
+        
+        if self.min_parallel is None:
+            # Primer bloque en serie para estimar el costo por valor; el
+            # primer valor no se mide si hay otros, porque carga módulos y
+            # compila las funciones del sistema
+            chunk = chunks[0]
+            measured = chunk[1:] or chunk
+            ready[0] = _run_chunk(self.task, self.spec, chunk[:len(chunk) - len(measured)])
+            start = time.perf_counter()
+            ready[0] += _run_chunk(self.task, self.spec, measured)
+            per_value = (time.perf_counter() - start) / len(measured)
+            done = len(chunks[0])
+            if progress_callback:
+                progress_callback(done, total)
+            yield from zip(chunks[0], ready.pop(0))
+            next_chunk = 1
+            
+            threshold = PARALLEL_MIN_SECONDS
+            if not _executor_ready(self.max_workers):
+                threshold += POOL_START_SECONDS
+            if per_value * (total - done) < threshold:
+                yield from self._iter_serial(chunks[1:], total, progress_callback, done)
+                return
+        
+        executor = _get_executor(self.max_workers)
+        if executor is None:
+            yield from self._iter_serial(chunks[next_chunk:], total, progress_callback, done)
+            return
+        
+        futures = {}
+        try:
+            futures = {executor.submit(_run_chunk, self.task, self.spec, chunks[i]): i
+                       for i in range(next_chunk, len(chunks))}
+            
+            for future in as_completed(futures):
+                i = futures[future]
+                ready[i] = future.result()
+                done += len(chunks[i])
+                if progress_callback:
+                    progress_callback(done, total)
+                
+                # Entregar en orden todo lo que ya está contiguo
+                while next_chunk in ready:
+                    yield from zip(chunks[next_chunk], ready.pop(next_chunk))
+                    next_chunk += 1
+            return
+        except (BrokenProcessPool, OSError):
+            _discard_executor(executor)
+        finally:
+            # Cancelado (o abandonado): no dejar bloques pendientes en el pool
+            for future in futures:
+                future.cancel()
+        
+        # El pool se rompió (p. ej. sin permisos para crear procesos):
+        # completar en este proceso lo que falta
+        for i in range(next_chunk, len(chunks)):
+            if i not in ready:
+                ready[i] = _run_chunk(self.task, self.spec, chunks[i])
+                done += len(chunks[i])
+                if progress_callback:
+                    progress_callback(done, total)
+            yield from zip(chunks[i], ready.pop(i))
+    
+    def _iter_serial(self, chunks, total, progress_callback, done=0):
+        for chunk in chunks:
+            results = _run_chunk(self.task, self.spec, chunk)
+            done += len(chunk)
+            if progress_callback:
+                progress_callback(done, total)
+            yield from zip(chunk, results)
+    
+    def run(self, values, progress_callback=None):
+        """Lista de resultados en el orden de values."""
+        return [result for _, result in self.iter_results(values, progress_callback)]
@@ -3,41 +3,64 @@ Análisis de sistemas autónomos 1D: dx/dt = f(x)
 """
 
 import numpy as np
-import sympy as sp
-from scipy.integrate import solve_ivp
-from scipy.optimize import fsolve
 import matplotlib.pyplot as plt
 
 from utils.expression_parser import ExpressionParser
+from utils.lazy import LazyModule
+
+sp = LazyModule('sympy')
 
 
 class AutonomousSystem1D:
     """Sistema autónomo 1D: dx/dt = f(x)"""
     
-    def __init__(self, f_expr):
+    def __init__(self, f_expr, parameters=None):
         """
         Args:
             f_expr: Expresión string para dx/dt = f(x)
+            parameters: dict nombre -> valor de los parámetros simbólicos
+                        de la expresión (ej: {'r': 1.0})
         """
         self.f_expr = f_expr
+        self.parameters = dict(parameters or {})
+        self.param_values = tuple(self.parameters.values())
+        names = list(self.parameters)
         
         # Parsear a sympy
-        self.f_sympy = ExpressionParser.parse_to_sympy(f_expr, ['x'])
+        self.f_sympy = ExpressionParser.parse_to_sympy(f_expr, ['x'], names)
         self.x_symbol = sp.Symbol('x', real=True)
+        param_symbols = [sp.Symbol(name, real=True) for name in names]
         
         # Crear función numpy
-        self.f_func = ExpressionParser.create_numpy_function(f_expr, ['x'])
+        self.f_func = ExpressionParser.create_numpy_function(f_expr, ['x'], names)
         
         # Derivada df/dx (para estabilidad)
         self.df_dx_sympy = sp.diff(self.f_sympy, self.x_symbol)
-        self.df_dx_func = sp.lambdify(self.x_symbol, self.df_dx_sympy, 'numpy')
+        self.df_dx_func = sp.lambdify([self.x_symbol] + param_symbols,
+                                      self.df_dx_sympy, 'numpy')
+        
+        self.equilibria = []
+    
+    def set_parameters(self, values=None, **kwargs):
+        """
+        Cambia los valores de los parámetros sin recompilar.
         
+        Args:
+            values: dict nombre -> valor (también se aceptan como kwargs)
+        """
+        values = dict(values or {}, **kwargs)
+        unknown = set(values) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+        
+        self.parameters.update({name: float(v) for name, v in values.items()})
+        self.param_values = tuple(self.parameters.values())
         self.equilibria = []
     
     def f(self, x):
         """Evalúa f(x)"""
         try:
-            result = self.f_func(x)
+            result = self.f_func(x, *self.param_values)
             if isinstance(result, np.ndarray):
                 return result
             return float(result)
@@ -47,7 +70,7 @@ class AutonomousSystem1D:
     def df_dx(self, x):
         """Evalúa df/dx en x"""
         try:
-            result = self.df_dx_func(x)
+            result = self.df_dx_func(x, *self.param_values)
             if isinstance(result, np.ndarray):
                 return result
             return float(result)
@@ -61,6 +84,8 @@ class AutonomousSystem1D:
         Returns:
             Lista de dict con 'x', 'stability', 'derivative'
         """
+        from scipy.optimize import fsolve
+        
         equilibria = []
         found_x = []
         
@@ -106,6 +131,8 @@ class AutonomousSystem1D:
         Returns:
             dict con 't', 'x'
         """
+        from scipy.integrate import solve_ivp
+        
         def derivatives(t, state):
             return [self.f(state[0])]
         
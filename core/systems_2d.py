@@ -4,12 +4,11 @@ Incluye análisis de equilibrio, nullclines, y renderizado de plano de fase.
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.integrate import solve_ivp
-from scipy.optimize import fsolve
 from abc import ABC, abstractmethod
-import warnings
+from collections import OrderedDict
 
+from core.integrators import integrate_ensemble, integrate_symplectic, SYMPLECTIC_METHODS
+from core.systems_nd import seed_grid, solve_equilibria, classify_jacobians
 from utils.expression_parser import ExpressionParser
 
 
@@ -19,7 +18,8 @@ class DynamicSystem2D(ABC):
     def __init__(self):
         self.equilibria = []
         self.nullclines = None
-        
+        self._classifications = {}
+    
     @abstractmethod
     def f(self, x, y):
         """dx/dt = f(x, y)"""
@@ -35,10 +35,40 @@ class DynamicSystem2D(ABC):
         x, y = state
         return [self.f(x, y), self.g(x, y)]
     
-    def find_equilibria(self, x_range, y_range, n_seeds=20):
+    def evaluate_field(self, X, Y):
+        """
+        Evalúa el campo vectorial (f, g) sobre arrays de puntos.
+        
+        Implementación genérica punto a punto; las subclases la
+        sobrescriben con una evaluación vectorizada.
+        
+        Args:
+            X, Y: Arrays (de igual forma) con las coordenadas
+        
+        Returns:
+            (U, V) como arrays enmascarados donde el campo no es finito
+        """
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        U = np.full(X.shape, np.nan)
+        V = np.full(X.shape, np.nan)
+        
+        for idx in np.ndindex(X.shape):
+            try:
+                U[idx] = self.f(X[idx], Y[idx])
+                V[idx] = self.g(X[idx], Y[idx])
+            except:
+                continue
+        
+        return _mask_invalid(U, V)
+    
+    def find_equilibria(self, x_range, y_range, n_seeds=400):
         """
         Encuentra puntos de equilibrio donde f=0 y g=0.
         
+        Todas las semillas se iteran a la vez con Newton amortiguado
+        (Levenberg-Marquardt) sobre arrays (N, 2).
+        
         Args:
             x_range: (x_min, x_max)
             y_range: (y_min, y_max)
@@ -48,45 +78,28 @@ class DynamicSystem2D(ABC):
             Lista de tuplas (x_eq, y_eq, classification)
         """
         equilibria = []
-        found_points = []
         
         # Generar semillas en grid
-        x_seeds = np.linspace(x_range[0], x_range[1], int(np.sqrt(n_seeds)))
-        y_seeds = np.linspace(y_range[0], y_range[1], int(np.sqrt(n_seeds)))
-        
-        def system(point):
-            x, y = point
-            return [self.f(x, y), self.g(x, y)]
-        
-        for x0 in x_seeds:
-            for y0 in y_seeds:
-                try:
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore")
-                        sol = fsolve(system, [x0, y0], full_output=True)
-                        x_eq, y_eq = sol[0]
-                        info = sol[1]
-                        
-                        # Verificar que es solución válida
-                        if info['fvec'][0]**2 + info['fvec'][1]**2 < 1e-6:
-                            # Evitar duplicados
-                            is_duplicate = False
-                            for (x_f, y_f, _) in found_points:
-                                if abs(x_eq - x_f) < 0.01 and abs(y_eq - y_f) < 0.01:
-                                    is_duplicate = True
-                                    break
-                            
-                            if not is_duplicate:
-                                classification = self.classify_equilibrium(x_eq, y_eq)
-                                found_points.append((x_eq, y_eq, classification))
-                                equilibria.append({
-                                    'point': (x_eq, y_eq),
-                                    'type': classification['type'],
-                                    'stability': classification['stability'],
-                                    'eigenvalues': classification['eigenvalues']
-                                })
-                except:
-                    continue
+        bounds = [x_range, y_range]
+        seeds = seed_grid(2, bounds, n_seeds)
+        
+        def residual(Z):
+            U, V = self.evaluate_field(Z[:, 0], Z[:, 1])
+            return np.column_stack([U.filled(np.nan), V.filled(np.nan)])
+        
+        def jacobian(Z):
+            return self.jacobian_field(Z[:, 0], Z[:, 1])
+        
+        # Soluciones válidas, dentro del rango y sin duplicados
+        unique_points = solve_equilibria(residual, jacobian, seeds, bounds)
+        for x_eq, y_eq in unique_points.tolist():
+            classification = self.classify_equilibrium(x_eq, y_eq)
+            equilibria.append({
+                'point': (x_eq, y_eq),
+                'type': classification['type'],
+                'stability': classification['stability'],
+                'eigenvalues': classification['eigenvalues']
+            })
         
         self.equilibria = equilibria
         return equilibria
@@ -95,54 +108,22 @@ class DynamicSystem2D(ABC):
         """
         Clasifica un punto de equilibrio por sus autovalores.
         
+        Los resultados se memorizan por punto: render_phase_plot vuelve a
+        clasificar cada equilibrio para dibujar sus autovectores.
+        
         Returns:
             dict con 'type', 'stability', 'eigenvalues', 'eigenvectors'
         """
-        # Calcular Jacobiano numéricamente
-        J = self.compute_jacobian(x_eq, y_eq, epsilon)
+        key = (float(x_eq), float(y_eq), epsilon)
+        if key in self._classifications:
+            return self._classifications[key]
         
-        # Autovalores y autovectores
-        eigenvalues, eigenvectors = np.linalg.eig(J)
-        
-        # Clasificación
-        lambda1, lambda2 = eigenvalues
-        
-        # Determinar tipo
-        if np.iscomplex(lambda1) or np.iscomplex(lambda2):
-            real_part = np.real(lambda1)
-            if abs(real_part) < 1e-8:
-                eq_type = "Centro"
-                stability = "Marginalmente estable"
-            elif real_part < 0:
-                eq_type = "Foco espiral"
-                stability = "Estable"
-            else:
-                eq_type = "Foco espiral"
-                stability = "Inestable"
-        else:
-            # Autovalores reales
-            lambda1, lambda2 = np.real(lambda1), np.real(lambda2)
-            
-            if lambda1 * lambda2 > 0:
-                # Mismo signo -> Nodo
-                if lambda1 < 0 and lambda2 < 0:
-                    eq_type = "Nodo"
-                    stability = "Estable"
-                else:
-                    eq_type = "Nodo"
-                    stability = "Inestable"
-            else:
-                # Signos opuestos -> Punto de silla
-                eq_type = "Punto de silla"
-                stability = "Inestable"
+        J = self.compute_jacobian(x_eq, y_eq, epsilon)
         
-        return {
-            'type': eq_type,
-            'stability': stability,
-            'eigenvalues': eigenvalues,
-            'eigenvectors': eigenvectors,
-            'jacobian': J
-        }
+        # Autovalores y clasificación (misma regla que el núcleo N-dimensional)
+        classification = classify_jacobians(J[None])[0]
+        self._classifications[key] = classification
+        return classification
     
     def compute_jacobian(self, x, y, epsilon=1e-5):
         """Calcula el Jacobiano numéricamente."""
@@ -159,33 +140,115 @@ class DynamicSystem2D(ABC):
         
         return J
     
-    def compute_nullclines(self, x_range, y_range, n_points=100):
+    def jacobian_field(self, X, Y, epsilon=1e-5):
+        """
+        Calcula el Jacobiano en lote sobre arrays de puntos.
+        
+        Returns:
+            Array de forma X.shape + (2, 2); NaN donde el campo no es finito
+        """
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        
+        U_xp, V_xp = self.evaluate_field(X + epsilon, Y)
+        U_xm, V_xm = self.evaluate_field(X - epsilon, Y)
+        U_yp, V_yp = self.evaluate_field(X, Y + epsilon)
+        U_ym, V_ym = self.evaluate_field(X, Y - epsilon)
+        
+        J = np.empty(X.shape + (2, 2))
+        J[..., 0, 0] = ((U_xp - U_xm) / (2 * epsilon)).filled(np.nan)
+        J[..., 0, 1] = ((U_yp - U_ym) / (2 * epsilon)).filled(np.nan)
+        J[..., 1, 0] = ((V_xp - V_xm) / (2 * epsilon)).filled(np.nan)
+        J[..., 1, 1] = ((V_yp - V_ym) / (2 * epsilon)).filled(np.nan)
+        
+        return J
+    
+    def cache_key(self):
+        """
+        Clave que identifica al sistema en las cachés de resultados.
+        
+        Por defecto es el propio objeto; las subclases definidas por
+        expresiones o matrices la basan en su contenido para que dos
+        instancias equivalentes compartan resultados.
+        """
+        return self
+    
+    def compute_nullclines(self, x_range, y_range, n_points=100, refine=1):
         """
         Calcula nullclines (isoclinas donde dx/dt=0 o dy/dt=0).
         
+        Args:
+            x_range: (x_min, x_max)
+            y_range: (y_min, y_max)
+            n_points: Resolución de la grilla gruesa por eje
+            refine: Factor de refinamiento local. Con refine > 1 la grilla
+                final tiene (n_points-1)*refine+1 puntos por eje, pero solo
+                se reevalúan las celdas donde F o G cambian de signo.
+        
         Returns:
             dict con 'X', 'Y', 'F', 'G'
         """
+        key = (self.cache_key(),
+               (float(x_range[0]), float(x_range[1])),
+               (float(y_range[0]), float(y_range[1])),
+               int(n_points), int(refine))
+        
+        cached = _NULLCLINE_CACHE.get(key)
+        if cached is not None:
+            _NULLCLINE_CACHE.move_to_end(key)
+            self.nullclines = cached
+            return cached
+        
         x = np.linspace(x_range[0], x_range[1], n_points)
         y = np.linspace(y_range[0], y_range[1], n_points)
         X, Y = np.meshgrid(x, y)
         
-        # Evaluar derivadas en grid
-        F = np.zeros_like(X)
-        G = np.zeros_like(X)
+        # Evaluar ambas derivadas en la grilla de una sola vez
+        F, G = self.evaluate_field(X, Y)
+        F = F.filled(np.nan)
+        G = G.filled(np.nan)
         
-        for i in range(X.shape[0]):
-            for j in range(X.shape[1]):
-                try:
-                    F[i, j] = self.f(X[i, j], Y[i, j])
-                    G[i, j] = self.g(X[i, j], Y[i, j])
-                except:
-                    F[i, j] = np.nan
-                    G[i, j] = np.nan
+        if refine > 1:
+            X, Y, F, G = self._refine_nullclines(x, y, F, G, int(refine))
         
         self.nullclines = {'X': X, 'Y': Y, 'F': F, 'G': G}
+        
+        _NULLCLINE_CACHE[key] = self.nullclines
+        if len(_NULLCLINE_CACHE) > _NULLCLINE_CACHE_SIZE:
+            _NULLCLINE_CACHE.popitem(last=False)
+        
         return self.nullclines
     
+    def _refine_nullclines(self, x, y, F, G, factor):
+        """
+        Refina la grilla de nullclines solo donde F o G cambian de signo.
+        
+        El resto de la grilla fina se interpola bilinealmente desde la
+        grilla gruesa: como allí no hay cambio de signo, la interpolación
+        no introduce nullclines espurias.
+        """
+        x_fine = np.linspace(x[0], x[-1], (len(x) - 1) * factor + 1)
+        y_fine = np.linspace(y[0], y[-1], (len(y) - 1) * factor + 1)
+        X, Y = np.meshgrid(x_fine, y_fine)
+        
+        F_fine = _upsample_bilinear(F, factor)
+        G_fine = _upsample_bilinear(G, factor)
+        
+        # Celdas gruesas con cambio de signo -> puntos finos a reevaluar
+        cells = _sign_change_cells(F) | _sign_change_cells(G)
+        block = np.kron(cells, np.ones((factor, factor), dtype=bool))
+        points = np.zeros(X.shape, dtype=bool)
+        points[:-1, :-1] |= block
+        points[1:, 1:] |= block
+        points[1:, :-1] |= block
+        points[:-1, 1:] |= block
+        
+        U, V = self.evaluate_field(X[points], Y[points])
+        F_fine[points] = U.filled(np.nan)
+        G_fine[points] = V.filled(np.nan)
+        
+        return X, Y, F_fine, G_fine
+    
     def simulate_trajectory(self, x0, y0, t_span, method='RK45', 
                           rtol=1e-6, atol=1e-9, n_points=1000):
         """
@@ -194,6 +257,8 @@ class DynamicSystem2D(ABC):
         Returns:
             dict con 't', 'x', 'y'
         """
+        from scipy.integrate import solve_ivp
+        
         t_eval = np.linspace(t_span[0], t_span[1], n_points)
         
         try:
@@ -221,38 +286,276 @@ class DynamicSystem2D(ABC):
                 'y': np.array([y0]),
                 'success': False
             }
+    
+    
+    def separable_field(self):
+        """
+        Partes de un sistema separable x' = G(y), y' = F(x) (hamiltoniano).
+        
+        Returns:
+            (G, F) como funciones vectorizadas de arrays, o None si el
+            sistema no es separable (o no se sabe)
+        """
+        return None
+    
+    def simulate_ensemble(self, initial_conditions, t_ends, n_points=1000,
+                          rtol=1e-6, atol=1e-9, should_stop=None,
+                          integrator=None, dt=0.05):
+        """
+        Simula muchas trayectorias a la vez como un único estado (N, 2).
+        
+        Usa Dormand-Prince vectorizado con control de error y parada por
+        miembro, evaluando el campo con evaluate_field. Los sistemas
+        separables pueden integrarse con un método simpléctico de paso
+        fijo, que conserva la energía y mantiene cerradas las órbitas.
+        
+        Args:
+            initial_conditions: Array (N, 2) de condiciones iniciales
+            t_ends: Tiempo final por trayectoria (N,), negativo = hacia atrás
+            n_points: Muestras por trayectoria
+            should_stop: Función de cancelación cooperativa (opcional)
+            integrator: 'dopri5' (por defecto), 'leapfrog', 'yoshida4' o
+                        'auto' (Yoshida de orden 4 si el sistema es
+                        separable y el paso cumple la cota de precisión
+                        de _symplectic_step en la región recorrida; si
+                        no, Dormand-Prince)
+            dt: Paso máximo de los integradores simplécticos
+        
+        Returns:
+            dict con arrays 't' (N, M), 'x' (N, M), 'y' (N, M),
+            'n_valid' (N,) y 'success' (N,)
+        """
+        integrator = integrator or 'dopri5'
+        parts = self.separable_field() if integrator != 'dopri5' else None
+        result = None
+        
+        if integrator == 'auto':
+            if parts is not None:
+                result = self._auto_symplectic(parts, initial_conditions, t_ends,
+                                               n_points, dt, should_stop)
+            integrator = 'yoshida4' if result is not None else 'dopri5'
+        
+        if result is None and integrator in SYMPLECTIC_METHODS:
+            if parts is None:
+                raise ValueError("Los integradores simplécticos requieren un "
+                                 "sistema separable x' = G(y), y' = F(x)")
+            G, F = parts
+            result = integrate_symplectic(
+                lambda P: G(P[:, 0])[:, None],
+                lambda Q: F(Q[:, 0])[:, None],
+                initial_conditions, t_ends, n_points=n_points, dt=dt,
+                method=integrator, should_stop=should_stop
+            )
+        elif result is None and integrator == 'dopri5':
+            def rhs(Z):
+                U, V = self.evaluate_field(Z[:, 0], Z[:, 1])
+                return np.column_stack([U.filled(np.nan), V.filled(np.nan)])
+            
+            result = integrate_ensemble(rhs, initial_conditions, t_ends,
+                                        n_points=n_points, rtol=rtol, atol=atol,
+                                        should_stop=should_stop)
+        elif result is None:
+            raise ValueError(f"Integrador desconocido: {integrator}")
+        
+        return {
+            't': result['t'],
+            'x': result['states'][..., 0],
+            'y': result['states'][..., 1],
+            'n_valid': result['n_valid'],
+            'success': result['success']
+        }
+    
+    def _auto_symplectic(self, parts, initial_conditions, t_ends, n_points, dt,
+                         should_stop):
+        """
+        Integra con Yoshida-4 solo si el paso es preciso en la región
+        recorrida.
+        
+        El paso se elige con _symplectic_step en la caja de las condiciones
+        iniciales; si las trayectorias salen de ella se vuelve a estimar en
+        la región visitada y, si allí la cota exige un paso menor, se
+        integra otra vez.
+        
+        Returns:
+            Resultado de integrate_symplectic, o None si hay que usar
+            Dormand-Prince (paso demasiado chico, escape o región creciente)
+        """
+        G, F = parts
+        box = _padded_box(np.atleast_2d(np.asarray(initial_conditions, dtype=float)))
+        
+        for _ in range(2):
+            h = _symplectic_step(G, F, box, dt)
+            if h is None:
+                return None
+            
+            result = integrate_symplectic(
+                lambda P: G(P[:, 0])[:, None],
+                lambda Q: F(Q[:, 0])[:, None],
+                initial_conditions, t_ends, n_points=n_points, dt=h,
+                method='yoshida4', should_stop=should_stop
+            )
+            if not result['success'].all() and not (should_stop and should_stop()):
+                return None
+            
+            # Región efectivamente recorrida
+            with np.errstate(invalid='ignore'):
+                visited = np.array([np.nanmin(result['states'], axis=(0, 1)),
+                                    np.nanmax(result['states'], axis=(0, 1))])
+            box = np.array([np.minimum(box[0], visited[0]),
+                            np.maximum(box[1], visited[1])])
+            checked = _symplectic_step(G, F, box, dt)
+            if checked is not None and checked >= h:
+                return result
+        
+        return None
 
 
 class CustomSystem2D(DynamicSystem2D):
     """Sistema 2D definido por expresiones matemáticas."""
     
-    def __init__(self, f_expr, g_expr):
+    def __init__(self, f_expr, g_expr, parameters=None, separable=None):
         """
         Args:
             f_expr: Expresión string para dx/dt
             g_expr: Expresión string para dy/dt
+            parameters: dict nombre -> valor de los parámetros simbólicos
+                        de las expresiones (ej: {'mu': 0.5})
+            separable: True/False si se sabe que el sistema es (o no)
+                       de la forma x' = G(y), y' = F(x); None = detectarlo
+                       a partir de las expresiones
         """
         super().__init__()
         self.f_expr = f_expr
         self.g_expr = g_expr
+        self.separable = separable
+        
+        # Los parámetros son símbolos: se compila una vez y sus valores
+        # se pasan en cada llamada (ver set_parameters)
+        self.parameters = dict(parameters or {})
+        self.param_values = tuple(self.parameters.values())
+        names = list(self.parameters)
         
         # Parsear expresiones
-        self.f_func = ExpressionParser.create_numpy_function(f_expr, ['x', 'y'])
-        self.g_func = ExpressionParser.create_numpy_function(g_expr, ['x', 'y'])
+        self.f_func = ExpressionParser.create_numpy_function(f_expr, ['x', 'y'], names)
+        self.g_func = ExpressionParser.create_numpy_function(g_expr, ['x', 'y'], names)
+        
+        # Campo completo (f, g) compilado en una sola función con CSE
+        self.rhs_func = ExpressionParser.compile_system([f_expr, g_expr], ['x', 'y'], names)
+        
+        # Jacobiano simbólico, derivado y compilado una sola vez
+        try:
+            self.jac_func = ExpressionParser.create_jacobian_function(
+                [f_expr, g_expr], ['x', 'y'], names)
+        except Exception:
+            self.jac_func = None
+    
+    def set_parameters(self, values=None, **kwargs):
+        """
+        Cambia los valores de los parámetros sin recompilar.
+        
+        Args:
+            values: dict nombre -> valor (también se aceptan como kwargs)
+        """
+        values = dict(values or {}, **kwargs)
+        unknown = set(values) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+        
+        self.parameters.update({name: float(v) for name, v in values.items()})
+        self.param_values = tuple(self.parameters.values())
+        self._classifications = {}
+    
+    def cache_key(self):
+        """El sistema queda identificado por sus expresiones y parámetros."""
+        return ('CustomSystem2D', self.f_expr, self.g_expr,
+                tuple(self.parameters.items()))
+    
+    def is_separable(self):
+        """True si dx/dt no depende de x y dy/dt no depende de y."""
+        if self.separable is None:
+            names = list(self.parameters)
+            try:
+                f_vars = ExpressionParser.free_symbols(self.f_expr, ['x', 'y'], names)
+                g_vars = ExpressionParser.free_symbols(self.g_expr, ['x', 'y'], names)
+                self.separable = 'x' not in f_vars and 'y' not in g_vars
+            except Exception:
+                self.separable = False
+        return self.separable
+    
+    def separable_field(self):
+        """(G, F) evaluadas con las funciones compiladas de cada componente."""
+        if not self.is_separable():
+            return None
+        
+        def G(Y):
+            Y = np.asarray(Y, dtype=float)
+            return np.broadcast_to(self.f_func(np.zeros_like(Y), Y, *self.param_values),
+                                   Y.shape).astype(float)
+        
+        def F(X):
+            X = np.asarray(X, dtype=float)
+            return np.broadcast_to(self.g_func(X, np.zeros_like(X), *self.param_values),
+                                   X.shape).astype(float)
+        
+        return G, F
     
     def f(self, x, y):
         """dx/dt"""
         try:
-            return float(self.f_func(x, y))
+            return float(self.f_func(x, y, *self.param_values))
         except:
             return 0.0
     
     def g(self, x, y):
         """dy/dt"""
         try:
-            return float(self.g_func(x, y))
+            return float(self.g_func(x, y, *self.param_values))
         except:
             return 0.0
+    
+    def derivatives(self, t, state):
+        """Para solve_ivp: una sola llamada a la función compilada."""
+        try:
+            return self.rhs_func(*state, *self.param_values)
+        except:
+            return super().derivatives(t, state)
+    
+    def evaluate_field(self, X, Y):
+        """Evalúa f y g sobre toda la grilla en una sola llamada numpy."""
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        
+        try:
+            with np.errstate(all='ignore'):
+                UV = np.broadcast_to(self.rhs_func(X, Y, *self.param_values), (2,) + X.shape)
+            U = UV[0].astype(float)
+            V = UV[1].astype(float)
+        except Exception:
+            # Expresiones no vectorizables: evaluación punto a punto
+            return super().evaluate_field(X, Y)
+        
+        return _mask_invalid(U, V)
+    
+    def jacobian_field(self, X, Y, epsilon=1e-5):
+        """Evalúa el Jacobiano analítico en lote (diferencias finitas si no hay)."""
+        if self.jac_func is None:
+            return super().jacobian_field(X, Y, epsilon)
+        
+        try:
+            with np.errstate(all='ignore'):
+                J = self.jac_func(X, Y, *self.param_values)
+        except Exception:
+            return super().jacobian_field(X, Y, epsilon)
+        
+        J[~np.isfinite(J)] = np.nan
+        return J
+    
+    def compute_jacobian(self, x, y, epsilon=1e-5):
+        """Jacobiano exacto en (x, y); diferencias finitas si no es finito."""
+        J = self.jacobian_field(x, y, epsilon)
+        if not np.all(np.isfinite(J)):
+            return super().compute_jacobian(x, y, epsilon)
+        return J
 
 
 class LinearSystem2D(DynamicSystem2D):
@@ -276,29 +579,326 @@ class LinearSystem2D(DynamicSystem2D):
             self.equilibrium_point = np.linalg.solve(self.A, -self.b)
         except:
             self.equilibrium_point = None
+        
+        # Punto de referencia X* con A X* + b = 0 para la solución exacta
+        if self.equilibrium_point is not None:
+            self._reference = self.equilibrium_point
+        elif not self.b.any():
+            self._reference = np.zeros(2)
+        else:
+            self._reference = None
+        
+        # Base modal: solo si A es diagonalizable (autovalores distintos,
+        # autovectores bien condicionados)
+        self._modal = None
+        lambda1, lambda2 = self.eigenvalues
+        distinct = abs(lambda1 - lambda2) > 1e-8 * (1 + abs(lambda1) + abs(lambda2))
+        if distinct and np.linalg.cond(self.eigenvectors) < 1e8 and self._reference is not None:
+            self._modal = (self.eigenvectors, np.linalg.inv(self.eigenvectors))
+    
+    def cache_key(self):
+        """El sistema queda identificado por A y b."""
+        return ('LinearSystem2D', tuple(self.A.ravel()), tuple(self.b))
     
     def f(self, x, y):
         """dx/dt"""
-        state = np.array([x, y])
-        result = self.A[0, :] @ state + self.b[0]
-        return float(result)
+        return float(self.A[0, 0] * x + self.A[0, 1] * y + self.b[0])
     
     def g(self, x, y):
         """dy/dt"""
-        state = np.array([x, y])
-        result = self.A[1, :] @ state + self.b[1]
-        return float(result)
+        return float(self.A[1, 0] * x + self.A[1, 1] * y + self.b[1])
+    
+    def derivatives(self, t, state):
+        """Para solve_ivp: A*X + b"""
+        return self.A @ state + self.b
+    
+    def separable_field(self):
+        """Separable si la diagonal de A es nula."""
+        if self.A[0, 0] != 0 or self.A[1, 1] != 0:
+            return None
+        return (lambda Y: self.A[0, 1] * np.asarray(Y, dtype=float) + self.b[0],
+                lambda X: self.A[1, 0] * np.asarray(X, dtype=float) + self.b[1])
+    
+    def solution(self, initial_conditions, t):
+        """
+        Solución exacta X(t) para varias condiciones iniciales a la vez.
+        
+        Si A es diagonalizable: X(t) = X* + V e^{Λt} V⁻¹ (X0 - X*).
+        Si no (autovalor doble, caso de Jordan), con s = tr(A)/2 y
+        δ = s² - det(A): e^{At} = e^{st} (C(t) I + S(t) (A - sI)), donde
+        C = cosh(√δ t), S = sinh(√δ t)/√δ (cos y sin si δ < 0; C = 1 y
+        S = t si δ = 0). Solo si A es singular con b ≠ 0 (sin equilibrio)
+        se usa la exponencial de la matriz aumentada [[A, b], [0, 0]].
+        
+        Args:
+            initial_conditions: Array (N, 2) de condiciones iniciales
+            t: Instantes (M,) comunes o (N, M) por condición inicial
+        
+        Returns:
+            Array (N, M, 2) con los estados; inf/NaN si desbordan
+        """
+        X0 = np.atleast_2d(np.asarray(initial_conditions, dtype=float))
+        t = np.asarray(t, dtype=float)
+        if t.ndim == 1:
+            t = np.broadcast_to(t, (len(X0), len(t)))
+        
+        with np.errstate(all='ignore'):
+            if self._modal is not None:
+                V, V_inv = self._modal
+                x_eq = self._reference
+                c = (X0 - x_eq) @ V_inv.T
+                modes = np.exp(t[..., None] * self.eigenvalues) * c[:, None, :]
+                return x_eq + np.real(modes @ V.T)
+            
+            if self._reference is not None:
+                x_eq = self._reference
+                s = np.trace(self.A) / 2
+                B = self.A - s * np.eye(2)
+                delta = s * s - np.linalg.det(self.A)
+                r = np.sqrt(abs(delta))
+                if r == 0:
+                    C, S = np.ones_like(t), t
+                elif delta > 0:
+                    C, S = np.cosh(r * t), np.sinh(r * t) / r
+                else:
+                    C, S = np.cos(r * t), np.sin(r * t) / r
+                
+                D = X0 - x_eq
+                growth = np.exp(s * t)[..., None]
+                return x_eq + growth * (C[..., None] * D[:, None, :]
+                                        + S[..., None] * (D @ B.T)[:, None, :])
+            
+            # Sin equilibrio: exponencial de la matriz aumentada, una por
+            # instante distinto
+            from scipy.linalg import expm
+            
+            M = np.zeros((3, 3))
+            M[:2, :2] = self.A
+            M[:2, 2] = self.b
+            times, inverse = np.unique(t, return_inverse=True)
+            P = np.array([expm(tau * M) for tau in times])[inverse.reshape(t.shape)]
+            return np.einsum('nmij,nj->nmi', P[..., :2, :2], X0) + P[..., :2, 2]
+    
+    def simulate_trajectory(self, x0, y0, t_span, method='RK45',
+                          rtol=1e-6, atol=1e-9, n_points=1000):
+        """
+        Trayectoria desde (x0, y0) evaluada con la solución exacta.
+        
+        Returns:
+            dict con 't', 'x', 'y'
+        """
+        t_eval = np.linspace(t_span[0], t_span[1], n_points)
+        states = self.solution([[x0, y0]], t_eval - t_span[0])[0]
+        
+        return {
+            't': t_eval,
+            'x': states[:, 0],
+            'y': states[:, 1],
+            'success': bool(np.isfinite(states).all())
+        }
+    
+    def simulate_ensemble(self, initial_conditions, t_ends, n_points=1000,
+                          rtol=1e-6, atol=1e-9, should_stop=None,
+                          integrator=None, dt=0.05):
+        """
+        Evalúa todas las trayectorias con la solución exacta en una sola
+        operación vectorizada (sin integrar).
+        
+        Misma interfaz y resultado que DynamicSystem2D.simulate_ensemble;
+        las trayectorias se cortan al superar el mismo umbral de escape
+        que usa el integrador. Sin integrator (o con 'auto' o 'exact') no
+        se integra; cualquier otro valor usa el integrador pedido.
+        """
+        if integrator not in (None, 'auto', 'exact'):
+            return super().simulate_ensemble(initial_conditions, t_ends, n_points,
+                                             rtol, atol, should_stop, integrator, dt)
+        
+        X0 = np.atleast_2d(np.asarray(initial_conditions, dtype=float))
+        n = len(X0)
+        t_ends = np.broadcast_to(np.asarray(t_ends, dtype=float), (n,))
+        t = t_ends[:, None] * np.linspace(0.0, 1.0, n_points)[None, :]
+        
+        states = self.solution(X0, t)
+        
+        # Muestras válidas: finitas y dentro del umbral de escape
+        max_norm = 1e6
+        with np.errstate(invalid='ignore'):
+            valid = np.isfinite(states).all(axis=2) & (np.abs(states).max(axis=2) <= max_norm)
+        n_valid = np.where(valid.all(axis=1), n_points, np.argmin(valid, axis=1))
+        n_valid = np.maximum(n_valid, 1)
+        states[np.arange(n_points)[None, :] >= n_valid[:, None]] = np.nan
+        
+        return {
+            't': t,
+            'x': states[..., 0],
+            'y': states[..., 1],
+            'n_valid': n_valid,
+            'success': n_valid == n_points
+        }
+    
+    def evaluate_field(self, X, Y):
+        """Evalúa A*X + b sobre toda la grilla."""
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        
+        U = self.A[0, 0] * X + self.A[0, 1] * Y + self.b[0]
+        V = self.A[1, 0] * X + self.A[1, 1] * Y + self.b[1]
+        
+        return _mask_invalid(U, V)
+    
+    def jacobian_field(self, X, Y, epsilon=1e-5):
+        """El Jacobiano de un sistema lineal es A en todo punto."""
+        shape = np.shape(X)
+        return np.broadcast_to(self.A, shape + (2, 2)).copy()
 
 
-def render_phase_plot(system, config, ax, log_callback=None):
+# Cota de precisión de Yoshida-4: ω·dt con ω la frecuencia local máxima
+SYMPLECTIC_OMEGA_DT = 0.1
+
+
+def _padded_box(points, pad=0.5):
+    """Caja [[xmin, ymin], [xmax, ymax]] de los puntos con un margen relativo."""
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    margin = pad * np.maximum(hi - lo, 1.0)
+    return np.array([lo - margin, hi + margin])
+
+
+def _symplectic_step(G, F, box, dt, max_refine=10, samples=257):
     """
-    Función centralizada para renderizar plano de fase.
+    Paso de Yoshida-4 para x' = G(y), y' = F(x) dentro de una caja.
+    
+    La frecuencia local de la linealización es ω = sqrt(|G'(y) F'(x)|);
+    se acota con max|G'| y max|F'| (diferencias finitas sobre la caja)
+    y se toma dt ≤ SYMPLECTIC_OMEGA_DT / ω.
+    
+    Returns:
+        El paso, o None si haría falta un paso más de max_refine veces
+        menor que dt (el integrador adaptativo es entonces más barato)
+    """
+    x = np.linspace(box[0, 0], box[1, 0], samples)
+    y = np.linspace(box[0, 1], box[1, 1], samples)
+    with np.errstate(all='ignore'):
+        dG = np.abs(np.gradient(G(y), y))
+        dF = np.abs(np.gradient(F(x), x))
+        omega = np.sqrt(dG.max() * dF.max())
+    
+    if not np.isfinite(omega):
+        return None
+    h = dt if omega == 0 else min(dt, SYMPLECTIC_OMEGA_DT / omega)
+    return h if h * max_refine >= dt else None
+
+
+# Caché LRU de grillas de nullclines, compartida entre instancias
+_NULLCLINE_CACHE = OrderedDict()
+_NULLCLINE_CACHE_SIZE = 16
+
+
+def _sign_change_cells(Z):
+    """Marca las celdas de la grilla cuyas esquinas cambian de signo (o son NaN)."""
+    corners = np.stack([Z[:-1, :-1], Z[1:, :-1], Z[:-1, 1:], Z[1:, 1:]])
+    with np.errstate(invalid='ignore'):
+        crossing = (corners.min(axis=0) <= 0) & (corners.max(axis=0) >= 0)
+    return crossing | np.isnan(corners).any(axis=0)
+
+
+def _upsample_bilinear(Z, factor):
+    """Interpola bilinealmente una grilla a (n-1)*factor+1 puntos por eje."""
+    def along_last_axis(A):
+        n = A.shape[-1]
+        pos = np.linspace(0, n - 1, (n - 1) * factor + 1)
+        i0 = np.minimum(pos.astype(int), n - 2)
+        w = pos - i0
+        return A[..., i0] * (1 - w) + A[..., i0 + 1] * w
+    
+    Z = along_last_axis(Z)
+    return along_last_axis(Z.T).T
+
+
+def _mask_invalid(U, V):
+    """Enmascara los puntos donde alguna componente del campo no es finita."""
+    invalid = ~(np.isfinite(U) & np.isfinite(V))
+    return np.ma.array(U, mask=invalid), np.ma.array(V, mask=invalid)
+
+
+def _level_lines(X, Y, Z, level=0.0):
+    """Polilíneas (lista de arrays (n, 2)) de la curva de nivel Z = level."""
+    from contourpy import contour_generator
+    
+    Z = np.ma.masked_invalid(np.asarray(Z, dtype=float))
+    if Z.count() == 0:
+        return []
+    generator = contour_generator(X, Y, Z, line_type='Separate')
+    return [line for line in generator.lines(level) if len(line) > 1]
+
+
+def phase_plot_keys(system, config):
+    """
+    Entradas de las que depende cada capa del plano de fase.
+    
+    Dos configuraciones con la misma clave para una capa producen los
+    mismos datos, de modo que la capa se puede reutilizar sin recalcular.
+    
+    Returns:
+        dict capa -> clave (hashable)
+    """
+    system_key = system.cache_key()
+    x_range = tuple(float(v) for v in config.get('x_range', (-5, 5)))
+    y_range = tuple(float(v) for v in config.get('y_range', (-5, 5)))
+    
+    equilibria = config.get('equilibria')
+    if equilibria is not None:
+        equilibria = tuple((tuple(np.round(eq['point'], 12)), eq['type'], eq['stability'])
+                           for eq in equilibria)
+    
+    trajectories = tuple(
+        (tuple(t['initial_condition']), t.get('t_forward', 10), t.get('t_backward', -10))
+        for t in config.get('trajectories', [])
+    )
+    
+    energy = config.get('energy')
+    if energy is not None:
+        levels = energy['levels']
+        energy = (energy['function'], tuple(energy.get('args', ())),
+                  levels if np.isscalar(levels) else tuple(levels),
+                  energy.get('resolution', 300), energy.get('fmt', '%.2f'),
+                  tuple(sorted(energy.get('style', {}).items())), x_range, y_range)
+    
+    return {
+        'field': (system_key, x_range, y_range, config.get('field_density', 20)),
+        'nullclines': (system_key, x_range, y_range,
+                       config.get('nullcline_resolution', 100),
+                       config.get('nullcline_refine', 1)),
+        'equilibria': (system_key, x_range, y_range, equilibria,
+                       config.get('show_eigenvectors', True)),
+        'trajectories': (system_key, trajectories, config.get('integrator')),
+        'energy': energy,
+    }
+
+
+def compute_phase_plot(system, config, log_callback=None, should_stop=None, cached=None):
+    """
+    Calcula todo lo que se dibuja en un plano de fase (sin tocar ejes).
+    
+    Puede ejecutarse fuera del hilo de la interfaz; draw_phase_plot (o
+    una PhaseScene) dibuja el resultado.
     
     Args:
         system: Instancia de DynamicSystem2D
-        config: dict con configuración (ranges, trajectories, etc.)
-        ax: matplotlib axes
+        config: dict con configuración (ranges, trajectories, etc.); con
+                'energy' = {'function', 'args', 'levels', 'resolution',
+                'fmt', 'style'} se agregan curvas de nivel de una función
+                H(X, Y, *args) ('levels' puede ser una lista o un número
+                de niveles entre el mínimo y el máximo); 'integrator' se
+                pasa a simulate_ensemble (por defecto, el del sistema)
         log_callback: función para logging
+        should_stop: Función de cancelación cooperativa
+        cached: dict capa -> (clave, datos) de un cálculo anterior; las
+                capas cuya clave no cambió se reutilizan sin recalcular
+    
+    Returns:
+        dict con 'x_range', 'y_range', 'field', 'nullclines',
+        'equilibria', 'trajectories', 'initial_points', 'energy' y 'keys'
+        (clave de cada capa; None si la capa está oculta)
     """
     def log(msg):
         if log_callback:
@@ -306,166 +906,180 @@ def render_phase_plot(system, config, ax, log_callback=None):
     
     x_range = config.get('x_range', (-5, 5))
     y_range = config.get('y_range', (-5, 5))
-    show_field = config.get('show_field', True)
-    show_nullclines = config.get('show_nullclines', True)
-    show_equilibria = config.get('show_equilibria', True)
     show_eigenvectors = config.get('show_eigenvectors', True)
     trajectories = config.get('trajectories', [])
+    keys = phase_plot_keys(system, config)
+    cached = cached or {}
+    
+    shown = {
+        'field': config.get('show_field', True),
+        'nullclines': config.get('show_nullclines', True),
+        'equilibria': config.get('show_equilibria', True),
+        'trajectories': True,
+        'energy': keys['energy'] is not None and config.get('show_energy', True),
+    }
+    
+    def reuse(layer):
+        """Datos anteriores de la capa si sus entradas no cambiaron."""
+        entry = cached.get(layer)
+        if entry is not None and entry[0] == keys[layer]:
+            return entry[1]
+        return None
+    
+    data = {
+        'x_range': x_range,
+        'y_range': y_range,
+        'field': None,
+        'nullclines': None,
+        'equilibria': None,
+        'trajectories': [],
+        'initial_points': np.empty((0, 2)),
+        'energy': None,
+        'keys': {layer: keys[layer] if shown[layer] else None for layer in keys},
+    }
     
     # 1. Campo vectorial
-    if show_field:
+    if shown['field']:
+        data['field'] = reuse('field')
+    if shown['field'] and data['field'] is None:
         log("Graficando campo vectorial...")
-        n_arrows = 20
+        n_arrows = config.get('field_density', 20)
         x = np.linspace(x_range[0], x_range[1], n_arrows)
         y = np.linspace(y_range[0], y_range[1], n_arrows)
         X, Y = np.meshgrid(x, y)
         
-        U = np.zeros_like(X)
-        V = np.zeros_like(X)
-        
-        for i in range(X.shape[0]):
-            for j in range(X.shape[1]):
-                U[i, j] = system.f(X[i, j], Y[i, j])
-                V[i, j] = system.g(X[i, j], Y[i, j])
+        U, V = system.evaluate_field(X, Y)
         
         # Normalizar vectores
-        M = np.sqrt(U**2 + V**2)
+        M = np.ma.sqrt(U**2 + V**2)
         M[M == 0] = 1  # Evitar división por cero
-        U_norm = U / M
-        V_norm = V / M
-        
-        ax.quiver(X, Y, U_norm, V_norm, M,
-                 cmap='gray',
-                 alpha=0.6,
-                 scale=30,
-                 width=0.003)
+        data['field'] = (X, Y, U / M, V / M, M)
     
-    # 2. Nullclines
-    if show_nullclines:
+    # 2. Nullclines (la grilla y sus curvas de nivel cero)
+    if shown['nullclines']:
+        data['nullclines'] = reuse('nullclines')
+    if shown['nullclines'] and data['nullclines'] is None:
         log("Calculando nullclines...")
-        nullclines = system.compute_nullclines(x_range, y_range)
-        
-        # dx/dt = 0 (roja)
-        ax.contour(nullclines['X'], nullclines['Y'], nullclines['F'],
-                  levels=[0],
-                  colors='red',
-                  linewidths=2,
-                  linestyles='--',
-                  alpha=0.7)
-        
-        # dy/dt = 0 (azul)
-        ax.contour(nullclines['X'], nullclines['Y'], nullclines['G'],
-                  levels=[0],
-                  colors='blue',
-                  linewidths=2,
-                  linestyles='--',
-                  alpha=0.7)
-    
-    # 3. Puntos de equilibrio
-    if show_equilibria:
+        nullclines = system.compute_nullclines(
+            x_range, y_range,
+            n_points=config.get('nullcline_resolution', 100),
+            refine=config.get('nullcline_refine', 1)
+        )
+        X, Y = nullclines['X'], nullclines['Y']
+        data['nullclines'] = dict(nullclines,
+                                  f_lines=_level_lines(X, Y, nullclines['F']),
+                                  g_lines=_level_lines(X, Y, nullclines['G']))
+    
+    # 3. Puntos de equilibrio (y autovectores reales)
+    if shown['equilibria']:
+        data['equilibria'] = reuse('equilibria')
+    if shown['equilibria'] and data['equilibria'] is None:
         log("Buscando puntos de equilibrio...")
-        equilibria = system.find_equilibria(x_range, y_range)
+        equilibria = config.get('equilibria')
+        if equilibria is None:
+            equilibria = system.find_equilibria(x_range, y_range)
         
         log(f"  Encontrados: {len(equilibria)} equilibrios")
         
+        data['equilibria'] = []
         for eq in equilibria:
             x_eq, y_eq = eq['point']
-            eq_type = eq['type']
-            stability = eq['stability']
-            eigenvalues = eq['eigenvalues']
-            
-            log(f"  ({x_eq:.3f}, {y_eq:.3f}): {eq_type} - {stability}")
-            
-            # Color según estabilidad
-            if 'Estable' in stability and 'Inestable' not in stability:
-                color = 'green'
-                marker = 'o'
-            elif 'silla' in eq_type.lower():
-                color = 'orange'
-                marker = 's'
-            else:
-                color = 'red'
-                marker = 'o'
+            log(f"  ({x_eq:.3f}, {y_eq:.3f}): {eq['type']} - {eq['stability']}")
             
-            ax.scatter(x_eq, y_eq, c=color, s=150, marker=marker,
-                      edgecolors='black', linewidths=2, zorder=10)
-            
-            # 4. Autovectores
-            if show_eigenvectors and not np.iscomplex(eigenvalues[0]):
+            eigen = None
+            if show_eigenvectors and not np.iscomplex(eq['eigenvalues'][0]):
                 classification = system.classify_equilibrium(x_eq, y_eq)
-                eigvecs = classification['eigenvectors']
-                eigvals = classification['eigenvalues']
-                
-                for i in range(2):
-                    if not np.iscomplex(eigvals[i]):
-                        eigval = np.real(eigvals[i])
-                        eigvec = np.real(eigvecs[:, i])
-                        
-                        # Escalar autovector
-                        scale = 0.3
-                        dx = eigvec[0] * scale
-                        dy = eigvec[1] * scale
-                        
-                        # Color según signo del autovalor
-                        arrow_color = 'green' if eigval < 0 else 'red'
-                        
-                        ax.arrow(x_eq, y_eq, dx, dy,
-                                head_width=scale*0.1,
-                                head_length=scale*0.15,
-                                fc=arrow_color,
-                                ec=arrow_color,
-                                linewidth=2,
-                                alpha=0.7,
-                                zorder=9)
-    
-    # 5. Trayectorias
-    colors = plt.cm.tab10.colors
-    for idx, traj_config in enumerate(trajectories):
-        x0, y0 = traj_config['initial_condition']
-        t_forward = traj_config.get('t_forward', 10)
-        t_backward = traj_config.get('t_backward', -10)
-        
-        color = colors[idx % len(colors)]
-        
-        # Trayectoria hacia adelante
-        if t_forward > 0:
-            traj = system.simulate_trajectory(x0, y0, (0, t_forward))
-            if traj['success']:
-                ax.plot(traj['x'], traj['y'], color=color,
-                       linewidth=2, alpha=0.8)
-                
-                # Flecha de dirección en punto medio
-                mid_idx = len(traj['x']) // 2
-                if mid_idx > 0 and mid_idx < len(traj['x']) - 1:
-                    x_mid = traj['x'][mid_idx]
-                    y_mid = traj['y'][mid_idx]
-                    dx = traj['x'][mid_idx + 1] - traj['x'][mid_idx]
-                    dy = traj['y'][mid_idx + 1] - traj['y'][mid_idx]
-                    
-                    ax.arrow(x_mid, y_mid, dx*10, dy*10,
-                            head_width=0.15, head_length=0.2,
-                            fc=color, ec=color,
-                            linewidth=1.5, alpha=0.8)
-        
-        # Trayectoria hacia atrás
-        if t_backward < 0:
-            traj = system.simulate_trajectory(x0, y0, (0, t_backward))
-            if traj['success']:
-                ax.plot(traj['x'], traj['y'], color=color,
-                       linewidth=1.5, alpha=0.5, linestyle='--')
-        
-        # Punto inicial
-        ax.scatter(x0, y0, c=color, s=100, marker='o',
-                  edgecolors='black', linewidths=1.5, zorder=5)
-    
-    # Configurar ejes
-    ax.set_xlim(x_range)
-    ax.set_ylim(y_range)
-    ax.set_xlabel('x', fontsize=12)
-    ax.set_ylabel('y', fontsize=12)
-    ax.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
-    ax.axhline(0, color='black', linewidth=0.5)
-    ax.axvline(0, color='black', linewidth=0.5)
-    ax.set_aspect('equal', adjustable='box')
-    
-    log("✓ Simulación completada exitosamente")
+                eigen = (classification['eigenvalues'], classification['eigenvectors'])
+            data['equilibria'].append(dict(eq, eigen=eigen))
+    
+    # 4. Trayectorias (todas juntas, hacia adelante y hacia atrás)
+    previous = reuse('trajectories')
+    if previous is not None:
+        data['trajectories'], data['initial_points'] = previous
+    else:
+        data['initial_points'] = np.array([t['initial_condition'] for t in trajectories],
+                                          dtype=float).reshape(-1, 2)
+        members = []
+        for idx, traj_config in enumerate(trajectories):
+            x0, y0 = traj_config['initial_condition']
+            t_forward = traj_config.get('t_forward', 10)
+            t_backward = traj_config.get('t_backward', -10)
+        
+            if t_forward > 0:
+                members.append((idx, (x0, y0), t_forward))
+            if t_backward < 0:
+                members.append((idx, (x0, y0), t_backward))
+    
+        if members:
+            ensemble = system.simulate_ensemble(
+                np.array([m[1] for m in members], dtype=float),
+                np.array([m[2] for m in members], dtype=float),
+                integrator=config.get('integrator'),
+                should_stop=should_stop
+            )
+        
+            for k, (idx, _, t_end) in enumerate(members):
+                n_valid = ensemble['n_valid'][k]
+                if n_valid < 2:
+                    continue
+                data['trajectories'].append({
+                    'index': idx,
+                    'backward': t_end < 0,
+                    'x': ensemble['x'][k, :n_valid],
+                    'y': ensemble['y'][k, :n_valid],
+                })
+    
+    # 5. Curvas de nivel de una función H(x, y) (p. ej. la energía)
+    if shown['energy']:
+        data['energy'] = reuse('energy')
+    if shown['energy'] and data['energy'] is None:
+        energy = config['energy']
+        resolution = energy.get('resolution', 300)
+        X, Y = np.meshgrid(np.linspace(x_range[0], x_range[1], resolution),
+                           np.linspace(y_range[0], y_range[1], resolution))
+        with np.errstate(all='ignore'):
+            H = np.asarray(energy['function'](X, Y, *energy.get('args', ())), dtype=float)
+        
+        # Un entero pide ese número de niveles entre el mínimo y el máximo
+        levels = energy['levels']
+        if np.isscalar(levels):
+            levels = np.linspace(np.nanmin(H), np.nanmax(H), int(levels))
+        
+        data['energy'] = {
+            'levels': list(levels),
+            'lines': [_level_lines(X, Y, H, level) for level in levels],
+            'fmt': energy.get('fmt', '%.2f'),
+            'style': energy.get('style', {}),
+        }
+    
+    return data
+
+
+def draw_phase_plot(data, ax, log_callback=None):
+    """
+    Dibuja en ax un plano de fase calculado con compute_phase_plot.
+    
+    Debe llamarse desde el hilo de la interfaz. Para redibujar sobre los
+    mismos ejes conviene conservar una PhaseScene, que reutiliza los
+    artistas de las capas que no cambiaron.
+    """
+    from core.scene import PhaseScene
+    
+    PhaseScene(ax).draw(data)
+    
+    if log_callback:
+        log_callback("✓ Simulación completada exitosamente")
+
+
+def render_phase_plot(system, config, ax, log_callback=None):
+    """
+    Función centralizada para renderizar plano de fase.
+    
+    Args:
+        system: Instancia de DynamicSystem2D
+        config: dict con configuración (ranges, trajectories, etc.)
+        ax: matplotlib axes
+        log_callback: función para logging
+    """
+    data = compute_phase_plot(system, config, log_callback)
+    draw_phase_plot(data, ax, log_callback)
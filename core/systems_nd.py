@@ -0,0 +1,593 @@
+"""
+Núcleo genérico para sistemas dinámicos autónomos de dimensión N.
+
+Reúne lo que comparten los motores 2D y 3D: evaluación vectorizada del
+campo, Jacobiano simbólico, búsqueda de equilibrios con Newton en lote,
+clasificación por autovalores sobre pilas de Jacobianos N×N e
+integración de ensembles.
+"""
+
+import warnings
+
+import numpy as np
+
+from core.integrators import integrate_ensemble
+from core.lyapunov import lyapunov_spectrum
+from core.poincare import plane_surface, poincare_crossings
+from utils.expression_parser import ExpressionParser
+
+
+class DynamicSystemND:
+    """Sistema autónomo dX/dt = F(X) definido por expresiones."""
+    
+    # Nombres por defecto de las variables de estado
+    DEFAULT_VARIABLES = ['x', 'y', 'z', 'w']
+    
+    def __init__(self, exprs, variables=None, parameters=None):
+        """
+        Args:
+            exprs: Lista de expresiones, una por componente de dX/dt
+            variables: Nombres de las variables (None = x, y, z, w o
+                       x1..xn si hay más de cuatro)
+            parameters: dict nombre -> valor de los parámetros simbólicos
+        """
+        self.exprs = list(exprs)
+        self.dim = len(self.exprs)
+        
+        if variables is None:
+            if self.dim <= len(self.DEFAULT_VARIABLES):
+                variables = self.DEFAULT_VARIABLES[:self.dim]
+            else:
+                variables = [f"x{i + 1}" for i in range(self.dim)]
+        if len(variables) != self.dim:
+            raise ValueError("Debe haber una variable por expresión")
+        self.variables = list(variables)
+        
+        # Los parámetros son símbolos: se compila una vez y sus valores
+        # se pasan en cada llamada (ver set_parameters)
+        self.parameters = dict(parameters or {})
+        self.param_values = tuple(self.parameters.values())
+        names = list(self.parameters)
+        
+        # Campo completo compilado en una sola función con CSE
+        self.rhs_func = ExpressionParser.compile_system(self.exprs, self.variables, names)
+        
+        # Jacobiano simbólico, derivado y compilado una sola vez
+        try:
+            self.jac_func = ExpressionParser.create_jacobian_function(
+                self.exprs, self.variables, names)
+        except Exception:
+            self.jac_func = None
+        
+        self.equilibria = []
+        self._classifications = {}
+    
+    def set_parameters(self, values=None, **kwargs):
+        """
+        Cambia los valores de los parámetros sin recompilar.
+        
+        Args:
+            values: dict nombre -> valor (también se aceptan como kwargs)
+        """
+        values = dict(values or {}, **kwargs)
+        unknown = set(values) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+        
+        self.parameters.update({name: float(v) for name, v in values.items()})
+        self.param_values = tuple(self.parameters.values())
+        self.equilibria = []
+        self._classifications = {}
+    
+    def cache_key(self):
+        """El sistema queda identificado por sus expresiones y parámetros."""
+        return ('DynamicSystemND', tuple(self.exprs), tuple(self.variables),
+                tuple(self.parameters.items()))
+    
+    def evaluate(self, X, param_values=None):
+        """
+        Evalúa el campo sobre arrays de estados.
+        
+        Args:
+            X: Array (..., n)
+            param_values: Valores de los parámetros (None = los actuales);
+                          pueden ser arrays que se difunden con X[..., 0]
+        
+        Returns:
+            Array (..., n) con dX/dt (NaN/inf donde no está definido)
+        """
+        X = np.asarray(X, dtype=float)
+        if param_values is None:
+            param_values = self.param_values
+        with np.errstate(all='ignore'):
+            F = np.asarray(self.rhs_func(*(X[..., i] for i in range(self.dim)), *param_values),
+                           dtype=float)
+        if F.shape[1:] != X.shape[:-1]:
+            F = np.broadcast_to(F, (self.dim,) + X.shape[:-1])
+        return F.transpose(tuple(range(1, F.ndim)) + (0,))
+    
+    def derivatives(self, t, state):
+        """Para solve_ivp: una sola llamada a la función compilada."""
+        return self.rhs_func(*state, *self.param_values)
+    
+    def jacobian(self, X, epsilon=1e-6, param_values=None):
+        """
+        Jacobiano en lote: simbólico si se pudo derivar, si no por
+        diferencias centrales.
+        
+        Args:
+            X: Array (..., n)
+            param_values: Valores de los parámetros (None = los actuales)
+        
+        Returns:
+            Array (..., n, n) con J[..., i, j] = ∂F_i/∂x_j
+        """
+        X = np.asarray(X, dtype=float)
+        shape = X.shape[:-1] + (self.dim, self.dim)
+        if param_values is None:
+            param_values = self.param_values
+        
+        if self.jac_func is not None:
+            try:
+                with np.errstate(all='ignore'):
+                    J = self.jac_func(*np.moveaxis(X, -1, 0), *param_values)
+                return J if J.shape == shape else np.broadcast_to(J, shape).copy()
+            except Exception:
+                pass
+        
+        J = np.empty(shape)
+        for j in range(self.dim):
+            step = np.zeros(self.dim)
+            step[j] = epsilon
+            J[..., :, j] = (self.evaluate(X + step, param_values) -
+                            self.evaluate(X - step, param_values)) / (2 * epsilon)
+        return J
+    
+    def find_equilibria(self, bounds=None, n_seeds=1000):
+        """
+        Encuentra los equilibrios F(X) = 0 con Newton amortiguado en lote.
+        
+        Args:
+            bounds: Lista de (min, max) por variable; los equilibrios fuera
+                    de la caja se descartan. None = búsqueda sin caja, con
+                    semillas en escala logarítmica (de 0.1 a 100 por eje)
+            n_seeds: Número aproximado de semillas
+        
+        Returns:
+            Lista de dicts con 'point', 'type', 'stability', 'eigenvalues'
+        """
+        seeds = seed_grid(self.dim, bounds, n_seeds)
+        points = solve_equilibria(self.evaluate, self.jacobian, seeds, bounds)
+        
+        classifications = classify_jacobians(self.jacobian(points)) if len(points) else []
+        
+        equilibria = []
+        for point, classification in zip(points, classifications):
+            point = tuple(float(v) + 0.0 for v in point)  # sin -0.0
+            self._classifications[point] = classification
+            equilibria.append({
+                'point': point,
+                'type': classification['type'],
+                'stability': classification['stability'],
+                'eigenvalues': classification['eigenvalues']
+            })
+        
+        self.equilibria = equilibria
+        return equilibria
+    
+    def classify_equilibrium(self, point):
+        """
+        Clasifica un punto de equilibrio por sus autovalores.
+        
+        Returns:
+            dict con 'type', 'stability', 'eigenvalues', 'eigenvectors',
+            'jacobian'
+        """
+        key = tuple(float(v) for v in point)
+        if key not in self._classifications:
+            J = self.jacobian(np.array(key))
+            self._classifications[key] = classify_jacobians(J[None])[0]
+        return self._classifications[key]
+    
+    def simulate_ensemble(self, initial_conditions, t_ends, n_points=1000,
+                          rtol=1e-6, atol=1e-9, should_stop=None):
+        """
+        Simula muchas trayectorias a la vez como un único estado (N, n).
+        
+        Args:
+            initial_conditions: Array (N, n) de condiciones iniciales
+            t_ends: Tiempo final por trayectoria (N,), negativo = hacia atrás
+            n_points: Muestras por trayectoria
+            should_stop: Función de cancelación cooperativa (opcional)
+        
+        Returns:
+            dict con 't' (N, M), 'states' (N, M, n), 'n_valid' (N,) y
+            'success' (N,)
+        """
+        result = integrate_ensemble(self.evaluate, initial_conditions, t_ends,
+                                    n_points=n_points, rtol=rtol, atol=atol,
+                                    should_stop=should_stop)
+        
+        return {
+            't': result['t'],
+            'states': result['states'],
+            'n_valid': result['n_valid'],
+            'success': result['success']
+        }
+    
+    def lyapunov_spectrum(self, initial_conditions, parameters=None, **options):
+        """
+        Espectro de Lyapunov de un ensemble con la dinámica tangente
+        (Jacobiano simbólico) y re-ortonormalización QR en lote.
+        
+        Args:
+            initial_conditions: Array (N, n) de condiciones iniciales
+            parameters: dict nombre -> array (N,) con valores por miembro,
+                        para barrer parámetros en una sola llamada; los
+                        parámetros no incluidos usan su valor actual
+            **options: dt, t_transient, t_max, t_min, renorm_interval,
+                       check_interval, tol, n_exponents, settle_tol,
+                       should_stop (ver
+                       core.lyapunov.lyapunov_spectrum)
+        
+        Returns:
+            dict de core.lyapunov.lyapunov_spectrum ('exponents' (N, k),
+            'converged', 'change', 'time', ...)
+        """
+        X0 = np.atleast_2d(np.asarray(initial_conditions, dtype=float))
+        n_members = len(X0)
+        
+        parameters = dict(parameters or {})
+        unknown = set(parameters) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+        
+        values = [np.broadcast_to(np.asarray(parameters[name], dtype=float), (n_members,))
+                  if name in parameters else value
+                  for name, value in self.parameters.items()]
+        
+        def params_at(idx):
+            return tuple(v[idx] if np.ndim(v) else v for v in values)
+        
+        def field(X, idx):
+            return self.evaluate(X, params_at(idx))
+        
+        def jacobian(X, idx):
+            return self.jacobian(X, param_values=params_at(idx))
+        
+        return lyapunov_spectrum(field, jacobian, X0, **options)
+    
+    def surface_function(self, surface):
+        """
+        Convierte una superficie a una función (K, n) -> (K,).
+        
+        Args:
+            surface: Expresión en las variables y parámetros ('z - 27' o
+                     'z = 27'), tupla (normal, offset) de un plano
+                     n·X = offset, o función ya vectorizada
+        """
+        if callable(surface):
+            return surface
+        if not isinstance(surface, str):
+            normal, offset = surface
+            return plane_surface(normal, offset)
+        
+        if '=' in surface:
+            lhs, rhs = surface.split('=', 1)
+            surface = f"({lhs}) - ({rhs})"
+        func = ExpressionParser.create_numpy_function(
+            surface, self.variables, list(self.parameters))
+        param_values = self.param_values
+        
+        def evaluate(X):
+            g = func(*np.moveaxis(X, -1, 0), *param_values)
+            return np.broadcast_to(np.asarray(g, dtype=float), X.shape[:-1])
+        
+        return evaluate
+    
+    def iter_poincare_section(self, initial_conditions, t_max, surface, direction=1,
+                              t_transient=0.0, max_crossings=None, chunk_size=4096,
+                              rtol=1e-8, atol=1e-10, should_stop=None):
+        """
+        Genera los puntos de la sección de Poincaré en bloques, sin
+        guardar las trayectorias (apto para integraciones muy largas).
+        
+        Args:
+            initial_conditions: Array (N, n) o un único estado (n,)
+            t_max: Tiempo de integración (escalar o (N,))
+            surface: Ver surface_function
+            direction: 1 = cruces con g creciente, -1 = decreciente, 0 = ambos
+            t_transient: Se descartan los cruces anteriores
+            max_crossings: Cruces por trayectoria antes de detenerla
+            chunk_size: Puntos por bloque
+        
+        Yields:
+            dict con 'index', 't' y 'points' (ver core.poincare)
+        """
+        yield from poincare_crossings(
+            self.evaluate, self.surface_function(surface), initial_conditions, t_max,
+            direction=direction, t_transient=t_transient, max_crossings=max_crossings,
+            chunk_size=chunk_size, rtol=rtol, atol=atol, should_stop=should_stop,
+            scalar_rhs=self.derivatives
+        )
+    
+    def poincare_section(self, initial_conditions, t_max, surface, direction=1,
+                         t_transient=0.0, max_crossings=None, rtol=1e-8, atol=1e-10,
+                         should_stop=None):
+        """
+        Sección de Poincaré completa de una o varias trayectorias.
+        
+        Returns:
+            dict con 'index' (M,), 't' (M,) y 'points' (M, n), ordenados
+            por trayectoria y tiempo
+        """
+        chunks = list(self.iter_poincare_section(
+            initial_conditions, t_max, surface, direction=direction,
+            t_transient=t_transient, max_crossings=max_crossings,
+            rtol=rtol, atol=atol, should_stop=should_stop
+        ))
+        if not chunks:
+            return {'index': np.zeros(0, dtype=int), 't': np.zeros(0),
+                    'points': np.zeros((0, self.dim))}
+        
+        index = np.concatenate([c['index'] for c in chunks])
+        t = np.concatenate([c['t'] for c in chunks])
+        points = np.concatenate([c['points'] for c in chunks])
+        order = np.lexsort((t, index))
+        return {'index': index[order], 't': t[order], 'points': points[order]}
+    
+    def solve(self, initial_condition, t_span, t_eval=None, max_step=0.01,
+              should_stop=None):
+        """
+        Resuelve el sistema desde una condición inicial.
+        
+        Args:
+            initial_condition: Estado inicial (n,)
+            t_span: (t_start, t_end)
+            t_eval: Puntos de tiempo donde evaluar
+            max_step: Paso máximo del integrador
+            should_stop: Función de cancelación; se consulta en cada paso
+                         como evento terminal de solve_ivp
+        
+        Returns:
+            Objeto solution de solve_ivp ('status' = 1 si se canceló)
+        """
+        from scipy.integrate import solve_ivp
+        
+        if t_eval is None:
+            t_eval = np.linspace(t_span[0], t_span[1], 5000)
+        
+        events = None
+        if should_stop is not None:
+            # Evento terminal: vale 1 hasta que se pide cancelar y luego
+            # t_stop - t, que se anula al final del paso en curso
+            stop = []
+            
+            def cancelled(t, state):
+                if not stop:
+                    if not should_stop():
+                        return 1.0
+                    stop.append(t)
+                return stop[0] - t
+            
+            cancelled.terminal = True
+            events = cancelled
+        
+        sol = solve_ivp(
+            self.derivatives,
+            t_span,
+            initial_condition,
+            t_eval=t_eval,
+            method='RK45',
+            dense_output=True,
+            max_step=max_step,
+            events=events
+        )
+        
+        return sol
+
+
+def seed_grid(dim, bounds=None, n_seeds=1000):
+    """
+    Semillas para la búsqueda de equilibrios: grilla regular en la caja
+    o, sin caja, grilla simétrica en escala logarítmica alrededor del origen.
+    
+    Returns:
+        Array (K, dim)
+    """
+    n_side = max(int(n_seeds ** (1 / dim) + 1e-9), 1)
+    
+    if bounds is None:
+        k = max((n_side - 1) // 2, 1)
+        radii = np.geomspace(0.1, 100.0, k)
+        axes = [np.concatenate([-radii[::-1], [0.0], radii])] * dim
+    else:
+        axes = [np.linspace(lo, hi, n_side) for lo, hi in bounds]
+    
+    grids = np.meshgrid(*axes, indexing='ij')
+    return np.column_stack([G.ravel() for G in grids])
+
+
+def solve_equilibria(residual, jacobian, seeds, bounds=None, tol=1e-6, merge_tol=0.01):
+    """
+    Resuelve residual(X) = 0 desde todas las semillas a la vez.
+    
+    Args:
+        residual: Función (K, n) -> (K, n)
+        jacobian: Función (K, n) -> (K, n, n)
+        seeds: Array (K, n)
+        bounds: Caja opcional [(min, max), ...] para filtrar soluciones
+        tol: Umbral de ||residuo||² para aceptar una solución
+        merge_tol: Distancia por coordenada para fusionar duplicados
+    
+    Returns:
+        Array (M, n) de soluciones distintas, ordenadas
+    """
+    seeds = np.asarray(seeds, dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with np.errstate(all='ignore'):
+            points, residual_norm = _newton_lm(residual, jacobian, seeds)
+    
+    valid = np.isfinite(residual_norm) & (residual_norm < tol)
+    if bounds is not None:
+        span = max(max(hi - lo for lo, hi in bounds), 1.0)
+        margin = 1e-9 * span
+        for j, (lo, hi) in enumerate(bounds):
+            valid &= (points[:, j] >= lo - margin) & (points[:, j] <= hi + margin)
+    
+    unique = sorted(_merge_duplicates(points[valid], tol=merge_tol))
+    return np.array(unique, dtype=float).reshape(-1, seeds.shape[1])
+
+
+def classify_jacobians(J, tol=1e-8):
+    """
+    Clasifica equilibrios por los autovalores de una pila de Jacobianos.
+    
+    Los autovalores de toda la pila se calculan en una sola llamada.
+    
+    Args:
+        J: Array (K, n, n)
+        tol: Umbral para considerar nula una parte real
+    
+    Returns:
+        Lista de K dicts con 'type', 'stability', 'eigenvalues',
+        'eigenvectors' y 'jacobian'
+    """
+    J = np.asarray(J, dtype=float)
+    finite = np.isfinite(J).all(axis=(1, 2))
+    safe = np.where(finite[:, None, None], J, 0.0)
+    eigenvalues, eigenvectors = np.linalg.eig(safe)
+    
+    real = np.real(eigenvalues)
+    n_neg = np.sum(real < -tol, axis=1)
+    n_pos = np.sum(real > tol, axis=1)
+    n_zero = J.shape[1] - n_neg - n_pos
+    oscillatory = np.any(np.iscomplex(eigenvalues), axis=1)
+    
+    results = []
+    for k in range(len(J)):
+        if not finite[k]:
+            eq_type, stability = "Desconocido", "Desconocida"
+        elif oscillatory[k] and n_neg[k] == 0 and n_pos[k] == 0:
+            eq_type, stability = "Centro", "Marginalmente estable"
+        elif n_neg[k] > 0 and n_pos[k] > 0:
+            # Signos opuestos -> Punto de silla (con rotación: silla-foco)
+            eq_type = "Silla-foco" if oscillatory[k] else "Punto de silla"
+            stability = "Inestable"
+        elif n_zero[k] > 0:
+            eq_type = "No hiperbólico"
+            stability = "Inestable" if n_pos[k] > 0 else "Marginalmente estable"
+        else:
+            # Todas las partes reales del mismo signo
+            eq_type = "Foco espiral" if oscillatory[k] else "Nodo"
+            stability = "Estable" if n_pos[k] == 0 else "Inestable"
+        
+        results.append({
+            'type': eq_type,
+            'stability': stability,
+            'eigenvalues': eigenvalues[k],
+            'eigenvectors': eigenvectors[k],
+            'jacobian': J[k]
+        })
+    
+    return results
+
+
+def _newton_lm(residual, jacobian, Z0, tol=1e-24, max_iter=100):
+    """
+    Newton amortiguado (Levenberg-Marquardt) vectorizado sobre semillas.
+    
+    Resuelve residual(Z) = 0 iterando todas las filas de Z a la vez. Cada
+    semilla tiene su propio factor de amortiguamiento: se reduce cuando el
+    paso disminuye el residuo y se aumenta (rechazando el paso) si no.
+    
+    Args:
+        residual: Función (N, d) -> (N, d)
+        jacobian: Función (N, d) -> (N, d, d)
+        Z0: Semillas, array (N, d)
+        tol: Umbral de ||residuo||² para dar una semilla por convergida
+        max_iter: Máximo de iteraciones
+    
+    Returns:
+        (Z, ||residuo||²) por semilla
+    """
+    Z = np.array(Z0, dtype=float)
+    n, d = Z.shape
+    R = residual(Z)
+    norm = np.sum(R**2, axis=1)
+    damping = np.full(n, 1e-3)
+    active = np.isfinite(norm) & (norm > tol)
+    eye = np.eye(d)
+    
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        
+        idx = np.flatnonzero(active)
+        J = jacobian(Z[idx])
+        Jt = np.swapaxes(J, -1, -2)
+        A = Jt @ J + damping[idx, None, None] * eye
+        b = -(Jt @ R[idx][..., None])
+        
+        step_ok = np.isfinite(A).all(axis=(1, 2)) & np.isfinite(b).all(axis=(1, 2))
+        A[~step_ok] = eye
+        b[~step_ok] = 0.0
+        try:
+            delta = np.linalg.solve(A, b)[..., 0]
+        except np.linalg.LinAlgError:
+            delta = np.zeros((len(idx), d))
+            step_ok[:] = False
+        
+        Z_trial = Z[idx] + delta
+        R_trial = residual(Z_trial)
+        norm_trial = np.sum(R_trial**2, axis=1)
+        
+        accept = step_ok & np.isfinite(norm_trial) & (norm_trial < norm[idx])
+        acc = idx[accept]
+        Z[acc] = Z_trial[accept]
+        R[acc] = R_trial[accept]
+        norm[acc] = norm_trial[accept]
+        damping[acc] *= 0.3
+        damping[idx[~accept]] *= 10.0
+        
+        # Converge, se estanca o el problema está mal condicionado
+        stalled = damping[idx] > 1e12
+        tiny_step = accept & (np.abs(delta).max(axis=1) < 1e-15 * (1 + np.abs(Z[idx]).max(axis=1)))
+        active[idx[~step_ok | stalled | tiny_step]] = False
+        active &= norm > tol
+    
+    return Z, norm
+
+
+def _merge_duplicates(points, tol):
+    """
+    Elimina puntos repetidos (a distancia < tol por coordenada) con un hash espacial.
+    
+    Conserva el primero de cada grupo en el orden de entrada.
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) == 0:
+        return []
+    
+    d = points.shape[1]
+    cells = np.floor(points / tol).astype(np.int64)
+    neighbors = np.array(np.meshgrid(*[[-1, 0, 1]] * d, indexing='ij')).reshape(d, -1).T
+    
+    buckets = {}
+    unique = []
+    for point, cell in zip(points, cells):
+        is_duplicate = False
+        for offset in neighbors:
+            for other in buckets.get(tuple(cell + offset), ()):
+                if np.all(np.abs(point - other) < tol):
+                    is_duplicate = True
+                    break
+            if is_duplicate:
+                break
+        
+        if not is_duplicate:
+            buckets.setdefault(tuple(cell), []).append(point)
+            unique.append(tuple(float(v) for v in point))
+    
+    return unique
@@ -0,0 +1,191 @@
+"""
+Ejecución de cálculos en segundo plano para las pestañas.
+
+El cálculo de una pestaña (integraciones, barridos, espectros) corre en un
+hilo de trabajo y nunca toca Tk. Los mensajes van directo a la cola de la
+ConsoleText (segura entre hilos) y la pestaña consulta el estado del
+trabajo con after(); en cada consulta vuelca la consola y, al terminar,
+el dibujo se hace en el hilo principal. Cada pestaña tiene un JobRunner;
+lanzar un cálculo nuevo cancela el anterior (sus resultados se descartan
+y se llama a su on_cancel) y la cancelación es cooperativa: los
+integradores consultan job.should_stop.
+"""
+
+import threading
+import time
+import traceback
+
+
+class JobCancelled(Exception):
+    """El trabajo fue cancelado (o reemplazado por uno nuevo)."""
+
+
+class Job:
+    """Contexto que recibe la función de cálculo."""
+    
+    def __init__(self, job_id, console=None):
+        self.id = job_id
+        self.console = console
+        self.outcome = None
+        self.callbacks = None
+        self._last_progress = None
+        self._cancelled = threading.Event()
+        self.started = time.perf_counter()
+    
+    def cancel(self):
+        """Pide la cancelación (se atiende en el próximo control)."""
+        self._cancelled.set()
+    
+    def should_stop(self):
+        """True si se pidió cancelar; para pasar como should_stop."""
+        return self._cancelled.is_set()
+    
+    def check(self):
+        """Lanza JobCancelled si se pidió cancelar."""
+        if self._cancelled.is_set():
+            raise JobCancelled()
+    
+    def log(self, message):
+        """Envía un mensaje a la consola; los de un trabajo cancelado se descartan."""
+        if self.console is not None and not self._cancelled.is_set():
+            self.console.log(message)
+    
+    def progress(self, done, total, message='Progreso'):
+        """
+        Informa el avance (cada 10 %) y atiende la cancelación; sirve
+        como progress_callback (completados, total).
+        """
+        self.check()
+        step = int(10 * done / total) if total else 10
+        if step != self._last_progress:
+            self._last_progress = step
+            self.log(f"  {message}: {10 * step}% ({done}/{total})")
+
+
+class JobRunner:
+    """
+    Ejecutor de trabajos de una pestaña.
+    
+    Ejemplo:
+        self.jobs = JobRunner(self, self.console)
+        self.jobs.submit(compute, on_done=self.draw_results)
+    
+    compute(job) corre en un hilo de trabajo y retorna los datos;
+    on_done(datos) se llama en el hilo de Tk.
+    """
+    
+    def __init__(self, widget, console=None, poll_ms=50):
+        """
+        Args:
+            widget: Widget de Tk que provee after()
+            console: ConsoleText donde volcar los mensajes (opcional)
+            poll_ms: Intervalo de consulta en milisegundos
+        """
+        self.widget = widget
+        self.console = console
+        self.poll_ms = poll_ms
+        self.job = None
+        self._next_id = 0
+        
+        # Trabajos lanzados cuyo resultado aún no se despachó (incluye
+        # los cancelados, que siguen corriendo hasta el próximo control)
+        self._active = []
+        self._polling = False
+    
+    @property
+    def busy(self):
+        """True si hay un trabajo en curso que no fue cancelado."""
+        return self.job is not None and not self.job.should_stop()
+    
+    def submit(self, compute, on_done, on_error=None, on_cancel=None):
+        """
+        Lanza un trabajo, cancelando el que estuviera en curso.
+        
+        Args:
+            compute: Función (job) -> datos, ejecutada en el hilo de trabajo
+            on_done: Función (datos) llamada en el hilo de Tk
+            on_error: Función (excepción, traceback) llamada en el hilo de
+                      Tk (None = registrar en la consola)
+            on_cancel: Función () llamada si el trabajo se cancela
+        
+        Returns:
+            El Job lanzado
+        """
+        self.cancel(quiet=True)
+        
+        self._next_id += 1
+        job = Job(self._next_id, self.console)
+        job.callbacks = (on_done, on_error, on_cancel)
+        self.job = job
+        self._active.append(job)
+        
+        def worker():
+            try:
+                outcome = ('done', compute(job))
+            except JobCancelled:
+                outcome = ('cancelled', None)
+            except Exception as e:
+                outcome = ('error', (e, traceback.format_exc()))
+            job.outcome = outcome
+        
+        threading.Thread(target=worker, name=f"job-{job.id}", daemon=True).start()
+        
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+        return job
+    
+    def cancel(self, quiet=False):
+        """
+        Cancela el trabajo en curso; sus resultados se descartan. El
+        trabajo queda pendiente hasta que termine su hilo, y entonces
+        _poll llama a su on_cancel.
+        """
+        if self.job is None:
+            return
+        self.job.cancel()
+        if not quiet and self.console is not None:
+            self.console.log("⏹ Cálculo cancelado")
+        self.job = None
+    
+    def _poll(self):
+        finished = [job for job in self._active if job.outcome is not None]
+        
+        # Los hilos de trabajo solo encolan mensajes: se vuelcan aquí, en
+        # el hilo de Tk (después de leer outcome, así no queda ninguno de
+        # un trabajo terminado)
+        if self.console is not None:
+            self.console.flush()
+        
+        for job in finished:
+            self._active.remove(job)
+            if job is self.job:
+                self.job = None
+        
+        # Se reprograma antes de despachar: los callbacks pueden lanzar
+        # otro trabajo o fallar
+        if self._active:
+            self.widget.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+        
+        for job in finished:
+            self._finish(job)
+    
+    def _finish(self, job):
+        on_done, on_error, on_cancel = job.callbacks
+        kind, value = job.outcome
+        
+        if kind == 'cancelled' or job.should_stop():
+            # Aunque un trabajo cancelado llegue al final, su resultado
+            # se descarta
+            if on_cancel:
+                on_cancel()
+        elif kind == 'done':
+            on_done(value)
+        elif on_error:
+            on_error(*value)
+        elif self.console is not None:
+            error, detail = value
+            self.console.log(f"✗ Error: {error}")
+            self.console.log(detail.rstrip())
@@ -2,25 +2,50 @@
 Ventana principal de la aplicación con sistema de pestañas.
 """
 
+import importlib
+import time
 import tkinter as tk
 from tkinter import ttk
 
 from gui.widgets import COLORS
-from gui.tab_2d_autonomous import AutonomousTab2D
-from gui.tab_1d_autonomous import AutonomousTab1D
-from gui.tab_bifurcation import BifurcationTab
-from gui.tab_2d_linear import LinearNonHomogeneousTab
-from gui.tab_ode_conversion import ODEConversionTab
-from gui.tab_hopf_2d import HopfBifurcationTab
-from gui.tab_lorenz import LorenzTab
-from gui.tab_vanderpol import VanDerPolTab
-from gui.tab_conservative import ConservativeTab
-from gui.tab_romeojulieta import RomeoJulietaTab
-from gui.tab_pitchfork_subcritical import PitchforkSubcriticalTab
-from gui.tab_oscilador_armonico import OsciladorArmonicoTab
-from gui.tab_rossler import RosslerTab
-from gui.tab_chua import ChuaTab
-from gui.tab_sprott import SprottTab
+
+STATUS_TEXT = "Simulador de Sistemas Dinámicos v1.0"
+
+# Pestañas por sección: (título, módulo, clase, argumentos). Cada pestaña
+# se construye la primera vez que se muestra, de modo que el arranque no
+# importa ni arma las figuras de pestañas que nunca se abren.
+TAB_SECTIONS = [
+    ("� Análisis 1D", [
+        ("Autónomo 1D", 'gui.tab_1d_autonomous', 'AutonomousTab1D', {}),
+        ("Bif. Saddle-Node", 'gui.tab_bifurcation', 'BifurcationTab',
+         {'bifurcation_type': 'saddle-node'}),
+        ("Bif. Pitchfork", 'gui.tab_bifurcation', 'BifurcationTab',
+         {'bifurcation_type': 'pitchfork'}),
+        ("Bif. Pitchfork Subcrítica", 'gui.tab_pitchfork_subcritical',
+         'PitchforkSubcriticalTab', {}),
+        ("Bif. Transcrítica", 'gui.tab_bifurcation', 'BifurcationTab',
+         {'bifurcation_type': 'transcritica'}),
+        ("EDO → 1er Orden", 'gui.tab_ode_conversion', 'ODEConversionTab', {}),
+    ]),
+    ("📐 Análisis 2D", [
+        ("Autónomo 2D", 'gui.tab_2d_autonomous', 'AutonomousTab2D', {}),
+        ("Lineal No-Homog.", 'gui.tab_2d_linear', 'LinearNonHomogeneousTab', {}),
+        ("No-Lineal", 'gui.tab_2d_autonomous', 'AutonomousTab2D',
+         {'default_dx': "y", 'default_dy': "-sin(x) - 0.5*y",
+          'title': "Sistemas No-Lineales 2D"}),
+        ("Bif. Hopf 2D", 'gui.tab_hopf_2d', 'HopfBifurcationTab', {}),
+        ("Van der Pol", 'gui.tab_vanderpol', 'VanDerPolTab', {}),
+        ("Conservativo", 'gui.tab_conservative', 'ConservativeTab', {}),
+        ("Romeo y Julieta", 'gui.tab_romeojulieta', 'RomeoJulietaTab', {}),
+        ("Oscilador Armónico", 'gui.tab_oscilador_armonico', 'OsciladorArmonicoTab', {}),
+    ]),
+    ("🦋 Análisis 3D", [
+        ("Sistema de Lorenz", 'gui.tab_lorenz', 'LorenzTab', {}),
+        ("Sistema de Rössler", 'gui.tab_rossler', 'RosslerTab', {}),
+        ("Circuito de Chua", 'gui.tab_chua', 'ChuaTab', {}),
+        ("Sistemas de Sprott", 'gui.tab_sprott', 'SprottTab', {}),
+    ]),
+]
 
 
 class SimuladorApp(tk.Tk):
@@ -41,6 +66,9 @@ class SimuladorApp(tk.Tk):
         
         # Centrar ventana
         self.center_window()
+        
+        # Construir la pestaña inicial apenas arranque el bucle de eventos
+        self.after_idle(self.on_tab_changed)
     
     def setup_style(self):
         """Configura los estilos de ttk."""
@@ -59,98 +87,34 @@ class SimuladorApp(tk.Tk):
                  foreground=[('selected', COLORS['btn_primary'])])
     
     def create_widgets(self):
-        """Crea los widgets principales."""
+        """Crea los widgets principales (las pestañas quedan pendientes)."""
         # Notebook principal
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # === PESTAÑA: Análisis 1D ===
-        tab_1d = ttk.Frame(self.notebook)
-        self.notebook.add(tab_1d, text="� Análisis 1D")
-        
-        # Sub-notebook para 1D
-        notebook_1d = ttk.Notebook(tab_1d)
-        notebook_1d.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Sub-pestañas 1D
-        autonomous_1d_tab = AutonomousTab1D(notebook_1d)
-        notebook_1d.add(autonomous_1d_tab, text="Autónomo 1D")
-        
-        # Bifurcaciones
-        saddle_node_tab = BifurcationTab(notebook_1d, bifurcation_type='saddle-node')
-        notebook_1d.add(saddle_node_tab, text="Bif. Saddle-Node")
-        
-        pitchfork_tab = BifurcationTab(notebook_1d, bifurcation_type='pitchfork')
-        notebook_1d.add(pitchfork_tab, text="Bif. Pitchfork")
-        
-        pitchfork_subcritical_tab = PitchforkSubcriticalTab(notebook_1d)
-        notebook_1d.add(pitchfork_subcritical_tab, text="Bif. Pitchfork Subcrítica")
-        
-        transcritica_tab = BifurcationTab(notebook_1d, bifurcation_type='transcritica')
-        notebook_1d.add(transcritica_tab, text="Bif. Transcrítica")
-        
-        # Conversión de EDOs
-        ode_tab = ODEConversionTab(notebook_1d)
-        notebook_1d.add(ode_tab, text="EDO → 1er Orden")
-        
-        # === PESTAÑA: Análisis 2D ===
-        tab_2d = ttk.Frame(self.notebook)
-        self.notebook.add(tab_2d, text="📐 Análisis 2D")
-        
-        # Sub-notebook para 2D
-        notebook_2d = ttk.Notebook(tab_2d)
-        notebook_2d.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Sub-pestañas 2D
-        autonomous_2d_tab = AutonomousTab2D(notebook_2d)
-        notebook_2d.add(autonomous_2d_tab, text="Autónomo 2D")
-        
-        linear_tab = LinearNonHomogeneousTab(notebook_2d)
-        notebook_2d.add(linear_tab, text="Lineal No-Homog.")
-        
-        nonlinear_tab = AutonomousTab2D(notebook_2d, default_dx="y", default_dy="-sin(x) - 0.5*y", title="Sistemas No-Lineales 2D")
-        notebook_2d.add(nonlinear_tab, text="No-Lineal")
-        
-        hopf_tab = HopfBifurcationTab(notebook_2d)
-        notebook_2d.add(hopf_tab, text="Bif. Hopf 2D")
-        
-        vanderpol_tab = VanDerPolTab(notebook_2d)
-        notebook_2d.add(vanderpol_tab, text="Van der Pol")
-        
-        conservative_tab = ConservativeTab(notebook_2d)
-        notebook_2d.add(conservative_tab, text="Conservativo")
-        
-        romeojulieta_tab = RomeoJulietaTab(notebook_2d)
-        notebook_2d.add(romeojulieta_tab, text="Romeo y Julieta")
-        
-        oscilador_tab = OsciladorArmonicoTab(notebook_2d)
-        notebook_2d.add(oscilador_tab, text="Oscilador Armónico")
-        
-        # === PESTAÑA: Análisis 3D ===
-        tab_3d = ttk.Frame(self.notebook)
-        self.notebook.add(tab_3d, text="🦋 Análisis 3D")
-        
-        # Sub-notebook para 3D
-        notebook_3d = ttk.Notebook(tab_3d)
-        notebook_3d.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Sub-pestañas 3D
-        lorenz_tab = LorenzTab(notebook_3d)
-        notebook_3d.add(lorenz_tab, text="Sistema de Lorenz")
-        
-        rossler_tab = RosslerTab(notebook_3d)
-        notebook_3d.add(rossler_tab, text="Sistema de Rössler")
-        
-        chua_tab = ChuaTab(notebook_3d)
-        notebook_3d.add(chua_tab, text="Circuito de Chua")
-        
-        sprott_tab = SprottTab(notebook_3d)
-        notebook_3d.add(sprott_tab, text="Sistemas de Sprott")
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        
+        # Marcos vacíos: especificación de la pestaña pendiente de cada uno
+        self.pending_tabs = {}
+        self.tabs = {}
+        
+        for section_title, tab_specs in TAB_SECTIONS:
+            section = ttk.Frame(self.notebook)
+            self.notebook.add(section, text=section_title)
+            
+            # Sub-notebook de la sección
+            sub_notebook = ttk.Notebook(section)
+            sub_notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            sub_notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+            
+            for spec in tab_specs:
+                holder = ttk.Frame(sub_notebook)
+                sub_notebook.add(holder, text=spec[0])
+                self.pending_tabs[str(holder)] = (holder, spec)
         
         # Barra de estado
         self.status_bar = tk.Label(
             self,
-            text="Listo | Simulador de Sistemas Dinámicos v1.0",
+            text=f"Listo | {STATUS_TEXT}",
             bg=COLORS['bg_secondary'],
             fg=COLORS['text_secondary'],
             font=('Arial', 9),
@@ -159,6 +123,31 @@ class SimuladorApp(tk.Tk):
         )
         self.status_bar.pack(fill=tk.X, side=tk.BOTTOM)
     
+    def on_tab_changed(self, event=None):
+        """Construye la pestaña visible si todavía no se construyó."""
+        if not self.pending_tabs:
+            return
+        
+        section = self.nametowidget(self.notebook.select())
+        sub_notebook = section.winfo_children()[0]
+        current = sub_notebook.select()
+        if current not in self.pending_tabs:
+            return
+        
+        holder, (title, module_name, class_name, kwargs) = self.pending_tabs.pop(current)
+        self.status_bar.config(text=f"Cargando {title}...")
+        self.update_idletasks()
+        
+        start = time.perf_counter()
+        tab_class = getattr(importlib.import_module(module_name), class_name)
+        tab = tab_class(holder, **kwargs)
+        tab.pack(fill=tk.BOTH, expand=True)
+        self.tabs[title] = tab
+        
+        elapsed = time.perf_counter() - start
+        self.status_bar.config(
+            text=f"Listo | {title} cargada en {elapsed:.2f} s | {STATUS_TEXT}")
+    
     def center_window(self):
         """Centra la ventana en la pantalla."""
         self.update_idletasks()
@@ -0,0 +1,111 @@
+"""
+Presupuesto de arranque de la aplicación.
+
+Mide, en un proceso nuevo, cuánto tarda en importarse la ventana
+principal y en mostrarse la pestaña inicial, la memoria residente que
+ocupa y si se cargaron módulos que deberían diferirse hasta el primer
+cálculo. Uso:
+
+    python -m gui.startup
+
+Sin pantalla disponible se mide la importación del módulo de la pestaña
+inicial en lugar de la construcción de la ventana.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+# Límites del arranque (segundos y MB)
+STARTUP_BUDGET = {
+    'import_s': 0.3,
+    'window_s': 3.0,
+    'memory_mb': 150,
+}
+
+# Módulos que no deben cargarse hasta que el usuario calcule algo
+DEFERRED_MODULES = ('sympy', 'scipy')
+
+_PROBE = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+import gui.main_window as main_window
+report = {'import_s': time.perf_counter() - start}
+
+start = time.perf_counter()
+try:
+    app = main_window.SimuladorApp()
+except Exception:
+    app = None
+    _, module, _, _ = main_window.TAB_SECTIONS[0][1][0]
+    importlib.import_module(module)
+else:
+    app.on_tab_changed()
+    app.update()
+report['window_s'] = time.perf_counter() - start
+report['display'] = app is not None
+if app is not None:
+    app.destroy()
+
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report['memory_mb'] = rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+except ImportError:
+    report['memory_mb'] = None
+
+report['loaded'] = [name for name in %r if name in sys.modules]
+print(json.dumps(report))
+'''
+
+
+def measure_startup():
+    """
+    Mide el arranque en un intérprete nuevo (sin módulos ya importados).
+    
+    Returns:
+        dict con 'import_s', 'window_s', 'display', 'memory_mb' (None si
+        no se puede medir) y 'loaded' (módulos diferidos que se cargaron)
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE % (DEFERRED_MODULES,)],
+        cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def check_startup_budget(report, budget=None):
+    """
+    Compara una medición con el presupuesto.
+    
+    Returns:
+        Lista de str con los límites excedidos (vacía si se cumple)
+    """
+    budget = STARTUP_BUDGET if budget is None else budget
+    problems = []
+    
+    for key, limit in budget.items():
+        value = report.get(key)
+        if value is not None and value > limit:
+            problems.append(f"{key} = {value:.2f} > {limit}")
+    for name in report['loaded']:
+        problems.append(f"'{name}' se importó durante el arranque")
+    return problems
+
+
+if __name__ == "__main__":
+    report = measure_startup()
+    print(f"Importación de la ventana: {report['import_s']:.3f} s")
+    label = "Ventana y pestaña inicial" if report['display'] else "Módulo de la pestaña inicial (sin pantalla)"
+    print(f"{label}: {report['window_s']:.3f} s")
+    if report['memory_mb'] is not None:
+        print(f"Memoria residente máxima: {report['memory_mb']:.0f} MB")
+    
+    problems = check_startup_budget(report)
+    for problem in problems:
+        print(f"✗ {problem}")
+    if not problems:
+        print("✓ Arranque dentro del presupuesto")
+    sys.exit(1 if problems else 0)
@@ -10,7 +10,8 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.figure import Figure
 
 from gui.widgets import *
-from core.systems_2d import CustomSystem2D, render_phase_plot
+from core.systems_2d import CustomSystem2D
+from core.scene import PhaseScene
 from utils.expression_parser import ExpressionParser
 
 
@@ -122,18 +123,22 @@ class AutonomousTab2D(tk.Frame):
         
         tk.Checkbutton(vis_frame, text="Campo vectorial",
                       variable=self.show_field_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary'],
                       font=('Arial', 10)).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Nullclines (isoclinas)",
                       variable=self.show_nullclines_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary'],
                       font=('Arial', 10)).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Puntos de equilibrio",
                       variable=self.show_equilibria_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary'],
                       font=('Arial', 10)).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Autovectores",
                       variable=self.show_eigenvectors_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary'],
                       font=('Arial', 10)).pack(anchor=tk.W)
         
@@ -169,6 +174,8 @@ class AutonomousTab2D(tk.Frame):
         
         self.fig = Figure(figsize=(10, 5), dpi=100)
         self.ax = self.fig.add_subplot(111)
+        self.scene = PhaseScene(self.ax)
+        self._last_render = None
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=top_panel)
         self.canvas.draw()
@@ -206,7 +213,6 @@ class AutonomousTab2D(tk.Frame):
     def run_simulation(self):
         """Ejecuta la simulación."""
         self.console.clear()
-        self.ax.clear()
         
         try:
             # Obtener ecuaciones
@@ -284,7 +290,8 @@ class AutonomousTab2D(tk.Frame):
             }
             
             # Renderizar
-            render_phase_plot(system, config, self.ax, self.log)
+            self.scene.update(system, config, self.log)
+            self._last_render = (system, config)
             
             self.ax.set_title('Plano de Fase', fontsize=14, fontweight='bold')
             self.canvas.draw()
@@ -314,11 +321,28 @@ class AutonomousTab2D(tk.Frame):
         
         return trajectories
     
+    def refresh_layers(self):
+        """Aplica las opciones de visualización sin volver a simular."""
+        if self._last_render is None:
+            return
+        
+        system, config = self._last_render
+        config = dict(config, **{
+            'show_field': self.show_field_var.get(),
+            'show_nullclines': self.show_nullclines_var.get(),
+            'show_equilibria': self.show_equilibria_var.get(),
+            'show_eigenvectors': self.show_eigenvectors_var.get(),
+        })
+        self.scene.update(system, config)
+        self._last_render = (system, config)
+        self.canvas.draw_idle()
+    
     def clear_all(self):
         """Limpia todo."""
         self.dx_entry.delete(0, tk.END)
         self.dy_entry.delete(0, tk.END)
-        self.ax.clear()
+        self.scene.clear()
+        self._last_render = None
         self.canvas.draw()
         self.console.clear()
         self.log("Interfaz limpiada")
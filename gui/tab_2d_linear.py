@@ -10,7 +10,8 @@ from matplotlib.figure import Figure
 import numpy as np
 
 from gui.widgets import *
-from core.systems_2d import LinearSystem2D, render_phase_plot
+from core.systems_2d import LinearSystem2D
+from core.scene import PhaseScene
 
 
 class LinearNonHomogeneousTab(tk.Frame):
@@ -145,12 +146,15 @@ class LinearNonHomogeneousTab(tk.Frame):
         
         tk.Checkbutton(vis_frame, text="Campo vectorial",
                       variable=self.show_field_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Punto de equilibrio",
                       variable=self.show_equilibria_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Autovectores",
                       variable=self.show_eigenvectors_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         
         # Botones
@@ -179,6 +183,8 @@ class LinearNonHomogeneousTab(tk.Frame):
         # Matplotlib figure
         self.fig = Figure(figsize=(10, 8), dpi=100)
         self.ax = self.fig.add_subplot(111)
+        self.scene = PhaseScene(self.ax)
+        self._last_render = None
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=top_panel)
         self.canvas.draw()
@@ -207,7 +213,6 @@ class LinearNonHomogeneousTab(tk.Frame):
     def run_simulation(self):
         """Ejecuta la simulación."""
         self.console.clear()
-        self.ax.clear()
         
         try:
             # Obtener valores de matriz A
@@ -301,7 +306,8 @@ class LinearNonHomogeneousTab(tk.Frame):
             }
             
             # Renderizar
-            render_phase_plot(system, config, self.ax, self.log)
+            self.scene.update(system, config, self.log)
+            self._last_render = (system, config)
             
             self.ax.set_title('Sistema Lineal No-Homogéneo: X\' = AX + b',
                             fontsize=14, fontweight='bold')
@@ -314,9 +320,25 @@ class LinearNonHomogeneousTab(tk.Frame):
             self.log(f"✗ Error: {str(e)}")
             messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}")
     
+    def refresh_layers(self):
+        """Aplica las opciones de visualización sin volver a simular."""
+        if self._last_render is None:
+            return
+        
+        system, config = self._last_render
+        config = dict(config, **{
+            'show_field': self.show_field_var.get(),
+            'show_equilibria': self.show_equilibria_var.get(),
+            'show_eigenvectors': self.show_eigenvectors_var.get(),
+        })
+        self.scene.update(system, config)
+        self._last_render = (system, config)
+        self.canvas.draw_idle()
+    
     def clear_all(self):
         """Limpia todo."""
-        self.ax.clear()
+        self.scene.clear()
+        self._last_render = None
         self.canvas.draw()
         self.console.clear()
         self.log("Interfaz limpiada")
@@ -8,7 +8,9 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.figure import Figure
 
 from gui.widgets import *
-from core.bifurcations import BifurcationAnalyzer1D, plot_bifurcation_diagram, plot_phase_diagrams_at_r
+from gui.jobs import JobRunner
+from core.bifurcations import (BifurcationAnalyzer1D, compute_bifurcation_data,
+                               draw_bifurcation_diagram, plot_phase_diagrams_at_r)
 from utils.expression_parser import ExpressionParser
 
 
@@ -129,6 +131,24 @@ class BifurcationTab(tk.Frame):
         self.x_max.pack(side=tk.LEFT, padx=5)
         tk.Label(x_frame, text="]", bg=COLORS['bg_primary']).pack(side=tk.LEFT)
         
+        # Método de cálculo del diagrama
+        method_frame = StyledLabelFrame(left_panel, "⚙ Método")
+        method_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.method = tk.StringVar(value='continuation')
+        
+        tk.Radiobutton(method_frame, text="Continuación (pseudo-longitud de arco)",
+                      variable=self.method, value='continuation',
+                      bg=COLORS['bg_primary']).pack(anchor=tk.W, padx=5, pady=2)
+        
+        tk.Radiobutton(method_frame, text="Barrido en r",
+                      variable=self.method, value='grid',
+                      bg=COLORS['bg_primary']).pack(anchor=tk.W, padx=5, pady=2)
+        
+        tk.Radiobutton(method_frame, text="Curva implícita (marching squares)",
+                      variable=self.method, value='contour',
+                      bg=COLORS['bg_primary']).pack(anchor=tk.W, padx=5, pady=2)
+        
         # Diagramas de fase
         phase_frame = StyledLabelFrame(left_panel, "📊 Diagramas de Fase")
         phase_frame.pack(fill=tk.X, pady=(0, 10))
@@ -148,6 +168,10 @@ class BifurcationTab(tk.Frame):
                     command=self.run_analysis,
                     style='success').pack(fill=tk.X, pady=(0, 5))
         
+        StyledButton(btn_frame, "⏹ CANCELAR",
+                    command=lambda: self.jobs.cancel(),
+                    style='warning').pack(fill=tk.X, pady=(0, 5))
+        
         StyledButton(btn_frame, "🗑 LIMPIAR",
                     command=self.clear_all,
                     style='danger').pack(fill=tk.X)
@@ -183,6 +207,8 @@ class BifurcationTab(tk.Frame):
         self.console = ConsoleText(bottom_panel, height=15)
         self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
         
+        self.jobs = JobRunner(self, self.console)
+        
         self.console.log(f"Análisis de bifurcación: {self.bifurcation_type}")
         self.console.log("Ingresa f(x, r) y presiona ANALIZAR")
     
@@ -191,9 +217,9 @@ class BifurcationTab(tk.Frame):
         self.console.log(message)
     
     def run_analysis(self):
-        """Ejecuta el análisis de bifurcación."""
+        """Lanza el análisis en segundo plano (cancela el anterior)."""
+        self.jobs.cancel(quiet=True)
         self.console.clear()
-        self.fig.clear()
         
         try:
             # Obtener ecuación
@@ -215,23 +241,39 @@ class BifurcationTab(tk.Frame):
             # Rangos
             r_range = (self.r_min.get(), self.r_max.get())
             x_range = (self.x_min.get(), self.x_max.get())
-            
-            self.log(f"Rango r: [{r_range[0]}, {r_range[1]}]")
-            self.log(f"Rango x: [{x_range[0]}, {x_range[1]}]")
-            self.log("-" * 50)
-            
-            # Crear analizador
-            analyzer = BifurcationAnalyzer1D(f_expr, param_name='r')
-            
-            # Valores de r para diagramas de fase
-            r_values_text = self.r_values_entry.get_value()
-            if r_values_text:
-                try:
-                    r_values = [float(r.strip()) for r in r_values_text.split(',')]
-                except:
-                    r_values = []
-            else:
+            method = self.method.get()
+        except Exception as e:
+            self.log(f"✗ Error: {str(e)}")
+            messagebox.showerror("Error", f"Error en el análisis:\n{str(e)}")
+            return
+        
+        self.log(f"Rango r: [{r_range[0]}, {r_range[1]}]")
+        self.log(f"Rango x: [{x_range[0]}, {x_range[1]}]")
+        self.log("-" * 50)
+        
+        # Valores de r para diagramas de fase
+        r_values_text = self.r_values_entry.get_value()
+        if r_values_text:
+            try:
+                r_values = [float(r.strip()) for r in r_values_text.split(',')]
+            except:
                 r_values = []
+        else:
+            r_values = []
+        
+        def compute(job):
+            """Ramas y bifurcaciones (hilo de trabajo)."""
+            analyzer = BifurcationAnalyzer1D(f_expr, param_name='r')
+            data = compute_bifurcation_data(
+                analyzer, r_range, x_range, method, job.log,
+                progress_callback=lambda done, total: job.progress(done, total, "Barrido en r")
+            )
+            job.check()
+            return analyzer, data
+        
+        def draw(result):
+            analyzer, data = result
+            self.fig.clear()
             
             # Layout de subplots
             if r_values:
@@ -241,7 +283,7 @@ class BifurcationTab(tk.Frame):
                 
                 # Diagrama de bifurcación (ocupa primeras 2 filas)
                 ax_bif = self.fig.add_subplot(n_rows, 2, (1, 4))
-                plot_bifurcation_diagram(analyzer, r_range, x_range, ax_bif, self.log)
+                draw_bifurcation_diagram(data, ax_bif)
                 
                 # Diagramas de fase
                 axes_phase = []
@@ -255,20 +297,22 @@ class BifurcationTab(tk.Frame):
             else:
                 # Solo diagrama de bifurcación
                 ax_bif = self.fig.add_subplot(111)
-                plot_bifurcation_diagram(analyzer, r_range, x_range, ax_bif, self.log)
+                draw_bifurcation_diagram(data, ax_bif)
             
             self.log("\n✓ Análisis completado exitosamente")
             self.fig.tight_layout(pad=3.0)
             self.canvas.draw()
-            
-        except Exception as e:
-            self.log(f"✗ Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror("Error", f"Error en el análisis:\n{str(e)}")
+        
+        def failed(error, detail):
+            self.log(f"✗ Error: {str(error)}")
+            print(detail)
+            messagebox.showerror("Error", f"Error en el análisis:\n{str(error)}")
+        
+        self.jobs.submit(compute, on_done=draw, on_error=failed)
     
     def clear_all(self):
         """Limpia todo."""
+        self.jobs.cancel(quiet=True)
         self.fig.clear()
         self.canvas.draw()
         self.console.clear()
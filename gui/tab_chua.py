@@ -10,7 +10,9 @@ from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
 
 from gui.widgets import *
+from gui.jobs import JobRunner
 from core.systems_3d import ChuaSystem
+from core.scene import TrajectoryScene3D
 
 
 class ChuaTab(tk.Frame):
@@ -173,6 +175,10 @@ class ChuaTab(tk.Frame):
                     command=self.run_simulation,
                     style='success').pack(fill=tk.X, pady=(0, 5))
         
+        StyledButton(btn_frame, "⏹ CANCELAR",
+                    command=lambda: self.jobs.cancel(),
+                    style='warning').pack(fill=tk.X, pady=(0, 5))
+        
         StyledButton(btn_frame, "🗑 LIMPIAR",
                     command=self.clear_all,
                     style='danger').pack(fill=tk.X)
@@ -188,6 +194,13 @@ class ChuaTab(tk.Frame):
         
         self.fig = Figure(figsize=(10, 8), dpi=100)
         self.ax = self.fig.add_subplot(111, projection='3d')
+        self.scene = TrajectoryScene3D(
+            self.ax,
+            line_style={'color': 'orange', 'alpha': 0.8, 'linewidth': 1.2},
+            start_style={'color': 'green', 'marker': 'o', 'markersize': 10,
+                         'markeredgecolor': 'black', 'markeredgewidth': 2,
+                         'label': 'Inicio'}
+        )
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=top_panel)
         self.canvas.draw()
@@ -205,6 +218,8 @@ class ChuaTab(tk.Frame):
         self.console = ConsoleText(bottom_panel, height=15)
         self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
         
+        self.jobs = JobRunner(self, self.console)
+        
         self.console.log("⚡ Circuito de Chua")
         self.console.log("Sistema electrónico caótico real")
     
@@ -221,9 +236,9 @@ class ChuaTab(tk.Frame):
         self.console.log(message)
     
     def run_simulation(self):
-        """Ejecuta la simulación."""
+        """Lanza la simulación en segundo plano (cancela la anterior)."""
+        self.jobs.cancel(quiet=True)
         self.console.clear()
-        self.ax.clear()
         
         try:
             alpha = self.alpha.get()
@@ -234,35 +249,41 @@ class ChuaTab(tk.Frame):
             y0 = self.y0.get()
             z0 = self.z0.get()
             t_max = self.t_max.get()
-            
-            self.log("=== CIRCUITO DE CHUA ===")
-            self.log(f"Parámetros:")
-            self.log(f"  α={alpha:.3f}, β={beta:.3f}")
-            self.log(f"  m₀={m0:.3f}, m₁={m1:.3f}")
-            self.log(f"Condición inicial: ({x0:.2f}, {y0:.2f}, {z0:.2f})")
-            self.log(f"Tiempo: [0, {t_max}]")
-            self.log("-" * 50)
-            
+        except Exception as e:
+            self.log(f"✗ Error: {str(e)}")
+            messagebox.showerror("Error", f"Error:\n{str(e)}")
+            return
+        
+        self.log("=== CIRCUITO DE CHUA ===")
+        self.log(f"Parámetros:")
+        self.log(f"  α={alpha:.3f}, β={beta:.3f}")
+        self.log(f"  m₀={m0:.3f}, m₁={m1:.3f}")
+        self.log(f"Condición inicial: ({x0:.2f}, {y0:.2f}, {z0:.2f})")
+        self.log(f"Tiempo: [0, {t_max}]")
+        self.log("-" * 50)
+        
+        self.log("\nEquilibrio:")
+        self.log("  Origen (0, 0, 0) - típicamente inestable")
+        
+        self.log("\n✓ Integrando trayectoria...")
+        self.log("  Buscando atractor de doble scroll...")
+        
+        def compute(job):
+            """Integración (hilo de trabajo)."""
             system = ChuaSystem(alpha, beta, m0, m1)
-            
-            self.log("\nEquilibrio:")
-            self.log("  Origen (0, 0, 0) - típicamente inestable")
-            
-            self.log("\n✓ Integrando trayectoria...")
-            self.log("  Buscando atractor de doble scroll...")
-            
-            t_span = (0, t_max)
-            sol = system.solve((x0, y0, z0), t_span)
-            
-            if sol.success:
-                x, y, z = sol.y
-                self.ax.plot(x, y, z, color='orange', alpha=0.8, linewidth=1.2)
-                self.ax.scatter([x0], [y0], [z0], color='green', s=100, marker='o',
-                              edgecolors='black', linewidths=2, label='Inicio')
-            else:
+            sol = system.solve((x0, y0, z0), (0, t_max), should_stop=job.should_stop)
+            job.check()
+            return sol
+        
+        def draw(sol):
+            if not sol.success:
                 self.log("✗ Error en la integración")
                 return
             
+            x, y, z = sol.y
+            self.scene.draw_trajectory((alpha, beta, m0, m1, x0, y0, z0, t_max), x, y, z,
+                                       start=(x0, y0, z0))
+            
             self.ax.set_xlabel('X (Voltaje C1)', fontsize=11, fontweight='bold')
             self.ax.set_ylabel('Y (Voltaje C2)', fontsize=11, fontweight='bold')
             self.ax.set_zlabel('Z (Corriente L)', fontsize=11, fontweight='bold')
@@ -277,16 +298,18 @@ class ChuaTab(tk.Frame):
             self.log("  Primer circuito caótico construido físicamente.")
             
             self.canvas.draw()
-            
-        except Exception as e:
-            self.log(f"✗ Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror("Error", f"Error:\n{str(e)}")
+        
+        def failed(error, detail):
+            self.log(f"✗ Error: {str(error)}")
+            print(detail)
+            messagebox.showerror("Error", f"Error:\n{str(error)}")
+        
+        self.jobs.submit(compute, on_done=draw, on_error=failed)
     
     def clear_all(self):
         """Limpia todo."""
-        self.ax.clear()
+        self.jobs.cancel(quiet=True)
+        self.scene.clear()
         self.canvas.draw()
         self.console.clear()
         self.log("Interfaz limpiada")
@@ -9,7 +9,8 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.figure import Figure
 
 from gui.widgets import *
-from core.systems_2d import CustomSystem2D, render_phase_plot
+from core.systems_2d import CustomSystem2D
+from core.scene import PhaseScene
 
 
 class ConservativeTab(tk.Frame):
@@ -154,12 +155,15 @@ class ConservativeTab(tk.Frame):
         
         tk.Checkbutton(vis_frame, text="Campo vectorial",
                       variable=self.show_field_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Puntos de equilibrio",
                       variable=self.show_equilibria_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Curvas de energía (H = c)",
                       variable=self.show_energy_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         
         # Botones
@@ -188,6 +192,8 @@ class ConservativeTab(tk.Frame):
         # Matplotlib figure
         self.fig = Figure(figsize=(10, 8), dpi=100)
         self.ax = self.fig.add_subplot(111)
+        self.scene = PhaseScene(self.ax)
+        self._last_render = None
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=top_panel)
         self.canvas.draw()
@@ -221,7 +227,6 @@ class ConservativeTab(tk.Frame):
     def run_simulation(self):
         """Ejecuta la simulación."""
         self.console.clear()
-        self.ax.clear()
         
         try:
             self.log("=== SISTEMA CONSERVATIVO (DOBLE POZO) ===")
@@ -292,7 +297,7 @@ class ConservativeTab(tk.Frame):
                     't_backward': 20
                 })
             
-            # Configuración de renderizado
+            # Configuración de renderizado (con las curvas de nivel de H)
             config = {
                 'x_range': x_range,
                 'y_range': y_range,
@@ -300,27 +305,25 @@ class ConservativeTab(tk.Frame):
                 'show_nullclines': False,
                 'show_equilibria': self.show_equilibria_var.get(),
                 'show_eigenvectors': False,
+                'show_energy': self.show_energy_var.get(),
+                'energy': {
+                    'function': self.hamiltonian,
+                    # Niveles de energía importantes
+                    'levels': [-0.25, -0.2, -0.15, -0.1, -0.05, 0, 0.05, 0.1, 0.2, 0.4, 0.6],
+                    'resolution': 300,
+                    'fmt': 'H=%.2f',
+                },
+                # Sistema separable: Yoshida-4 si el paso es preciso
+                'integrator': 'auto',
                 'trajectories': trajectories
             }
             
             # Renderizar
             self.log("\n✓ Generando retrato de fase...")
-            render_phase_plot(system, config, self.ax, self.log)
+            self.scene.update(system, config, self.log)
+            self._last_render = (system, config)
             
-            # Agregar curvas de nivel de energía
             if self.show_energy_var.get():
-                x_grid = np.linspace(x_range[0], x_range[1], 300)
-                y_grid = np.linspace(y_range[0], y_range[1], 300)
-                X, Y = np.meshgrid(x_grid, y_grid)
-                H = self.hamiltonian(X, Y)
-                
-                # Niveles de energía importantes
-                energy_levels = [-0.25, -0.2, -0.15, -0.1, -0.05, 0, 0.05, 0.1, 0.2, 0.4, 0.6]
-                
-                contours = self.ax.contour(X, Y, H, levels=energy_levels, 
-                                          colors='purple', alpha=0.4, linewidths=1.5)
-                self.ax.clabel(contours, inline=True, fontsize=8, fmt='H=%.2f')
-                
                 self.log("\n✓ Curvas de energía H = c agregadas")
             
             self.ax.set_title('Sistema Conservativo (Doble Pozo)',
@@ -344,9 +347,25 @@ class ConservativeTab(tk.Frame):
             traceback.print_exc()
             messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}")
     
+    def refresh_layers(self):
+        """Aplica las opciones de visualización sin volver a simular."""
+        if self._last_render is None:
+            return
+        
+        system, config = self._last_render
+        config = dict(config, **{
+            'show_field': self.show_field_var.get(),
+            'show_equilibria': self.show_equilibria_var.get(),
+            'show_energy': self.show_energy_var.get(),
+        })
+        self.scene.update(system, config)
+        self._last_render = (system, config)
+        self.canvas.draw_idle()
+    
     def clear_all(self):
         """Limpia todo."""
-        self.ax.clear()
+        self.scene.clear()
+        self._last_render = None
         self.canvas.draw()
         self.console.clear()
         self.log("Interfaz limpiada")
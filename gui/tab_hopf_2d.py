@@ -9,7 +9,9 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from gui.widgets import *
-from core.systems_2d import CustomSystem2D, render_phase_plot
+from gui.jobs import JobRunner
+from core.systems_2d import CustomSystem2D, compute_phase_plot, draw_phase_plot
+from core.sweeps import ParameterSweep
 from utils.expression_parser import ExpressionParser
 
 
@@ -174,6 +176,10 @@ class HopfBifurcationTab(tk.Frame):
                     command=self.run_simulation,
                     style='success').pack(fill=tk.X, pady=(0, 5))
         
+        StyledButton(btn_frame, "⏹ CANCELAR",
+                    command=lambda: self.jobs.cancel(),
+                    style='warning').pack(fill=tk.X, pady=(0, 5))
+        
         StyledButton(btn_frame, "🗑 LIMPIAR",
                     command=self.clear_plot,
                     style='danger').pack(fill=tk.X)
@@ -207,10 +213,13 @@ class HopfBifurcationTab(tk.Frame):
         self.console = ConsoleText(bottom_panel, height=15)
         self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
         
+        self.jobs = JobRunner(self, self.console)
+        
         self.console.log("Sistema listo. Configura las ecuaciones y presiona SIMULAR.")
     
     def run_simulation(self):
-        """Ejecuta la simulación."""
+        """Lanza la simulación en segundo plano (cancela la anterior)."""
+        self.jobs.cancel(quiet=True)
         try:
             self.console.clear()
             self.console.log("=== BIFURCACIÓN DE HOPF 2D ===\n")
@@ -232,103 +241,132 @@ class HopfBifurcationTab(tk.Frame):
             
             param_vals = [float(x.strip()) for x in param_str.split(',')]
             
-            self.console.log(f"Ecuaciones:")
-            self.console.log(f"  dx/dt = {dx_expr}")
-            self.console.log(f"  dy/dt = {dy_expr}")
-            self.console.log(f"\nParámetro: {param_name}")
-            self.console.log(f"Valores: {param_vals}\n")
-            
             # Rangos
             x_range = (self.x_min.get(), self.x_max.get())
             y_range = (self.y_min.get(), self.y_max.get())
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}\n\nTipo: {type(e).__name__}")
+            self.console.log(f"\n❌ ERROR: {str(e)}")
+            return
+        
+        self.console.log(f"Ecuaciones:")
+        self.console.log(f"  dx/dt = {dx_expr}")
+        self.console.log(f"  dy/dt = {dy_expr}")
+        self.console.log(f"\nParámetro: {param_name}")
+        self.console.log(f"Valores: {param_vals}\n")
+        
+        # Trayectorias: círculo de condiciones iniciales
+        trajectories = []
+        n_traj = 6
+        theta = np.linspace(0, 2*np.pi, n_traj, endpoint=False)
+        radius = 1.5
+        
+        for t in theta:
+            x0 = radius * np.cos(t)
+            y0 = radius * np.sin(t)
+            trajectories.append({
+                'initial_condition': (x0, y0),
+                't_forward': 10,
+                't_backward': 0
+            })
+        
+        show_field = self.show_field.get()
+        show_nullclines = self.show_nullclines.get()
+        show_equilibria = self.show_equilibria.get()
+        
+        def compute(job):
+            """Equilibrios y planos de fase de cada panel (hilo de trabajo)."""
+            # Equilibrios de todos los valores del parámetro (ParameterSweep decide
+            # si conviene repartirlos entre procesos)
+            sweep = ParameterSweep('equilibria_2d', {
+                'dx_expr': dx_expr,
+                'dy_expr': dy_expr,
+                'param_name': param_name,
+                'x_range': x_range,
+                'y_range': y_range
+            })
+            all_equilibria = sweep.run(
+                param_vals,
+                progress_callback=lambda done, total: job.progress(done, total, "Equilibrios")
+            )
+            job.check()
             
-            # Limpiar figura
-            self.figure.clear()
-            
-            # Crear subplots en grilla
-            n_vals = len(param_vals)
-            n_cols = min(2, n_vals)
-            n_rows = (n_vals + n_cols - 1) // n_cols
+            # Un solo sistema compilado con el parámetro como símbolo
+            system = CustomSystem2D(dx_expr, dy_expr,
+                                    parameters={param_name: param_vals[0]})
             
-            # Crear cada subplot
+            panels = []
             for idx, param_val in enumerate(param_vals):
-                self.console.log(f"--- {param_name} = {param_val} ---")
-                
-                # Sustituir parámetro en las ecuaciones
-                dx_with_param = dx_expr.replace(param_name, str(param_val))
-                dy_with_param = dy_expr.replace(param_name, str(param_val))
+                job.log(f"--- {param_name} = {param_val} ---")
                 
-                # Crear sistema
-                system = CustomSystem2D(dx_with_param, dy_with_param)
+                system.set_parameters({param_name: param_val})
                 
-                # Detectar equilibrios
-                equilibria = system.find_equilibria(x_range, y_range)
+                equilibria = all_equilibria[idx]
                 
                 if equilibria:
-                    self.console.log(f"Equilibrios encontrados: {len(equilibria)}")
+                    job.log(f"Equilibrios encontrados: {len(equilibria)}")
                     for eq_info in equilibria:
                         try:
                             x_eq, y_eq = eq_info['point']
                             eq_type = eq_info['type']
                             stability = eq_info['stability']
-                            self.console.log(f"  ({x_eq:.3f}, {y_eq:.3f}): {eq_type} - {stability}")
+                            job.log(f"  ({x_eq:.3f}, {y_eq:.3f}): {eq_type} - {stability}")
                         except Exception as e:
-                            self.console.log(f"  Error al procesar equilibrio: {e}")
+                            job.log(f"  Error al procesar equilibrio: {e}")
                 else:
-                    self.console.log("No se encontraron equilibrios")
-                
-                # Crear subplot
-                ax = self.figure.add_subplot(n_rows, n_cols, idx + 1)
-                
-                # Generar trayectorias
-                trajectories = []
-                n_traj = 6
-                theta = np.linspace(0, 2*np.pi, n_traj, endpoint=False)
-                radius = 1.5
-                
-                for t in theta:
-                    x0 = radius * np.cos(t)
-                    y0 = radius * np.sin(t)
-                    trajectories.append({
-                        'initial_condition': (x0, y0),
-                        't_forward': 10,
-                        't_backward': 0
-                    })
+                    job.log("No se encontraron equilibrios")
                 
                 # Configuración para render
                 config = {
                     'x_range': x_range,
                     'y_range': y_range,
                     'trajectories': trajectories,
-                    'show_field': self.show_field.get(),
-                    'show_nullclines': self.show_nullclines.get(),
-                    'show_equilibria': self.show_equilibria.get(),
-                    'show_eigenvectors': False
+                    'show_field': show_field,
+                    'show_nullclines': show_nullclines,
+                    'show_equilibria': show_equilibria,
+                    'show_eigenvectors': False,
+                    'equilibria': equilibria
                 }
                 
-                # Renderizar
-                render_phase_plot(system, config, ax, log_callback=self.console.log)
+                panels.append(compute_phase_plot(system, config, log_callback=job.log,
+                                                 should_stop=job.should_stop))
+                job.check()
+                job.log("")
+            
+            return panels
+        
+        def draw(panels):
+            # Limpiar figura
+            self.figure.clear()
+            
+            # Crear subplots en grilla
+            n_vals = len(param_vals)
+            n_cols = min(2, n_vals)
+            n_rows = (n_vals + n_cols - 1) // n_cols
+            
+            for idx, (param_val, data) in enumerate(zip(param_vals, panels)):
+                ax = self.figure.add_subplot(n_rows, n_cols, idx + 1)
+                draw_phase_plot(data, ax)
                 
                 ax.set_title(f'{param_name} = {param_val}', fontsize=10, fontweight='bold')
                 ax.grid(True, alpha=0.3)
-                
-                self.console.log("")
             
             self.figure.tight_layout()
             self.canvas.draw()
             
             self.console.log("✓ Simulación completada exitosamente")
-            
-        except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}\n\nTipo: {type(e).__name__}")
-            self.console.log(f"\n❌ ERROR: {str(e)}")
-            self.console.log(f"Tipo de error: {type(e).__name__}")
-            self.console.log(f"Detalle:\n{error_detail}")
+        
+        def failed(error, detail):
+            messagebox.showerror("Error", f"Error en la simulación:\n{str(error)}\n\nTipo: {type(error).__name__}")
+            self.console.log(f"\n❌ ERROR: {str(error)}")
+            self.console.log(f"Tipo de error: {type(error).__name__}")
+            self.console.log(f"Detalle:\n{detail}")
+        
+        self.jobs.submit(compute, on_done=draw, on_error=failed)
     
     def clear_plot(self):
         """Limpia el gráfico."""
+        self.jobs.cancel(quiet=True)
         self.figure.clear()
         self.canvas.draw()
         self.console.clear()
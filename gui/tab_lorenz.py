@@ -10,7 +10,10 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from mpl_toolkits.mplot3d import Axes3D
 
 from gui.widgets import *
+from gui.jobs import JobRunner
 from core.systems_3d import LorenzSystem, render_3d_trajectory
+from core.scene import TrajectoryScene3D
+from core.lyapunov import classify_regime
 
 
 class LorenzTab(tk.Frame):
@@ -153,6 +156,7 @@ class LorenzTab(tk.Frame):
         self.show_equilibria = tk.BooleanVar(value=True)
         tk.Checkbutton(vis_frame, text="Mostrar equilibrios",
                       variable=self.show_equilibria,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         
         # Presets rápidos
@@ -177,6 +181,10 @@ class LorenzTab(tk.Frame):
                     command=self.run_simulation,
                     style='success').pack(fill=tk.X, pady=(0, 5))
         
+        StyledButton(btn_frame, "⏹ CANCELAR",
+                    command=lambda: self.jobs.cancel(),
+                    style='warning').pack(fill=tk.X, pady=(0, 5))
+        
         StyledButton(btn_frame, "🗑 LIMPIAR",
                     command=self.clear_all,
                     style='danger').pack(fill=tk.X)
@@ -195,6 +203,14 @@ class LorenzTab(tk.Frame):
         # Matplotlib figure 3D
         self.fig = plt.Figure(figsize=(10, 8), dpi=100)
         self.ax = self.fig.add_subplot(111, projection='3d')
+        self.scene = TrajectoryScene3D(
+            self.ax,
+            line_style={'color': 'b', 'alpha': 0.7, 'linewidth': 0.8},
+            start_style={'color': 'green', 'marker': 'o', 'markersize': 10, 'label': 'Inicio'},
+            end_style={'color': 'red', 'marker': 's', 'markersize': 10, 'label': 'Final'},
+            equilibrium_style={'color': 'black', 'marker': '*', 'markersize': 9,
+                               'markeredgecolor': 'yellow', 'markeredgewidth': 2}
+        )
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=top_panel)
         self.canvas.draw()
@@ -213,6 +229,8 @@ class LorenzTab(tk.Frame):
         self.console = ConsoleText(bottom_panel, height=15)
         self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
         
+        self.jobs = JobRunner(self, self.console)
+        
         self.console.log("🦋 Sistema de Lorenz")
         self.console.log("El sistema de Lorenz exhibe comportamiento caótico")
         self.console.log("Ajusta los parámetros y presiona SIMULAR")
@@ -228,9 +246,9 @@ class LorenzTab(tk.Frame):
         self.console.log(message)
     
     def run_simulation(self):
-        """Ejecuta la simulación."""
+        """Lanza la simulación en segundo plano (cancela la anterior)."""
+        self.jobs.cancel(quiet=True)
         self.console.clear()
-        self.ax.clear()
         
         try:
             # Obtener parámetros
@@ -238,99 +256,132 @@ class LorenzTab(tk.Frame):
             rho = self.rho.get()
             beta = self.beta.get()
             t_max = self.t_max.get()
-            
-            self.log("=== SISTEMA DE LORENZ ===")
-            self.log(f"Parámetros: σ={sigma}, ρ={rho}, β={beta:.3f}")
-            self.log(f"Ecuaciones:")
-            self.log(f"  dx/dt = σ(y - x)")
-            self.log(f"  dy/dt = x(ρ - z) - y")
-            self.log(f"  dz/dt = xy - βz")
-            self.log("-" * 50)
-            
-            # Crear sistema
+        except Exception as e:
+            self.log(f"✗ Error: {str(e)}")
+            messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}")
+            return
+        
+        self.log("=== SISTEMA DE LORENZ ===")
+        self.log(f"Parámetros: σ={sigma}, ρ={rho}, β={beta:.3f}")
+        self.log(f"Ecuaciones:")
+        self.log(f"  dx/dt = σ(y - x)")
+        self.log(f"  dy/dt = x(ρ - z) - y")
+        self.log(f"  dz/dt = xy - βz")
+        self.log("-" * 50)
+        
+        # Condición inicial
+        try:
+            x0 = float(self.x0.get())
+            y0 = float(self.y0.get())
+            z0 = float(self.z0.get())
+            initial_condition = (x0, y0, z0)
+        except:
+            initial_condition = (0.1, 0, 0)
+            self.log("\n⚠ Usando condición inicial por defecto: (0.1, 0, 0)")
+        
+        def compute(job):
+            """Integración, equilibrios y espectro (hilo de trabajo)."""
             system = LorenzSystem(sigma=sigma, rho=rho, beta=beta)
             
             # Encontrar equilibrios
             equilibria = system.find_equilibria()
-            self.log(f"\nEquilibrios encontrados: {len(equilibria)}")
-            for idx, eq in enumerate(equilibria):
-                self.log(f"  E{idx+1}: ({eq[0]:.4f}, {eq[1]:.4f}, {eq[2]:.4f})")
+            job.log(f"\nEquilibrios encontrados: {len(equilibria)}")
+            for idx, eq_info in enumerate(equilibria):
+                eq = eq_info['point']
+                job.log(f"  E{idx+1}: ({eq[0]:.4f}, {eq[1]:.4f}, {eq[2]:.4f}) - "
+                        f"{eq_info['type']} ({eq_info['stability']})")
             
-            # Condición inicial
-            try:
-                x0 = float(self.x0.get())
-                y0 = float(self.y0.get())
-                z0 = float(self.z0.get())
-                initial_condition = (x0, y0, z0)
-            except:
-                initial_condition = (0.1, 0, 0)
-                self.log("\n⚠ Usando condición inicial por defecto: (0.1, 0, 0)")
+            job.log(f"\nCondición inicial: ({initial_condition[0]}, {initial_condition[1]}, {initial_condition[2]})")
+            job.log(f"Tiempo de simulación: [0, {t_max}]")
+            job.log("\nResolviendo sistema...")
             
-            self.log(f"\nCondición inicial: ({initial_condition[0]}, {initial_condition[1]}, {initial_condition[2]})")
-            self.log(f"Tiempo de simulación: [0, {t_max}]")
-            self.log("\nResolviendo sistema...")
+            sol = system.solve(initial_condition, (0, t_max), should_stop=job.should_stop)
+            job.check()
+            if not sol.success:
+                return {'sol': sol}
             
-            # Resolver
-            t_span = (0, t_max)
-            sol = system.solve(initial_condition, t_span)
+            # Régimen medido con el espectro de Lyapunov
+            # (mediana sobre condiciones iniciales cercanas)
+            job.log("Calculando espectro de Lyapunov...")
+            rng = np.random.default_rng(0)
+            ics = np.array(initial_condition) + 1e-3 * rng.standard_normal((4, 3))
+            lyap = system.lyapunov_spectrum(ics, dt=0.02, t_max=100, tol=5e-3,
+                                            should_stop=job.should_stop)
+            job.check()
             
-            if sol.success:
-                x, y, z = sol.y
-                
-                # Graficar trayectoria
-                self.ax.plot(x, y, z, 'b-', alpha=0.7, linewidth=0.8)
-                self.ax.scatter(*initial_condition, color='green', s=100, 
-                              marker='o', label='Inicio', zorder=10)
-                self.ax.scatter(x[-1], y[-1], z[-1], color='red', s=100, 
-                              marker='s', label='Final', zorder=10)
-                
-                # Equilibrios
-                if self.show_equilibria.get():
-                    for eq in equilibria:
-                        self.ax.scatter(*eq, color='black', s=80, marker='*', 
-                                      edgecolors='yellow', linewidths=2, zorder=15)
-                
-                self.ax.set_xlabel('X', fontsize=10, fontweight='bold')
-                self.ax.set_ylabel('Y', fontsize=10, fontweight='bold')
-                self.ax.set_zlabel('Z', fontsize=10, fontweight='bold')
-                self.ax.set_title(f'Atractor de Lorenz (σ={sigma}, ρ={rho}, β={beta:.2f})', 
-                                fontsize=12, fontweight='bold')
-                self.ax.legend(loc='upper right')
-                self.ax.grid(True, alpha=0.3)
-                
-                # Estadísticas
-                self.log(f"\n✓ Simulación completada exitosamente")
-                self.log(f"Puntos calculados: {len(sol.t)}")
-                self.log(f"Rango X: [{x.min():.2f}, {x.max():.2f}]")
-                self.log(f"Rango Y: [{y.min():.2f}, {y.max():.2f}]")
-                self.log(f"Rango Z: [{z.min():.2f}, {z.max():.2f}]")
-                
-                # Interpretación
-                if rho < 1:
-                    self.log("\nInterpretación: ρ < 1 → Origen estable")
-                elif 1 <= rho < 24.74:
-                    self.log("\nInterpretación: 1 ≤ ρ < 24.74 → Régimen subcrítico")
-                elif abs(rho - 24.74) < 0.5:
-                    self.log("\nInterpretación: ρ ≈ 24.74 → Bifurcación de Hopf")
-                elif 24.74 <= rho < 30:
-                    self.log("\nInterpretación: ρ ≈ 28 → Régimen CAÓTICO (atractor extraño)")
-                else:
-                    self.log(f"\nInterpretación: ρ = {rho} → Régimen complejo")
-                
-                self.canvas.draw()
-            else:
-                self.log("✗ Error: La simulación no convergió")
-                messagebox.showerror("Error", "La simulación no convergió")
-            
-        except Exception as e:
-            self.log(f"✗ Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}")
+            return {'sol': sol, 'equilibria': equilibria, 'lyapunov': lyap}
+        
+        def draw(result):
+            self._draw_simulation(result, sigma, beta, rho, initial_condition)
+        
+        def failed(error, detail):
+            self.log(f"✗ Error: {str(error)}")
+            print(detail)
+            messagebox.showerror("Error", f"Error en la simulación:\n{str(error)}")
+        
+        self.jobs.submit(compute, on_done=draw, on_error=failed)
+    
+    def _draw_simulation(self, result, sigma, beta, rho, initial_condition):
+        """Dibuja el resultado de run_simulation (hilo de Tk)."""
+        sol = result['sol']
+        if not sol.success:
+            self.log("✗ Error: La simulación no convergió")
+            messagebox.showerror("Error", "La simulación no convergió")
+            return
+        
+        x, y, z = sol.y
+        
+        # Trayectoria y equilibrios (se actualizan en el lugar)
+        self.scene.draw_trajectory((sigma, rho, beta, initial_condition, sol.t[-1]),
+                                   x, y, z, start=initial_condition)
+        self.scene.draw_equilibria((sigma, rho, beta),
+                                   [eq['point'] for eq in result['equilibria']],
+                                   visible=self.show_equilibria.get())
+        
+        self.ax.set_xlabel('X', fontsize=10, fontweight='bold')
+        self.ax.set_ylabel('Y', fontsize=10, fontweight='bold')
+        self.ax.set_zlabel('Z', fontsize=10, fontweight='bold')
+        self.ax.set_title(f'Atractor de Lorenz (σ={sigma}, ρ={rho}, β={beta:.2f})', 
+                        fontsize=12, fontweight='bold')
+        self.ax.legend(loc='upper right')
+        self.ax.grid(True, alpha=0.3)
+        
+        # Estadísticas
+        self.log(f"\n✓ Simulación completada exitosamente")
+        self.log(f"Puntos calculados: {len(sol.t)}")
+        self.log(f"Rango X: [{x.min():.2f}, {x.max():.2f}]")
+        self.log(f"Rango Y: [{y.min():.2f}, {y.max():.2f}]")
+        self.log(f"Rango Z: [{z.min():.2f}, {z.max():.2f}]")
+        
+        lyap = result['lyapunov']
+        exponents = np.nanmedian(lyap['exponents'], axis=0)
+        regime = classify_regime(exponents)
+        
+        self.log(f"\nEspectro de Lyapunov:")
+        self.log(f"  λ = ({exponents[0]:.3f}, {exponents[1]:.3f}, {exponents[2]:.3f})")
+        self.log(f"  Suma = {exponents.sum():.3f} (teórica: {-(sigma + 1 + beta):.3f})")
+        self.log(f"  Estimaciones estabilizadas: {lyap['converged'].sum()}/{len(lyap['converged'])}")
+        
+        descriptions = {
+            'Caótico': "λ₁ > 0 → Régimen CAÓTICO (atractor extraño)",
+            'Ciclo límite': "λ₁ ≈ 0 → Órbita periódica",
+            'Cuasiperiódico': "λ₁ ≈ λ₂ ≈ 0 → Movimiento cuasiperiódico",
+            'Punto fijo': "λ₁ < 0 → Converge a un equilibrio",
+            'Divergente': "La trayectoria diverge",
+        }
+        self.log(f"\nInterpretación: {descriptions[regime]}")
+        
+        self.canvas.draw()
+    
+    def refresh_layers(self):
+        """Muestra u oculta los equilibrios sin volver a simular."""
+        self.scene.set_visible('equilibria', self.show_equilibria.get())
+        self.canvas.draw_idle()
     
     def clear_all(self):
         """Limpia todo."""
-        self.ax.clear()
+        self.jobs.cancel(quiet=True)
+        self.scene.clear()
         self.canvas.draw()
         self.console.clear()
         self.log("Interfaz limpiada")
@@ -9,7 +9,8 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.figure import Figure
 
 from gui.widgets import *
-from core.systems_2d import CustomSystem2D, render_phase_plot
+from core.systems_2d import LinearSystem2D
+from core.scene import PhaseScene
 
 
 class OsciladorArmonicoTab(tk.Frame):
@@ -176,12 +177,15 @@ class OsciladorArmonicoTab(tk.Frame):
         
         tk.Checkbutton(vis_frame, text="Campo vectorial",
                       variable=self.show_field_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Punto de equilibrio",
                       variable=self.show_equilibria_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Niveles de energía (γ=0)",
                       variable=self.show_energy_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         
         # Botones
@@ -208,6 +212,8 @@ class OsciladorArmonicoTab(tk.Frame):
         
         self.fig = Figure(figsize=(10, 8), dpi=100)
         self.ax = self.fig.add_subplot(111)
+        self.scene = PhaseScene(self.ax)
+        self._last_render = None
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=top_panel)
         self.canvas.draw()
@@ -253,7 +259,6 @@ class OsciladorArmonicoTab(tk.Frame):
     def run_simulation(self):
         """Ejecuta la simulación."""
         self.console.clear()
-        self.ax.clear()
         
         try:
             omega = self.omega.get()
@@ -292,11 +297,8 @@ class OsciladorArmonicoTab(tk.Frame):
             self.log(f"  Tipo: {damping_type}")
             self.log(f"  {description}")
             
-            # Crear sistema
-            dx_expr = "y"
-            dv_expr = f"-{omega**2}*x - {gamma}*y"
-            
-            system = CustomSystem2D(dx_expr, dv_expr)
+            # Crear sistema (lineal: dx/dt = v, dv/dt = -ω²x - γv)
+            system = LinearSystem2D([[0, 1], [-omega**2, -gamma]])
             
             # Analizar punto de equilibrio
             self.log(f"\nPunto de Equilibrio: (0, 0)")
@@ -351,7 +353,7 @@ class OsciladorArmonicoTab(tk.Frame):
                         't_backward': 0
                     })
             
-            # Configuración
+            # Configuración (curvas de energía solo sin amortiguamiento)
             config = {
                 'x_range': x_range,
                 'y_range': v_range,
@@ -359,24 +361,25 @@ class OsciladorArmonicoTab(tk.Frame):
                 'show_nullclines': False,
                 'show_equilibria': self.show_equilibria_var.get(),
                 'show_eigenvectors': False,
+                'show_energy': self.show_energy_var.get(),
                 'trajectories': trajectories
             }
+            if abs(gamma) < 1e-6:
+                config['energy'] = {
+                    'function': self.energy,
+                    'args': (omega,),
+                    'levels': 10,
+                    'resolution': 100,
+                    'fmt': 'E=%.2f',
+                    'style': {'colors': 'green', 'alpha': 0.3, 'linewidths': 0.8},
+                }
             
             # Renderizar
             self.log("\n✓ Generando diagrama de fase...")
-            render_phase_plot(system, config, self.ax, self.log)
+            self.scene.update(system, config, self.log)
+            self._last_render = (system, config)
             
-            # Añadir niveles de energía si γ=0
-            if abs(gamma) < 1e-6 and self.show_energy_var.get():
-                x_grid = np.linspace(x_range[0], x_range[1], 100)
-                v_grid = np.linspace(v_range[0], v_range[1], 100)
-                X, V = np.meshgrid(x_grid, v_grid)
-                E = self.energy(X, V, omega)
-                
-                levels = np.linspace(E.min(), E.max(), 10)
-                contours = self.ax.contour(X, V, E, levels=levels, colors='green',
-                                          alpha=0.3, linewidths=0.8)
-                self.ax.clabel(contours, inline=True, fontsize=8, fmt='E=%.2f')
+            if 'energy' in config and self.show_energy_var.get():
                 self.log("✓ Curvas de energía añadidas (E = ½v² + ½ω²x²)")
             
             # Personalizar etiquetas
@@ -394,9 +397,25 @@ class OsciladorArmonicoTab(tk.Frame):
             traceback.print_exc()
             messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}")
     
+    def refresh_layers(self):
+        """Aplica las opciones de visualización sin volver a simular."""
+        if self._last_render is None:
+            return
+        
+        system, config = self._last_render
+        config = dict(config, **{
+            'show_field': self.show_field_var.get(),
+            'show_equilibria': self.show_equilibria_var.get(),
+            'show_energy': self.show_energy_var.get(),
+        })
+        self.scene.update(system, config)
+        self._last_render = (system, config)
+        self.canvas.draw_idle()
+    
     def clear_all(self):
         """Limpia todo."""
-        self.ax.clear()
+        self.scene.clear()
+        self._last_render = None
         self.canvas.draw()
         self.console.clear()
         self.log("Interfaz limpiada")
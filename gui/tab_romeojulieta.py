@@ -9,7 +9,8 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.figure import Figure
 
 from gui.widgets import *
-from core.systems_2d import CustomSystem2D, render_phase_plot
+from core.systems_2d import LinearSystem2D
+from core.scene import PhaseScene
 
 
 class RomeoJulietaTab(tk.Frame):
@@ -187,9 +188,11 @@ class RomeoJulietaTab(tk.Frame):
         
         tk.Checkbutton(vis_frame, text="Campo vectorial",
                       variable=self.show_field_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Puntos de equilibrio",
                       variable=self.show_equilibria_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         
         # Botones
@@ -218,6 +221,8 @@ class RomeoJulietaTab(tk.Frame):
         # Matplotlib figure
         self.fig = Figure(figsize=(10, 8), dpi=100)
         self.ax = self.fig.add_subplot(111)
+        self.scene = PhaseScene(self.ax)
+        self._last_render = None
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=top_panel)
         self.canvas.draw()
@@ -263,7 +268,6 @@ class RomeoJulietaTab(tk.Frame):
     def run_simulation(self):
         """Ejecuta la simulación."""
         self.console.clear()
-        self.ax.clear()
         
         try:
             # Obtener parámetros
@@ -288,12 +292,9 @@ class RomeoJulietaTab(tk.Frame):
             self.log(f"  Julieta hacia R (c={c:.2f}): {self.classify_personality(c, 'c')}")
             self.log(f"  Julieta (d={d:.2f}): {self.classify_personality(d, 'd')}")
             
-            # Crear sistema
-            dx_expr = f"{a}*x + {b}*y"
-            dy_expr = f"{c}*x + {d}*y"
-            
-            # Renombrar x,y a R,J para claridad
-            system = CustomSystem2D(dx_expr, dy_expr)
+            # Crear sistema (lineal: dR/dt = aR + bJ, dJ/dt = cR + dJ),
+            # con x,y en el papel de R,J
+            system = LinearSystem2D([[a, b], [c, d]])
             
             # Encontrar equilibrios
             r_range = (self.r_min.get(), self.r_max.get())
@@ -349,7 +350,8 @@ class RomeoJulietaTab(tk.Frame):
             
             # Renderizar
             self.log("\n✓ Generando diagrama de fase...")
-            render_phase_plot(system, config, self.ax, self.log)
+            self.scene.update(system, config, self.log)
+            self._last_render = (system, config)
             
             # Personalizar etiquetas
             self.ax.set_xlabel('R (Romeo)', fontsize=11, fontweight='bold')
@@ -383,9 +385,24 @@ class RomeoJulietaTab(tk.Frame):
             traceback.print_exc()
             messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}")
     
+    def refresh_layers(self):
+        """Aplica las opciones de visualización sin volver a simular."""
+        if self._last_render is None:
+            return
+        
+        system, config = self._last_render
+        config = dict(config, **{
+            'show_field': self.show_field_var.get(),
+            'show_equilibria': self.show_equilibria_var.get(),
+        })
+        self.scene.update(system, config)
+        self._last_render = (system, config)
+        self.canvas.draw_idle()
+    
     def clear_all(self):
         """Limpia todo."""
-        self.ax.clear()
+        self.scene.clear()
+        self._last_render = None
         self.canvas.draw()
         self.console.clear()
         self.log("Interfaz limpiada")
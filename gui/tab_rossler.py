@@ -10,7 +10,9 @@ from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
 
 from gui.widgets import *
+from gui.jobs import JobRunner
 from core.systems_3d import RosslerSystem
+from core.scene import TrajectoryScene3D
 
 
 class RosslerTab(tk.Frame):
@@ -165,6 +167,7 @@ class RosslerTab(tk.Frame):
         self.show_equilibria_var = tk.BooleanVar(value=True)
         tk.Checkbutton(vis_frame, text="Puntos de equilibrio",
                       variable=self.show_equilibria_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         
         btn_frame = tk.Frame(left_panel, bg=COLORS['bg_primary'])
@@ -174,6 +177,10 @@ class RosslerTab(tk.Frame):
                     command=self.run_simulation,
                     style='success').pack(fill=tk.X, pady=(0, 5))
         
+        StyledButton(btn_frame, "⏹ CANCELAR",
+                    command=lambda: self.jobs.cancel(),
+                    style='warning').pack(fill=tk.X, pady=(0, 5))
+        
         StyledButton(btn_frame, "🗑 LIMPIAR",
                     command=self.clear_all,
                     style='danger').pack(fill=tk.X)
@@ -189,6 +196,16 @@ class RosslerTab(tk.Frame):
         
         self.fig = Figure(figsize=(10, 8), dpi=100)
         self.ax = self.fig.add_subplot(111, projection='3d')
+        self.scene = TrajectoryScene3D(
+            self.ax,
+            line_style={'color': 'blue', 'alpha': 0.8, 'linewidth': 1.2},
+            start_style={'color': 'green', 'marker': 'o', 'markersize': 10,
+                         'markeredgecolor': 'black', 'markeredgewidth': 2,
+                         'label': 'Inicio'},
+            equilibrium_style={'color': 'red', 'marker': 'o', 'markersize': 10,
+                               'markeredgecolor': 'black', 'markeredgewidth': 2,
+                               'label': 'Equilibrios'}
+        )
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=top_panel)
         self.canvas.draw()
@@ -206,6 +223,8 @@ class RosslerTab(tk.Frame):
         self.console = ConsoleText(bottom_panel, height=15)
         self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
         
+        self.jobs = JobRunner(self, self.console)
+        
         self.console.log("🌀 Sistema de Rössler")
         self.console.log("Ajusta los parámetros y presiona SIMULAR")
     
@@ -221,9 +240,9 @@ class RosslerTab(tk.Frame):
         self.console.log(message)
     
     def run_simulation(self):
-        """Ejecuta la simulación."""
+        """Lanza la simulación en segundo plano (cancela la anterior)."""
+        self.jobs.cancel(quiet=True)
         self.console.clear()
-        self.ax.clear()
         
         try:
             a = self.a.get()
@@ -233,45 +252,49 @@ class RosslerTab(tk.Frame):
             y0 = self.y0.get()
             z0 = self.z0.get()
             t_max = self.t_max.get()
-            
-            self.log("=== SISTEMA DE RÖSSLER ===")
-            self.log(f"Parámetros: a={a:.3f}, b={b:.3f}, c={c:.3f}")
-            self.log(f"Condición inicial: ({x0:.2f}, {y0:.2f}, {z0:.2f})")
-            self.log(f"Tiempo: [0, {t_max}]")
-            self.log("-" * 50)
-            
+        except Exception as e:
+            self.log(f"✗ Error: {str(e)}")
+            messagebox.showerror("Error", f"Error:\n{str(e)}")
+            return
+        
+        self.log("=== SISTEMA DE RÖSSLER ===")
+        self.log(f"Parámetros: a={a:.3f}, b={b:.3f}, c={c:.3f}")
+        self.log(f"Condición inicial: ({x0:.2f}, {y0:.2f}, {z0:.2f})")
+        self.log(f"Tiempo: [0, {t_max}]")
+        self.log("-" * 50)
+        
+        def compute(job):
+            """Equilibrios e integración (hilo de trabajo)."""
             system = RosslerSystem(a, b, c)
             
-            self.log("\nBuscando equilibrios...")
+            job.log("\nBuscando equilibrios...")
             equilibria = system.find_equilibria()
             
             if equilibria:
-                self.log(f"✓ Equilibrios encontrados: {len(equilibria)}")
-                for i, (x_eq, y_eq, z_eq) in enumerate(equilibria):
-                    self.log(f"  E{i+1}: ({x_eq:.4f}, {y_eq:.4f}, {z_eq:.4f})")
-                    
-                    if self.show_equilibria_var.get():
-                        self.ax.scatter([x_eq], [y_eq], [z_eq], 
-                                      color='red', s=100, marker='o',
-                                      edgecolors='black', linewidths=2,
-                                      label=f'Equilibrio {i+1}' if i == 0 else '')
+                job.log(f"✓ Equilibrios encontrados: {len(equilibria)}")
+                for i, eq_info in enumerate(equilibria):
+                    x_eq, y_eq, z_eq = eq_info['point']
+                    job.log(f"  E{i+1}: ({x_eq:.4f}, {y_eq:.4f}, {z_eq:.4f}) - "
+                            f"{eq_info['type']} ({eq_info['stability']})")
             else:
-                self.log("✗ No se encontraron equilibrios")
-            
-            self.log("\n✓ Integrando trayectoria...")
+                job.log("✗ No se encontraron equilibrios")
             
-            t_span = (0, t_max)
-            sol = system.solve((x0, y0, z0), t_span)
-            
-            if sol.success:
-                x, y, z = sol.y
-                self.ax.plot(x, y, z, color='blue', alpha=0.8, linewidth=1.2)
-                self.ax.scatter([x0], [y0], [z0], color='green', s=100, marker='o',
-                              edgecolors='black', linewidths=2, label='Inicio')
-            else:
+            job.log("\n✓ Integrando trayectoria...")
+            sol = system.solve((x0, y0, z0), (0, t_max), should_stop=job.should_stop)
+            job.check()
+            return equilibria, sol
+        
+        def draw(result):
+            equilibria, sol = result
+            if not sol.success:
                 self.log("✗ Error en la integración")
                 return
             
+            x, y, z = sol.y
+            self.scene.draw_trajectory((a, b, c, x0, y0, z0, t_max), x, y, z, start=(x0, y0, z0))
+            self.scene.draw_equilibria((a, b, c), [eq['point'] for eq in equilibria],
+                                       visible=self.show_equilibria_var.get())
+            
             self.ax.set_xlabel('X', fontsize=11, fontweight='bold')
             self.ax.set_ylabel('Y', fontsize=11, fontweight='bold')
             self.ax.set_zlabel('Z', fontsize=11, fontweight='bold')
@@ -285,16 +308,23 @@ class RosslerTab(tk.Frame):
             self.log("  Es más simple que Lorenz pero igualmente caótico.")
             
             self.canvas.draw()
-            
-        except Exception as e:
-            self.log(f"✗ Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror("Error", f"Error:\n{str(e)}")
+        
+        def failed(error, detail):
+            self.log(f"✗ Error: {str(error)}")
+            print(detail)
+            messagebox.showerror("Error", f"Error:\n{str(error)}")
+        
+        self.jobs.submit(compute, on_done=draw, on_error=failed)
+    
+    def refresh_layers(self):
+        """Muestra u oculta los equilibrios sin volver a simular."""
+        self.scene.set_visible('equilibria', self.show_equilibria_var.get())
+        self.canvas.draw_idle()
     
     def clear_all(self):
         """Limpia todo."""
-        self.ax.clear()
+        self.jobs.cancel(quiet=True)
+        self.scene.clear()
         self.canvas.draw()
         self.console.clear()
         self.log("Interfaz limpiada")
@@ -9,7 +9,8 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.figure import Figure
 
 from gui.widgets import *
-from core.systems_2d import CustomSystem2D, render_phase_plot
+from core.systems_2d import CustomSystem2D
+from core.scene import PhaseScene
 
 
 class VanDerPolTab(tk.Frame):
@@ -146,12 +147,15 @@ class VanDerPolTab(tk.Frame):
         
         tk.Checkbutton(vis_frame, text="Campo vectorial",
                       variable=self.show_field_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Puntos de equilibrio",
                       variable=self.show_equilibria_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         tk.Checkbutton(vis_frame, text="Isoclinas",
                       variable=self.show_nullclines_var,
+                      command=self.refresh_layers,
                       bg=COLORS['bg_primary']).pack(anchor=tk.W)
         
         # Botones
@@ -180,6 +184,8 @@ class VanDerPolTab(tk.Frame):
         # Matplotlib figure
         self.fig = Figure(figsize=(10, 8), dpi=100)
         self.ax = self.fig.add_subplot(111)
+        self.scene = PhaseScene(self.ax)
+        self._last_render = None
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=top_panel)
         self.canvas.draw()
@@ -209,7 +215,6 @@ class VanDerPolTab(tk.Frame):
     def run_simulation(self):
         """Ejecuta la simulación."""
         self.console.clear()
-        self.ax.clear()
         
         try:
             # Obtener parámetro
@@ -224,9 +229,9 @@ class VanDerPolTab(tk.Frame):
             
             # Crear sistema
             dx_expr = "y"
-            dy_expr = f"{mu}*(1 - x**2)*y - x"
+            dy_expr = "mu*(1 - x**2)*y - x"
             
-            system = CustomSystem2D(dx_expr, dy_expr)
+            system = CustomSystem2D(dx_expr, dy_expr, parameters={'mu': mu})
             
             # Encontrar equilibrios
             x_range = (self.x_min.get(), self.x_max.get())
@@ -287,7 +292,8 @@ class VanDerPolTab(tk.Frame):
             
             # Renderizar
             self.log("\n✓ Generando diagrama de fase...")
-            render_phase_plot(system, config, self.ax, self.log)
+            self.scene.update(system, config, self.log)
+            self._last_render = (system, config)
             
             self.ax.set_title(f'Oscilador de Van der Pol (μ = {mu})',
                             fontsize=14, fontweight='bold')
@@ -310,9 +316,25 @@ class VanDerPolTab(tk.Frame):
             traceback.print_exc()
             messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}")
     
+    def refresh_layers(self):
+        """Aplica las opciones de visualización sin volver a simular."""
+        if self._last_render is None:
+            return
+        
+        system, config = self._last_render
+        config = dict(config, **{
+            'show_field': self.show_field_var.get(),
+            'show_nullclines': self.show_nullclines_var.get(),
+            'show_equilibria': self.show_equilibria_var.get(),
+        })
+        self.scene.update(system, config)
+        self._last_render = (system, config)
+        self.canvas.draw_idle()
+    
     def clear_all(self):
         """Limpia todo."""
-        self.ax.clear()
+        self.scene.clear()
+        self._last_render = None
         self.canvas.draw()
         self.console.clear()
         self.log("Interfaz limpiada")
@@ -2,7 +2,9 @@
 Widgets personalizados y utilidades para la interfaz gráfica.
 """
 
+import threading
 import tkinter as tk
+from collections import deque
 from tkinter import ttk
 
 
@@ -152,9 +154,19 @@ class StyledEntry(tk.Entry):
 
 
 class ConsoleText(tk.Text):
-    """Text widget estilo consola con autoscroll."""
+    """
+    Text widget estilo consola con autoscroll.
     
-    def __init__(self, parent, **kwargs):
+    log() solo encola el mensaje, así que se puede llamar desde cualquier
+    hilo sin tocar Tk. La cola se vuelca en el hilo de Tk: los mensajes
+    del propio hilo de Tk programan un volcado flush_ms después, y los de
+    los hilos de trabajo los vuelca JobRunner en cada consulta. El volcado
+    hace un único insert por grupo de etiqueta y un solo see(END); sin
+    mensajes no queda ningún temporizador activo. La consola conserva
+    como máximo max_lines líneas: las más viejas se descartan.
+    """
+    
+    def __init__(self, parent, max_lines=2000, flush_ms=50, **kwargs):
         default_config = {
             'bg': COLORS['console_bg'],
             'fg': COLORS['console_fg'],
@@ -174,18 +186,69 @@ class ConsoleText(tk.Text):
         scrollbar = tk.Scrollbar(parent, command=self.yview)
         self.config(yscrollcommand=scrollbar.set)
         
+        # Mensajes pendientes (anillo: si se acumulan más de max_lines
+        # antes de un volcado, los más viejos ya no se muestran)
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
+        self._pending = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        
+        # Volcado programado; solo se usa desde el hilo de Tk
+        self._tk_thread = threading.current_thread()
+        self._flush_id = None
+    
     def log(self, message, tag=None):
-        """Agrega un mensaje a la consola."""
+        """Encola un mensaje para la consola (seguro desde otros hilos)."""
+        with self._lock:
+            self._pending.append((message, tag))
+        
+        if threading.current_thread() is self._tk_thread and self._flush_id is None:
+            self._flush_id = self.after(self.flush_ms, self._scheduled_flush)
+    
+    def flush(self):
+        """Vuelca en el widget los mensajes pendientes (hilo de Tk)."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending = list(self._pending)
+            self._pending.clear()
+        
+        # Agrupar mensajes consecutivos con la misma etiqueta
+        groups = []
+        for message, tag in pending:
+            if groups and groups[-1][1] == tag:
+                groups[-1][0].append(message)
+            else:
+                groups.append(([message], tag))
+        
         self.config(state=tk.NORMAL)
-        self.insert(tk.END, message + '\n', tag)
+        for messages, tag in groups:
+            self.insert(tk.END, '\n'.join(messages) + '\n', tag)
+        
+        # Recortar las líneas más viejas por encima del límite
+        excess = int(self.index('end-1c').split('.')[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.delete('1.0', f'{excess + 1}.0')
+        
         self.see(tk.END)
         self.config(state=tk.DISABLED)
     
     def clear(self):
-        """Limpia la consola."""
+        """Limpia la consola (incluidos los mensajes pendientes)."""
+        with self._lock:
+            self._pending.clear()
         self.config(state=tk.NORMAL)
         self.delete('1.0', tk.END)
         self.config(state=tk.DISABLED)
+    
+    def destroy(self):
+        if self._flush_id is not None:
+            self.after_cancel(self._flush_id)
+        super().destroy()
+    
+    def _scheduled_flush(self):
+        self._flush_id = None
+        self.flush()
 
 
 class SpinboxDouble(tk.Frame):
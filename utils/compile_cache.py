@@ -0,0 +1,238 @@
+"""
+Caché persistente en disco de sistemas compilados.
+
+Guarda, por cada sistema, la expresión serializada de sympy (srepr), sus
+símbolos libres, las derivadas cuando corresponde (Jacobiano) y el código
+fuente generado por lambdify. Al reabrir la aplicación el código se
+recupera y se ejecuta directamente con NumPy, sin volver a parsear ni
+derivar con sympy.
+
+Las entradas se identifican por un hash del contenido (expresiones
+normalizadas, variables y parámetros), llevan una marca de versión y un
+hash del código fuente que se verifica antes de ejecutarlo; el
+directorio se mantiene por debajo de un tamaño máximo eliminando las
+entradas usadas hace más tiempo.
+"""
+
+import builtins
+import hashlib
+import json
+import os
+import sys
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+
+# Directorio de caché
+CACHE_DIR = os.environ.get(
+    'SIMULADOR_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'simulador')
+)
+
+# Cambiar al modificar el formato de las entradas o el código generado
+CACHE_FORMAT = 3
+
+
+@lru_cache(maxsize=1)
+def _sympy_version():
+    """Versión de SymPy sin importarlo (si todavía no se importó)."""
+    module = sys.modules.get('sympy')
+    if module is not None:
+        return module.__version__
+    
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version('sympy')
+    except PackageNotFoundError:
+        return 'none'
+
+
+def cache_version():
+    """
+    Marca de versión: formato, Python, NumPy y SymPy (el código generado
+    depende de lambdify y de los módulos numéricos).
+    """
+    return (f"{CACHE_FORMAT}-py{sys.version_info[0]}.{sys.version_info[1]}"
+            f"-np{np.__version__}-sp{_sympy_version()}")
+
+
+def _source_hash(source):
+    """Hash del código fuente guardado en una entrada."""
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def _code_names(code):
+    """Nombres globales referenciados por un objeto código (y los anidados)."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, 'co_names'):
+            names |= _code_names(const)
+    return names
+
+
+def load_function(source, namespace, name='_lambdifygenerated'):
+    """
+    Ejecuta el código fuente guardado y retorna la función generada.
+    
+    Returns:
+        La función, o None si el código referencia nombres que no
+        existen en el espacio de nombres
+    """
+    try:
+        code = compile(source, f"<{name}-cache>", 'exec')
+    except SyntaxError:
+        return None
+    
+    # Nombres usados dentro de la función (el módulo solo la define)
+    used = set()
+    for const in code.co_consts:
+        if hasattr(const, 'co_names'):
+            used |= _code_names(const)
+    
+    missing = used - set(namespace) - set(dir(builtins))
+    if missing:
+        return None
+    
+    scope = dict(namespace)
+    exec(code, scope)
+    return scope.get(name)
+
+
+class CompileCache:
+    """
+    Directorio de entradas JSON, una por sistema compilado.
+    
+    Ejemplo:
+        cache = CompileCache()
+        entry = cache.load('system', exprs, names)
+        if entry is None:
+            cache.store('system', exprs, names, {'srepr': [...], 'source': src})
+    """
+    
+    def __init__(self, directory=None, max_bytes=20 * 1024 * 1024):
+        """
+        Args:
+            directory: Directorio de la caché (None = CACHE_DIR/compiled)
+            max_bytes: Tamaño máximo total de las entradas
+        """
+        self.directory = directory or os.path.join(CACHE_DIR, 'compiled')
+        self.max_bytes = max_bytes
+    
+    @cached_property
+    def version(self):
+        """Marca de versión (se calcula en el primer uso)."""
+        return cache_version()
+    
+    def key(self, kind, exprs, names):
+        """Hash del contenido que identifica una entrada."""
+        content = json.dumps([kind, list(exprs), list(names)])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+    
+    def _path(self, kind, exprs, names):
+        return os.path.join(self.directory, f"{self.key(kind, exprs, names)}.json")
+    
+    def load(self, kind, exprs, names):
+        """
+        Recupera una entrada.
+        
+        Returns:
+            dict guardado con store(), o None si no existe, es de otra
+            versión o está dañada (incluido un código fuente que no
+            coincide con su hash)
+        """
+        path = self._path(kind, exprs, names)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if (entry.get('version') != self.version or entry.get('kind') != kind
+                or entry.get('exprs') != list(exprs) or entry.get('names') != list(names)):
+            return None
+        
+        source = entry.get('source')
+        if source is not None and (not isinstance(source, str)
+                                   or entry.get('source_hash') != _source_hash(source)):
+            return None
+        
+        # Marcar como usada recientemente (orden de desalojo)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+    
+    def store(self, kind, exprs, names, data):
+        """
+        Guarda una entrada (escritura atómica). Si data incluye 'source'
+        se guarda también su hash. Los errores de disco se ignoran: la
+        caché es solo una optimización.
+        """
+        entry = dict(data, version=self.version, kind=kind,
+                     exprs=list(exprs), names=list(names))
+        if isinstance(data.get('source'), str):
+            entry['source_hash'] = _source_hash(data['source'])
+        path = self._path(kind, exprs, names)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        
+        self.evict()
+        return True
+    
+    def _entries(self):
+        """Lista de (mtime, tamaño, ruta) de las entradas."""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def size(self):
+        """Tamaño total de las entradas en bytes."""
+        return sum(size for _, size, _ in self._entries())
+    
+    def evict(self):
+        """Elimina las entradas menos usadas hasta quedar bajo max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+    
+    def clear(self):
+        """Elimina todas las entradas."""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
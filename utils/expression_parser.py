@@ -3,20 +3,30 @@ Parser de expresiones matemáticas con soporte para lenguaje natural.
 Convierte expresiones como 'ln(2*x*pi)' a formato evaluable.
 """
 
+import builtins
+import inspect
+import os
+from functools import lru_cache
+
 import numpy as np
-import sympy as sp
-from sympy.parsing.sympy_parser import (
-    parse_expr,
-    standard_transformations,
-    implicit_multiplication_application,
-    convert_xor,
-    function_exponentiation
-)
+
+from utils.compile_cache import CompileCache, load_function
+from utils.lazy import LazyModule
+
+# SymPy se importa recién al parsear una expresión que no está en la caché
+sp = LazyModule('sympy')
 
 
 class ExpressionParser:
     """Parser robusto para expresiones matemáticas."""
     
+    # Tamaño de las cachés LRU de expresiones parseadas y compiladas
+    CACHE_SIZE = 256
+    
+    # Caché en disco del código generado por lambdify (None = desactivada,
+    # también con la variable de entorno SIMULADOR_DISK_CACHE=0)
+    DISK_CACHE = None if os.environ.get('SIMULADOR_DISK_CACHE') == '0' else CompileCache()
+    
     # Constantes matemáticas disponibles
     CONSTANTS = {
         'pi': np.pi,
@@ -58,7 +68,7 @@ class ExpressionParser:
         """
         if not expr_str or not isinstance(expr_str, str):
             return expr_str
-            
+        
         expr = expr_str.strip()
         
         # Reemplazar 'ln' por 'log' (ambos se mapean a np.log)
@@ -72,116 +82,201 @@ class ExpressionParser:
         return expr
     
     @staticmethod
-    def parse_to_sympy(expr_str, variables=None):
+    def parse_to_sympy(expr_str, variables=None, parameters=None):
         """
         Parsea una expresión a sympy con transformaciones avanzadas.
         
         Args:
             expr_str: Expresión matemática como string
             variables: Lista de nombres de variables (ej: ['x', 'y', 't'])
+            parameters: Lista de nombres de parámetros (ej: ['mu']); se
+                        tratan como símbolos igual que las variables
         
         Returns:
             Expresión de sympy
         """
         if not expr_str:
             return None
-            
-        expr = ExpressionParser.normalize_expression(expr_str)
         
-        # Definir variables simbólicas
-        if variables:
-            local_dict = {var: sp.Symbol(var, real=True) for var in variables}
-        else:
-            local_dict = {}
-        
-        # Agregar constantes
-        local_dict.update({
-            'pi': sp.pi,
-            'e': sp.E,
-            'I': sp.I,
-        })
-        
-        # Transformaciones para parseo flexible
-        transformations = (
-            standard_transformations +
-            (implicit_multiplication_application,
-             convert_xor,
-             function_exponentiation)
-        )
+        expr = ExpressionParser.normalize_expression(expr_str)
         
         try:
-            sympy_expr = parse_expr(
-                expr,
-                local_dict=local_dict,
-                transformations=transformations,
-                evaluate=True
-            )
-            return sympy_expr
+            return _parse_cached(expr, _symbols(variables, parameters))
         except Exception as e:
             raise ValueError(f"Error parseando expresión '{expr_str}': {str(e)}")
     
     @staticmethod
-    def create_numpy_function(expr_str, variables):
+    def create_numpy_function(expr_str, variables, parameters=None):
         """
         Crea una función numpy evaluable desde una expresión string.
         
         Args:
             expr_str: Expresión matemática
             variables: Lista de variables ['x', 'y'] o ['x', 't']
+            parameters: Lista de parámetros; la función recibe sus valores
+                        después de las variables: f(x, y, *params)
         
         Returns:
             Función lambda que acepta arrays numpy
         """
-        sympy_expr = ExpressionParser.parse_to_sympy(expr_str, variables)
-        
-        if sympy_expr is None:
+        if not expr_str:
             return lambda *args: np.zeros_like(args[0])
         
-        # Convertir símbolos de sympy a objetos Symbol
-        syms = [sp.Symbol(v, real=True) for v in variables]
+        expr = ExpressionParser.normalize_expression(expr_str)
+        try:
+            return _numpy_function_cached(expr, _symbols(variables, parameters))
+        except Exception:
+            # Reportar el error con la expresión original
+            ExpressionParser.parse_to_sympy(expr_str, variables, parameters)
+            raise
+    
+    @staticmethod
+    def compile_system(expr_strs, variables, parameters=None):
+        """
+        Compila todas las componentes de un sistema en una sola función.
+        
+        Aplica eliminación de subexpresiones comunes (sympy.cse) sobre el
+        conjunto de componentes, de modo que los términos compartidos se
+        calculan una vez por llamada.
         
-        # Lambdify: convierte expresión sympy a función numpy
-        numpy_func = sp.lambdify(
-            syms,
-            sympy_expr,
-            modules=['numpy', ExpressionParser.FUNCTIONS]
-        )
+        Args:
+            expr_strs: Lista de expresiones (una por componente)
+            variables: Lista de variables ['x', 'y', 'z']
+            parameters: Lista de parámetros, recibidos tras las variables
+        
+        Returns:
+            Función que retorna un ndarray apilado de forma (n, ...)
+        """
+        exprs = tuple(ExpressionParser.normalize_expression(e) if e else ''
+                      for e in expr_strs)
         
-        return numpy_func
+        try:
+            return _system_function_cached(exprs, _symbols(variables, parameters))
+        except Exception:
+            _validate_all(expr_strs, variables, parameters)
+            raise
     
     @staticmethod
-    def create_scalar_function(expr_str, variables):
+    def create_jacobian_function(expr_strs, variables, parameters=None):
+        """
+        Crea el Jacobiano simbólico de un sistema como función numpy.
+        
+        Las derivadas se calculan una sola vez con sympy y se compilan
+        en una única función vectorizada.
+        
+        Args:
+            expr_strs: Lista de expresiones (una por componente)
+            variables: Lista de variables ['x', 'y']
+            parameters: Lista de parámetros (no se deriva respecto a ellos)
+        
+        Returns:
+            Función que acepta arrays de igual forma (y luego los valores
+            de los parámetros) y retorna un array de forma (..., n, n)
+            con J[..., i, j] = ∂f_i/∂x_j
+        """
+        exprs = tuple(ExpressionParser.normalize_expression(e) if e else ''
+                      for e in expr_strs)
+        try:
+            return _jacobian_function_cached(exprs, tuple(variables), tuple(parameters or ()))
+        except Exception:
+            _validate_all(expr_strs, variables, parameters)
+            raise
+    
+    @staticmethod
+    def create_scalar_function(expr_str, variables, parameters=None):
         """
         Crea función para valores escalares (usado en fsolve, nsolve).
         """
-        sympy_expr = ExpressionParser.parse_to_sympy(expr_str, variables)
-        
-        if sympy_expr is None:
+        if not expr_str:
             return lambda *args: 0.0
         
-        syms = [sp.Symbol(v, real=True) for v in variables]
+        ExpressionParser.parse_to_sympy(expr_str, variables, parameters)
         
-        scalar_func = sp.lambdify(
-            syms,
-            sympy_expr,
-            modules=['math', {'ln': np.log}]
-        )
+        expr = ExpressionParser.normalize_expression(expr_str)
+        return _scalar_function_cached(expr, _symbols(variables, parameters))
+    
+    @staticmethod
+    def free_symbols(expr_str, variables, parameters=None):
+        """
+        Nombres de los símbolos de los que depende una expresión.
+        
+        Si la expresión ya se compiló, los nombres se leen de la caché en
+        disco sin importar sympy.
+        
+        Returns:
+            frozenset de nombres (vacío para una expresión vacía)
+        """
+        if not expr_str:
+            return frozenset()
         
-        return scalar_func
+        expr = ExpressionParser.normalize_expression(expr_str)
+        try:
+            return _free_symbols_cached(expr, _symbols(variables, parameters))
+        except Exception as e:
+            raise ValueError(f"Error parseando expresión '{expr_str}': {str(e)}")
     
     @staticmethod
-    def validate_expression(expr_str, variables):
+    def validate_expression(expr_str, variables, parameters=None):
         """
         Valida que una expresión sea parseable y evaluable.
         
+        Una expresión que ya está compilada en la caché en disco con los
+        mismos símbolos (variables y parámetros) se da por válida sin
+        importar sympy.
+        
         Returns:
             (is_valid, error_message)
         """
+        if not expr_str:
+            return True, ""
+        
+        expr = ExpressionParser.normalize_expression(expr_str)
+        names = _symbols(variables, parameters)
+        
+        cache = ExpressionParser.DISK_CACHE
+        if cache is not None and cache.load('numpy', (expr,), names) is not None:
+            return True, ""
+        
         try:
-            ExpressionParser.parse_to_sympy(expr_str, variables)
+            _parse_cached(expr, names)
             return True, ""
         except Exception as e:
-            return False, str(e)
+            return False, f"Error parseando expresión '{expr_str}': {str(e)}"
+    
+    @staticmethod
+    def cache_info():
+        """
+        Estadísticas de las cachés de expresiones (aciertos, fallos, tamaño).
+        
+        Returns:
+            dict nombre -> CacheInfo de functools
+        """
+        return {
+            'parse': _parse_cached.cache_info(),
+            'free_symbols': _free_symbols_cached.cache_info(),
+            'numpy': _numpy_function_cached.cache_info(),
+            'scalar': _scalar_function_cached.cache_info(),
+            'system': _system_function_cached.cache_info(),
+            'jacobian': _jacobian_function_cached.cache_info(),
+        }
+    
+    @staticmethod
+    def clear_cache(disk=False):
+        """
+        Vacía las cachés de expresiones parseadas y compiladas.
+        
+        Args:
+            disk: Si es True también elimina la caché en disco
+        """
+        _parse_cached.cache_clear()
+        _free_symbols_cached.cache_clear()
+        _numpy_function_cached.cache_clear()
+        _scalar_function_cached.cache_clear()
+        _system_function_cached.cache_clear()
+        _jacobian_function_cached.cache_clear()
+        _runtime_namespace.cache_clear()
+        if disk and ExpressionParser.DISK_CACHE is not None:
+            ExpressionParser.DISK_CACHE.clear()
     
     @staticmethod
     def get_help_text():
@@ -210,6 +305,206 @@ Ejemplos válidos:
 """
 
 
+# Cachés a nivel de proceso. Las claves son la expresión ya normalizada y
+# la tupla de símbolos (variables seguidas de parámetros); las expresiones
+# de sympy son inmutables y las funciones compiladas no guardan estado,
+# así que se comparten sin copiar. Los valores de los parámetros no forman
+# parte de la clave: se pasan en cada llamada.
+
+def _symbols(variables, parameters=None):
+    """Tupla de nombres de símbolos: variables y luego parámetros."""
+    return tuple(variables or ()) + tuple(parameters or ())
+
+
+def _validate_all(expr_strs, variables, parameters):
+    """Lanza ValueError con la primera expresión que no se puede parsear."""
+    for expr_str in expr_strs:
+        if expr_str:
+            ExpressionParser.parse_to_sympy(expr_str, variables, parameters)
+
+
+@lru_cache(maxsize=1)
+def _runtime_namespace():
+    """
+    Espacio de nombres equivalente al de lambdify con modules=['numpy',
+    FUNCTIONS], para ejecutar el código recuperado de la caché en disco.
+    """
+    namespace = dict(ExpressionParser.FUNCTIONS)
+    exec('from numpy import *', namespace)
+    exec('from numpy.linalg import *', namespace)
+    namespace.update({'numpy': np, 'builtins': builtins, 'range': range, 'I': 1j})
+    return namespace
+
+
+def _lambdify_persistent(kind, exprs, variables, build, cse=False):
+    """
+    Compila con lambdify (módulos numpy) o recupera el código de la caché
+    en disco, sin usar sympy.
+    
+    Args:
+        kind: Tipo de entrada ('numpy', 'system', 'jacobian')
+        exprs: Tupla de expresiones normalizadas (clave)
+        variables: Tupla de nombres de los argumentos (clave)
+        build: Función sin argumentos que retorna (símbolos, expresión o
+               lista de expresiones de sympy); solo se llama si falta
+               la entrada
+        cse: Eliminación de subexpresiones comunes en lambdify
+    """
+    cache = ExpressionParser.DISK_CACHE
+    namespace = _runtime_namespace()
+    
+    if cache is not None:
+        entry = cache.load(kind, exprs, variables)
+        if entry is not None:
+            func = load_function(entry['source'], namespace)
+            if func is not None:
+                return func
+    
+    syms, target = build()
+    func = sp.lambdify(syms, target, modules=['numpy', ExpressionParser.FUNCTIONS], cse=cse)
+    
+    if cache is not None:
+        try:
+            source = inspect.getsource(func)
+        except (OSError, TypeError):
+            source = None
+        
+        # Solo se guarda código que se puede reconstruir fuera de sympy
+        if source is not None and load_function(source, namespace) is not None:
+            targets = target if isinstance(target, list) else [target]
+            cache.store(kind, exprs, variables, {
+                'srepr': [sp.srepr(t) for t in targets],
+                'free_symbols': [sorted(str(s) for s in t.free_symbols) for t in targets],
+                'source': source,
+            })
+    
+    return func
+
+
+@lru_cache(maxsize=ExpressionParser.CACHE_SIZE)
+def _parse_cached(expr, variables):
+    """Parsea una expresión normalizada a sympy."""
+    from sympy.parsing.sympy_parser import (
+        parse_expr,
+        standard_transformations,
+        implicit_multiplication_application,
+        convert_xor,
+        function_exponentiation
+    )
+    
+    # Definir variables simbólicas
+    local_dict = {var: sp.Symbol(var, real=True) for var in variables}
+    
+    # Agregar constantes
+    local_dict.update({
+        'pi': sp.pi,
+        'e': sp.E,
+        'I': sp.I,
+    })
+    
+    # Transformaciones para parseo flexible
+    transformations = (
+        standard_transformations +
+        (implicit_multiplication_application,
+         convert_xor,
+         function_exponentiation)
+    )
+    
+    return parse_expr(
+        expr,
+        local_dict=local_dict,
+        transformations=transformations,
+        evaluate=True
+    )
+
+
+@lru_cache(maxsize=ExpressionParser.CACHE_SIZE)
+def _numpy_function_cached(expr, variables):
+    """Compila una expresión normalizada a una función numpy."""
+    def build():
+        # Convertir símbolos de sympy a objetos Symbol
+        syms = [sp.Symbol(v, real=True) for v in variables]
+        return syms, _parse_cached(expr, variables)
+    
+    # Lambdify: convierte expresión sympy a función numpy
+    return _lambdify_persistent('numpy', (expr,), variables, build)
+
+
+@lru_cache(maxsize=ExpressionParser.CACHE_SIZE)
+def _free_symbols_cached(expr, variables):
+    """Símbolos libres de una expresión normalizada (de la caché en disco si está)."""
+    cache = ExpressionParser.DISK_CACHE
+    if cache is not None:
+        entry = cache.load('numpy', (expr,), variables)
+        if entry is not None and 'free_symbols' in entry:
+            return frozenset(entry['free_symbols'][0])
+    
+    return frozenset(str(s) for s in _parse_cached(expr, variables).free_symbols)
+
+
+@lru_cache(maxsize=ExpressionParser.CACHE_SIZE)
+def _scalar_function_cached(expr, variables):
+    """Compila una expresión normalizada a una función escalar (math)."""
+    sympy_expr = _parse_cached(expr, variables)
+    syms = [sp.Symbol(v, real=True) for v in variables]
+    
+    return sp.lambdify(
+        syms,
+        sympy_expr,
+        modules=['math', {'ln': np.log}]
+    )
+
+
+@lru_cache(maxsize=ExpressionParser.CACHE_SIZE)
+def _system_function_cached(exprs, variables):
+    """Compila un sistema de expresiones normalizadas con CSE en una función."""
+    def build():
+        syms = [sp.Symbol(v, real=True) for v in variables]
+        components = [_parse_cached(e, variables) if e else sp.Integer(0) for e in exprs]
+        return syms, components
+    
+    components_func = _lambdify_persistent('system', exprs, variables, build, cse=True)
+    
+    def system_func(*args):
+        values = components_func(*args)
+        try:
+            # Caso habitual (escalares o arrays de igual forma)
+            return np.array(values, dtype=float)
+        except (ValueError, TypeError):
+            # Componentes constantes mezcladas con arrays
+            return np.real(np.stack(np.broadcast_arrays(*values)))
+    
+    return system_func
+
+
+@lru_cache(maxsize=ExpressionParser.CACHE_SIZE)
+def _jacobian_function_cached(exprs, variables, parameters=()):
+    """Deriva y compila el Jacobiano de un sistema de expresiones normalizadas."""
+    names = variables + parameters
+    n_rows, n_cols = len(exprs), len(variables)
+    
+    def build():
+        syms = [sp.Symbol(v, real=True) for v in variables]
+        params = [sp.Symbol(p, real=True) for p in parameters]
+        components = [_parse_cached(e, names) if e else sp.Integer(0) for e in exprs]
+        jacobian = sp.Matrix(components).jacobian(syms)
+        return syms + params, list(jacobian)
+    
+    entries_func = _lambdify_persistent('jacobian', exprs, names, build)
+    
+    def jacobian_func(*args):
+        args = [np.asarray(a, dtype=float) for a in args]
+        shape = np.broadcast_shapes(*(a.shape for a in args))
+        
+        # Las entradas constantes se difunden al asignarlas
+        J = np.empty(shape + (n_rows * n_cols,))
+        for k, entry in enumerate(entries_func(*args)):
+            J[..., k] = np.real(entry)
+        return J.reshape(shape + (n_rows, n_cols))
+    
+    return jacobian_func
+
+
 def test_parser():
     """Función de testing."""
     parser = ExpressionParser()
@@ -237,7 +532,7 @@ def test_parser():
             test_vals = [1.0] * len(vars)
             result = func(*test_vals)
             print(f"✓ Evaluación en {test_vals}: {result}")
-            
+        
         except Exception as e:
             print(f"✗ Error: {e}")
 
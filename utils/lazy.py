@@ -0,0 +1,47 @@
+"""
+Importación diferida de módulos pesados.
+
+SymPy y SciPy tardan casi un segundo cada uno en importarse y solo hacen
+falta cuando el usuario efectivamente calcula algo. Un LazyModule se
+comporta como el módulo pero lo importa en el primer acceso a un
+atributo:
+
+    sp = LazyModule('sympy')
+    x = sp.Symbol('x')   # aquí se importa SymPy
+"""
+
+import importlib
+import sys
+
+
+class LazyModule:
+    """Representante de un módulo que se importa en el primer uso."""
+    
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+    
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+    
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+    
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+    
+    def __dir__(self):
+        return dir(self._load())
+    
+    def __repr__(self):
+        state = 'cargado' if self.__dict__['_module'] is not None else 'diferido'
+        return f"<LazyModule '{self.__dict__['_name']}' ({state})>"
+
+
+def is_loaded(name):
+    """True si el módulo ya fue importado en este proceso."""
+    return name in sys.modules